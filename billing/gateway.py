@@ -21,7 +21,8 @@ class PaymentGateway:
             self.__amount,
             self.__currency,
             self.__data.get('email'),
-            self.__data.get('reservation_description')  # ✅ Updated key name
+            self.__data.get('reservation_description'),  # ✅ Updated key name
+            self.__data.get('hold_expires_at')
         )
         
         self.__reference = stripe_handler.get_reference()
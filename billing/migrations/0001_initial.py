@@ -0,0 +1,56 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:21
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('games', '0001_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Invoice',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('invoice_id', models.CharField(editable=False, max_length=60, unique=True)),
+                ('payment_method', models.CharField(blank=True, default='stripe', max_length=30, null=True)),
+                ('callback_url', models.URLField(blank=True, max_length=1000, null=True)),
+                ('cancel_url', models.URLField(blank=True, max_length=1000, null=True)),
+                ('currency', models.CharField(default='EUR', max_length=5)),
+                ('discount', models.FloatField(blank=True, null=True)),
+                ('invoice_date', models.DateField(default=django.utils.timezone.now)),
+                ('payment_type', models.CharField(default='online', max_length=20)),
+                ('total', models.DecimalField(decimal_places=2, max_digits=8)),
+                ('invoice_type', models.CharField(default='one_time', max_length=20)),
+                ('reservation', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='games.reservation')),
+                ('user', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='Payment',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('amount', models.DecimalField(decimal_places=2, max_digits=5)),
+                ('currency', models.CharField(max_length=10)),
+                ('reference', models.CharField(blank=True, max_length=150, null=True)),
+                ('payment_gateway', models.CharField(default='stripe', max_length=150)),
+                ('payment_type', models.CharField(default='online', max_length=150)),
+                ('url', models.URLField(blank=True, max_length=1255, null=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('receivable', 'Receivable'), ('failed', 'Failed'), ('timeout', 'Timeout'), ('completed', 'Completed'), ('cancelled', 'Cancelled'), ('refunded', 'Refunded'), ('reversed', 'Reversed')], default='pending', max_length=20)),
+                ('details', models.JSONField(blank=True, null=True)),
+                ('callback_url', models.URLField(blank=True, max_length=1255, null=True)),
+                ('cancel_url', models.URLField(blank=True, max_length=1255, null=True)),
+                ('paid_date', models.DateField(blank=True, null=True)),
+                ('invoice', models.ForeignKey(null=True, on_delete=django.db.models.deletion.CASCADE, related_name='payments', to='billing.invoice')),
+            ],
+        ),
+    ]
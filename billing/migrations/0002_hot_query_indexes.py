@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:21
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('billing', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='invoice',
+            name='invoice_date',
+            field=models.DateField(db_index=True, default=django.utils.timezone.now),
+        ),
+        migrations.AlterField(
+            model_name='payment',
+            name='reference',
+            field=models.CharField(blank=True, db_index=True, max_length=150, null=True),
+        ),
+    ]
@@ -5,6 +5,7 @@ from django.utils import timezone
 import random
 from billing.utils import check_invoice_id
 import uuid
+from datetime import timedelta
 
 class Invoice(models.Model):
     id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
@@ -19,7 +20,7 @@ class Invoice(models.Model):
     
     currency = models.CharField(max_length=5, default='EUR')
     discount = models.FloatField(null=True, blank=True)
-    invoice_date = models.DateField(default=timezone.now)
+    invoice_date = models.DateField(default=timezone.now, db_index=True)
     
     payment_type = models.CharField(max_length=20, default='online')
     total = models.DecimalField(decimal_places=2, max_digits=8)
@@ -37,9 +38,12 @@ class Invoice(models.Model):
     def save(self, *args, **kwargs):
         if not self.invoice_id:
             number = random.randint(100000, 999999)
+            # A date range instead of month/year lookups so the invoice_date index is used
+            month_start = self.invoice_date.replace(day=1)
+            next_month = (month_start + timedelta(days=32)).replace(day=1)
             count = Invoice.objects.filter(
-                invoice_date__month=self.invoice_date.month,
-                invoice_date__year=self.invoice_date.year
+                invoice_date__gte=month_start,
+                invoice_date__lt=next_month
             ).count() + 1
             self.invoice_id = f"{self.invoice_date.strftime('%m')}{self.invoice_date.strftime('%y')}{count:05d}00{number}"
             self.invoice_id = check_invoice_id(self.invoice_id)
@@ -66,7 +70,7 @@ class Payment(models.Model):
 
     invoice = models.ForeignKey(Invoice, on_delete=models.CASCADE, null=True, related_name='payments')
 
-    reference = models.CharField(max_length=150, null=True, blank=True)
+    reference = models.CharField(max_length=150, null=True, blank=True, db_index=True)
 
     payment_gateway = models.CharField(max_length=150, default='stripe')
 
@@ -1,9 +1,23 @@
+from datetime import timedelta
 from django.conf import settings
+from django.utils import timezone
 import stripe
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Stripe only accepts Checkout expiry times within this window from creation
+CHECKOUT_MIN_LIFETIME = timedelta(minutes=30, seconds=30)
+CHECKOUT_MAX_LIFETIME = timedelta(hours=24)
+
+
+def checkout_expiry(hold_expires_at):
+    """Unix time the Checkout session expires at: the hold expiry, clamped to what Stripe accepts"""
+    now = timezone.now()
+    expires_at = hold_expires_at or now + CHECKOUT_MAX_LIFETIME
+    expires_at = min(max(expires_at, now + CHECKOUT_MIN_LIFETIME), now + CHECKOUT_MAX_LIFETIME)
+    return int(expires_at.timestamp())
+
 class Stripe:
     def __init__(self):
         if settings.STRIPE_LIVE_MODE:
@@ -16,7 +30,7 @@ class Stripe:
         self.__payment_url = ''
         self.__reference = ''
     
-    def transaction(self, amount, currency, customer_email, reservation_description):
+    def transaction(self, amount, currency, customer_email, reservation_description, hold_expires_at=None):
         stripe.api_key = self.__stripe_secret_key
         checkout_session = stripe.checkout.Session.create(
             payment_method_types=['card'],
@@ -37,6 +51,8 @@ class Stripe:
             mode='payment',
             success_url=self.__domain + '/reservations?session_id={CHECKOUT_SESSION_ID}',
             cancel_url=settings.BASE_URL,
+            # The session can't be paid once the reservation's hold has run out
+            expires_at=checkout_expiry(hold_expires_at),
         )
         self.__reference = checkout_session.id
         self.__payment_url = checkout_session.url
@@ -53,4 +69,13 @@ class Stripe:
         if result.payment_status == 'paid':
             return True
         else:
-            return False
\ No newline at end of file
+            return False
+    
+    def expire(self, session_id):
+        """Close an open Checkout session so it can't be paid anymore"""
+        stripe.api_key = self.__stripe_secret_key
+        stripe.checkout.Session.expire(session_id)
+    
+    def refund(self, payment_intent):
+        stripe.api_key = self.__stripe_secret_key
+        return stripe.Refund.create(payment_intent=payment_intent)
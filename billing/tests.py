@@ -1,3 +1,92 @@
+from datetime import timedelta
+from unittest import mock
+
 from django.test import TestCase
+from django.utils import timezone
+
+from billing.models import Invoice
+from billing.service import CHECKOUT_MAX_LIFETIME, CHECKOUT_MIN_LIFETIME, checkout_expiry
+from billing.views import StripeWebhookView
+from games.expiry import expire_pending_reservations
+from games.models import Reservation, SlotOccupancy
+from games.tests import create_game
+from games.utils import get_spain_now
+from user.models import User
+
+
+class LatePaymentTests(TestCase):
+    """A hold that expired before its payment arrived must not overbook the slot"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.game = create_game()
+        cls.user = User.objects.create(email='late@example.com')
+        cls.date = get_spain_now().date() + timedelta(days=2)
+
+    def reserve(self, players):
+        return Reservation.objects.create(
+            user=self.user, game=self.game, date=self.date, time='19:00', players=players,
+            email=self.user.email, language='en', hold_expires_at=timezone.now() - timedelta(minutes=1)
+        )
+
+    def expire_hold(self, reservation):
+        """Let the sweeper cancel the unpaid reservation, returns its payment"""
+        invoice = Invoice.objects.create(user=self.user, reservation=reservation, total=reservation.total_price)
+        payment = invoice.create_payment()
+        payment.reference = f'cs_test_{payment.id}'
+        payment.save()
+
+        with mock.patch('billing.service.Stripe') as stripe_handler, \
+                self.captureOnCommitCallbacks(execute=True):
+            expire_pending_reservations()
+        stripe_handler.return_value.expire.assert_called_once_with(payment.reference)
+        payment.refresh_from_db()
+        self.assertEqual(payment.status, 'timeout')
+        return payment
+
+    def deliver_payment(self, payment):
+        """Deliver the checkout.session.completed of the payment, returns the Stripe mock"""
+        with mock.patch('billing.views.Stripe') as stripe_handler, \
+                mock.patch('billing.views.sendgrid_send_email', return_value=True):
+            StripeWebhookView().handle_successful_payment(
+                {'id': payment.reference, 'payment_intent': 'pi_test'}
+            )
+        payment.refresh_from_db()
+        return stripe_handler.return_value
+
+    def used_capacity(self):
+        return SlotOccupancy.objects.get(game=self.game, date=self.date, time='19:00').used_capacity
+
+    def test_late_payment_reclaims_a_free_slot(self):
+        reservation = self.reserve(4)
+        payment = self.expire_hold(reservation)
+        stripe_handler = self.deliver_payment(payment)
+
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, 'confirmed')
+        self.assertEqual(payment.status, 'completed')
+        self.assertEqual(self.used_capacity(), 4)
+        stripe_handler.refund.assert_not_called()
+
+    def test_late_payment_for_a_resold_slot_is_refunded(self):
+        reservation = self.reserve(4)
+        payment = self.expire_hold(reservation)
+        self.reserve(4)
+        stripe_handler = self.deliver_payment(payment)
+
+        reservation.refresh_from_db()
+        self.assertEqual(reservation.status, 'cancelled')
+        self.assertEqual(payment.status, 'refunded')
+        self.assertEqual(self.used_capacity(), 4)
+        stripe_handler.refund.assert_called_once_with('pi_test')
+
+
+class CheckoutExpiryTests(TestCase):
+    def test_session_expires_with_the_hold_within_stripe_limits(self):
+        now = timezone.now()
+        hold = now + timedelta(hours=2)
 
-# Create your tests here.
+        self.assertEqual(checkout_expiry(hold), int(hold.timestamp()))
+        self.assertGreaterEqual(checkout_expiry(now), int((now + CHECKOUT_MIN_LIFETIME).timestamp()))
+        self.assertLessEqual(checkout_expiry(now + timedelta(days=3)),
+                             int((timezone.now() + CHECKOUT_MAX_LIFETIME).timestamp()))
@@ -28,7 +28,8 @@ def create_payment_gateway(payment):
             'user_id': payment.invoice.user.id if payment.invoice.user else None,
             'email': payment.invoice.user.email if payment.invoice.user else "guest@example.com",
             'callback_url': payment.invoice.callback_url,
-            'reservation_description': f"{game_title} - {reservation.date} at {reservation.time}"  # ✅ Fixed
+            'reservation_description': f"{game_title} - {reservation.date} at {reservation.time}",  # ✅ Fixed
+            'hold_expires_at': reservation.hold_expires_at
         }
         
         gateway = PaymentGateway(
@@ -3,10 +3,13 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated,AllowAny
 from django.shortcuts import get_object_or_404
 from games.models import Reservation
+from games.occupancy import CapacityError
 from billing.models import Invoice
 from billing.models import Payment
 from billing.utils import create_payment_gateway
+from billing.service import Stripe
 from django.conf import settings
+from django.db import transaction
 import stripe
 import json
 from django.http import HttpResponse
@@ -142,9 +145,9 @@ class StripeWebhookView(APIView):
             
             # Update reservation status
             if payment.invoice.reservation:
-                reservation = payment.invoice.reservation
-                reservation.status = 'confirmed'
-                reservation.save()
+                reservation = self.confirm_reservation(payment, session)
+                if reservation is None:
+                    return
                 
                 language = reservation.language
                         
@@ -187,6 +190,44 @@ class StripeWebhookView(APIView):
         except Exception as e:
             print(f"❌ Error processing payment: {str(e)}")
     
+    def confirm_reservation(self, payment, session):
+        """
+        Confirm the paid reservation, returns it or None if it can't be confirmed
+        
+        Only a pending reservation is confirmed as is. One whose hold expired
+        before the payment arrived claims its slot again, if the slot was sold
+        meanwhile the payment is refunded.
+        """
+        with transaction.atomic():
+            reservation = Reservation.objects.select_for_update().get(pk=payment.invoice.reservation_id)
+            
+            if reservation.status == 'pending':
+                reservation.status = 'confirmed'
+                reservation.save()
+                return reservation
+            
+            if reservation.status != 'cancelled':
+                # Confirmed already, e.g. a redelivered event
+                print(f"Reservation {reservation.id} is {reservation.status}, payment {payment.id} not applied")
+                return None
+            
+            try:
+                reservation.status = 'confirmed'
+                reservation.save()
+                return reservation
+            except CapacityError as e:
+                reservation.status = 'cancelled'
+                print(f"❌ Late payment {payment.id} for expired reservation {reservation.id}: {e}")
+        
+        try:
+            Stripe().refund(session.get('payment_intent'))
+            payment.status = 'refunded'
+            payment.save(update_fields=['status'])
+        except Exception as e:
+            # The payment stays 'completed' on a cancelled reservation for manual handling
+            print(f"❌ Refund of payment {payment.id} failed, refund it manually: {str(e)}")
+        return None
+    
     def handle_expired_payment(self, session):
         """Handle expired/cancelled payment"""
         try:
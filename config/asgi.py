@@ -2,6 +2,8 @@
 ASGI config for config project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Serve it with an ASGI server (e.g. ``uvicorn config.asgi:application``) to get the
+availability stream without holding a worker thread per connected client.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -9,8 +11,22 @@ https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
 
 import os
 
+from django.conf import settings
 from django.core.asgi import get_asgi_application
+from dotenv import load_dotenv
 
-os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+load_dotenv()
+
+ENVIRONMENT = os.getenv('ENVIRONMENT', 'dev')
+
+settings_module = f'config.settings.{ENVIRONMENT}'
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
 
 application = get_asgi_application()
+
+
+# The expiry sweeper belongs to server processes, not to migrate, shell or cron commands
+if settings.RESERVATION_EXPIRY_SWEEP_SECONDS:
+    from games.expiry import start_expiry_scheduler
+    start_expiry_scheduler()
@@ -80,6 +80,7 @@ INSTALLED_APPS = [
     'billing.apps.BillingConfig',
     'rest_framework',
     'rest_framework.authtoken',
+    'django_filters',
     'corsheaders'
    
    
@@ -190,6 +191,47 @@ STATICFILES_DIRS = [
 MEDIA_URL = '/media/'
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Cache shared by availability and catalog responses. Production settings require a
+# shared backend (CACHE_URL=rediscache://127.0.0.1:6379/1 by default) so every worker
+# sees the same entries, the process-local default is meant for development.
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+
+# Upper bound in seconds for reusing a cached availability response
+AVAILABILITY_CACHE_TIMEOUT = env.int('AVAILABILITY_CACHE_TIMEOUT', default=300)
+
+# Upper bound in seconds for reusing a rendered catalog page
+CATALOG_CACHE_TIMEOUT = env.int('CATALOG_CACHE_TIMEOUT', default=60 * 60 * 24)
+
+# With a process-local cache every worker keeps its own catalog version, cached
+# catalog responses are then only reused for this many seconds
+LOCAL_CACHE_TIMEOUT = env.int('LOCAL_CACHE_TIMEOUT', default=10)
+
+# Redis pub/sub that carries capacity changes to the availability streams of every
+# process. Empty keeps them in the process that made the change, which only works
+# with a single web process and misses expiries of the expire_pending_reservations cron
+AVAILABILITY_EVENTS_URL = env.str('AVAILABILITY_EVENTS_URL', default='')
+
+# Minutes an unpaid online booking keeps its slot before the expiry sweeper cancels it
+RESERVATION_HOLD_MINUTES = env.int('RESERVATION_HOLD_MINUTES', default=30)
+
+# Expired reservations cancelled per transaction
+RESERVATION_EXPIRY_BATCH_SIZE = env.int('RESERVATION_EXPIRY_BATCH_SIZE', default=200)
+
+# Run the expiry sweeper inside the web process every N seconds, 0 leaves it to
+# the expire_pending_reservations command (cron)
+RESERVATION_EXPIRY_SWEEP_SECONDS = env.int('RESERVATION_EXPIRY_SWEEP_SECONDS', default=0)
+
+# Widths in pixels of the resized copies made of every game image, each in WebP and JPEG
+GAME_IMAGE_WIDTHS = env.list('GAME_IMAGE_WIDTHS', cast=int, default=[320, 640, 960, 1280])
+
+# Width of the copy game lists link instead of the original upload
+GAME_IMAGE_LIST_WIDTH = env.int('GAME_IMAGE_LIST_WIDTH', default=640)
+
+# Encoder quality of the resized copies, 1-100
+GAME_IMAGE_QUALITY = env.int('GAME_IMAGE_QUALITY', default=80)
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -1,3 +1,5 @@
+from django.core.exceptions import ImproperlyConfigured
+
 from config.settings.com import *
 
 DATABASES = {
@@ -14,6 +16,26 @@ DATABASES = {
     }
 }
 
+# Every gunicorn worker must see the same catalog version and availability entries
+CACHES = {
+    'default': env.cache('CACHE_URL', default='rediscache://127.0.0.1:6379/1'),
+}
+if CACHES['default']['BACKEND'] == 'django.core.cache.backends.locmem.LocMemCache':
+    raise ImproperlyConfigured('CACHE_URL must point to a cache shared by all workers, e.g. Redis')
+
+# Capacity changes of every worker and of the expiry cron reach all availability streams
+AVAILABILITY_EVENTS_URL = env.str('AVAILABILITY_EVENTS_URL', default='redis://127.0.0.1:6379/2')
+
+# collectstatic writes content-hashed names and .gz copies, see config/static.py
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'config.static.CompressedManifestStaticFilesStorage',
+    },
+}
+
 ALLOWED_HOSTS=['vidadenoche.com','www.vidadenoche.com','143.110.234.145','localhost']
 
 BASE_URL = 'https://vidadenoche.com'
\ No newline at end of file
@@ -1,41 +1,197 @@
+"""
+sitemap.xml for the SPA routes and every active game
+
+Each page is listed once per site language with hreflang alternates. The
+rendered XML is cached with a gzip copy under the catalog version, so it's
+only rebuilt after a game changes, and each encoding has its own ETag. Past
+SITEMAP_PAGE_SIZE URLs sitemap.xml turns into a sitemap index over
+paginated section sitemaps.
+"""
+import gzip
+import hashlib
+from urllib.parse import urlsplit
+
+from django.conf import settings
 from django.contrib.sitemaps import Sitemap
+from django.contrib.sitemaps import views as sitemap_views
+from django.core.cache import cache
+from django.db.models import Max
+from django.http import Http404, HttpResponse
+from django.template.response import TemplateResponse
 from django.urls import reverse
-from django.utils import timezone
+from django.utils import translation
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
+from django.views.decorators.http import require_GET
+
+from games.catalog import CATALOG_CACHE_TIMEOUT, get_catalog_version
+from .static import accepts_gzip, gzip_etag
+
+# Languages of the frontend, the default one has no URL prefix
+SITE_LANGUAGES = ['es', 'en', 'uk']
+DEFAULT_SITE_LANGUAGE = 'es'
+
+# URLs per sitemap page, sitemap.xml becomes an index above this
+SITEMAP_PAGE_SIZE = 5000
+
+
+def localized_path(path):
+    """Frontend path in the active language: /games/ -> /en/games/"""
+    language = translation.get_language()
+    if language == DEFAULT_SITE_LANGUAGE:
+        return path
+    return f'/{language}{path}'
+
+
+def latest_game_change():
+    from games.models import Game
+    return Game.objects.filter(is_active=True).aggregate(latest=Max('updated_at'))['latest']
 
-class StaticViewSitemap(Sitemap):
+
+class SiteSitemap(Sitemap):
+    """Absolute URLs on BASE_URL in every site language with hreflang alternates"""
+    i18n = True
+    languages = SITE_LANGUAGES
+    alternates = True
+    limit = SITEMAP_PAGE_SIZE
+
+    def get_protocol(self, protocol=None):
+        return urlsplit(settings.BASE_URL).scheme
+
+    def get_domain(self, site=None):
+        return urlsplit(settings.BASE_URL).netloc
+
+
+class StaticViewSitemap(SiteSitemap):
     priority = 1.0
     changefreq = 'weekly'
-    protocol = 'https'
 
     def items(self):
         return [
             'home',
-            'games', 
+            'games',
             'contact',
             'reservations'
         ]
 
     def location(self, item):
         if item == 'home':
-            return '/'
-        return f'/{item}/'
+            return localized_path('/')
+        return localized_path(f'/{item}/')
+
+    def lastmod(self, item):
+        # The home and games pages list the games, the others have no known change date
+        if item in ('home', 'games'):
+            if not hasattr(self, '_latest_game_change'):
+                self._latest_game_change = latest_game_change()
+            return self._latest_game_change
+        return None
+
+    def get_latest_lastmod(self):
+        return None
 
-    def lastmod(self, obj):
-        return timezone.now()
 
-# If you have a games model:
-class GameSitemap(Sitemap):
+class GameSitemap(SiteSitemap):
     changefreq = 'weekly'
     priority = 0.8
-    protocol = 'https'
 
     def items(self):
-        # Replace with your actual Game model
         from games.models import Game
-        return Game.objects.filter(status='available_now')
+        return Game.objects.filter(is_active=True).only('id', 'updated_at').order_by('id')
 
     def location(self, obj):
-        return f'/games/{obj.id}/'
+        return localized_path(f'/games/{obj.id}/')
 
     def lastmod(self, obj):
-        return obj.updated_at
\ No newline at end of file
+        return obj.updated_at
+
+    def get_latest_lastmod(self):
+        return latest_game_change()
+
+
+SITEMAPS = {
+    'static': StaticViewSitemap,
+    'games': GameSitemap,
+}
+
+
+def url_count():
+    return sum(sitemap().paginator.count for sitemap in SITEMAPS.values())
+
+
+def render_index(request):
+    """Sitemap index over every page of every section"""
+    base_url = settings.BASE_URL.rstrip('/')
+    items = []
+    for section, sitemap_class in SITEMAPS.items():
+        sitemap = sitemap_class()
+        location = base_url + reverse('sitemap-section', kwargs={'section': section})
+        lastmod = sitemap.get_latest_lastmod()
+        items.append(sitemap_views.SitemapIndexItem(location, lastmod))
+        for page in range(2, sitemap.paginator.num_pages + 1):
+            items.append(sitemap_views.SitemapIndexItem(f'{location}?p={page}', lastmod))
+    return TemplateResponse(
+        request, 'sitemap_index.xml', {'sitemaps': items}, content_type='application/xml'
+    )
+
+
+def build_sitemap(request, section):
+    """(etag, xml, gzip xml, Last-Modified) of one sitemap document"""
+    if section is None and url_count() > SITEMAP_PAGE_SIZE:
+        response = render_index(request)
+    else:
+        sitemaps = SITEMAPS if section is None else {section: SITEMAPS[section]}
+        response = sitemap_views.sitemap(request, sitemaps=sitemaps)
+    response.render()
+    content = response.content
+    return (
+        quote_etag(hashlib.md5(content).hexdigest()),
+        content,
+        gzip.compress(content, compresslevel=9, mtime=0),
+        response.get('Last-Modified'),
+    )
+
+
+def serve_sitemap(request, section=None):
+    if section is not None and section not in SITEMAPS:
+        raise Http404('No sitemap section %s' % section)
+    page = request.GET.get('p', '1')
+    # sitemap.xml has a single page, sections as many as their paginator
+    if not page.isdigit() or (section is None and page != '1'):
+        raise Http404('No page %s' % page)
+
+    key = f'catalog:{get_catalog_version()}:sitemap:{section or "root"}:{page}'
+    entry = cache.get(key)
+    if entry is None:
+        entry = build_sitemap(request, section)
+        cache.set(key, entry, timeout=CATALOG_CACHE_TIMEOUT)
+    etag, content, gzip_content, last_modified = entry
+
+    encoded = accepts_gzip(request)
+    if encoded:
+        etag = gzip_etag(etag)
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        if encoded:
+            response = HttpResponse(gzip_content, content_type='application/xml')
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(content, content_type='application/xml')
+        if last_modified:
+            response['Last-Modified'] = last_modified
+    response['ETag'] = etag
+    response['X-Robots-Tag'] = 'noindex, noodp, noarchive'
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
+
+
+@require_GET
+def sitemap_xml(request):
+    """sitemap.xml - every URL, or the sitemap index once there are too many"""
+    return serve_sitemap(request)
+
+
+@require_GET
+def sitemap_section(request, section):
+    """One section of the sitemap index, paginated with ?p="""
+    return serve_sitemap(request, section)
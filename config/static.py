@@ -0,0 +1,116 @@
+"""
+Static files with content-hashed names, precompressed at collectstatic time
+
+collectstatic writes every file under a name with its content hash plus a
+.gz copy of the compressible ones. serve_static hands out the .gz copy to
+clients that accept gzip, hashed names are cached for a year as immutable.
+Nothing is compressed while serving a request.
+"""
+import gzip
+import mimetypes
+import os
+import posixpath
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage, staticfiles_storage
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.base import ContentFile
+from django.http import FileResponse, Http404, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.mjs', '.map', '.json', '.html', '.txt', '.xml', '.svg',
+    '.ico', '.ttf', '.otf', '.eot', '.webmanifest',
+)
+
+# Only keep the .gz copy if it saves at least this share of the bytes
+MIN_COMPRESSION_SAVING = 0.05
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+# Files without a hash in the name, e.g. favicon.ico, may change under the same URL
+REVALIDATE_CACHE_CONTROL = 'public, max-age=0, must-revalidate'
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """ManifestStaticFilesStorage that also writes a .gz copy of compressible files"""
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+
+        names = set(paths) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if name.endswith(COMPRESSIBLE_EXTENSIONS) and self.compress(name):
+                yield name, f'{name}.gz', True
+
+    def compress(self, name):
+        """Write name.gz, returns False if compressing didn't pay off"""
+        with self.open(name) as f:
+            content = f.read()
+        # mtime=0 keeps the output identical across deploys
+        compressed = gzip.compress(content, compresslevel=9, mtime=0)
+
+        gzip_name = f'{name}.gz'
+        if self.exists(gzip_name):
+            self.delete(gzip_name)
+        if len(compressed) > len(content) * (1 - MIN_COMPRESSION_SAVING):
+            return False
+        self._save(gzip_name, ContentFile(compressed))
+        return True
+
+
+def accepts_gzip(request) -> bool:
+    for coding in request.META.get('HTTP_ACCEPT_ENCODING', '').split(','):
+        name, _sep, params = coding.strip().partition(';')
+        if name.strip().lower() in ('gzip', '*'):
+            quality = params.strip().replace(' ', '')
+            return quality not in ('q=0', 'q=0.0', 'q=0.00', 'q=0.000')
+    return False
+
+
+def gzip_etag(etag) -> str:
+    """ETag of the gzip copy of a body, a strong ETag must differ per encoding"""
+    return f'{etag[:-1]}-gz"'
+
+
+_hashed_names = None
+
+
+def is_hashed(name) -> bool:
+    """Whether name is one of the content-hashed names from the manifest"""
+    global _hashed_names
+    if _hashed_names is None:
+        _hashed_names = frozenset(getattr(staticfiles_storage, 'hashed_files', {}).values())
+    return name in _hashed_names
+
+
+def serve_static(request, path):
+    """Serve a collected static file, the .gz copy when the client accepts gzip"""
+    name = posixpath.normpath(path).lstrip('/')
+    try:
+        fullpath = staticfiles_storage.path(name)
+    except SuspiciousFileOperation:
+        raise Http404('Static file not found')
+    if not os.path.isfile(fullpath):
+        raise Http404('Static file not found')
+
+    served = fullpath
+    encoded = accepts_gzip(request) and os.path.isfile(f'{fullpath}.gz')
+    if encoded:
+        served = f'{fullpath}.gz'
+
+    stat = os.stat(served)
+    if not was_modified_since(request.META.get('HTTP_IF_MODIFIED_SINCE'), stat.st_mtime):
+        response = HttpResponseNotModified()
+    else:
+        content_type, _encoding = mimetypes.guess_type(name)
+        response = FileResponse(open(served, 'rb'), content_type=content_type or 'application/octet-stream')
+        response['Last-Modified'] = http_date(stat.st_mtime)
+        if encoded:
+            response['Content-Encoding'] = 'gzip'
+
+    response['Cache-Control'] = IMMUTABLE_CACHE_CONTROL if is_hashed(name) else REVALIDATE_CACHE_CONTROL
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
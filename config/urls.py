@@ -20,74 +20,21 @@ from django.conf import settings
 from django.conf.urls.static import static
 from django.contrib.staticfiles.urls import staticfiles_urlpatterns
 from django.views.generic.base import TemplateView
-from django.contrib.sitemaps.views import sitemap
-from .sitemaps import StaticViewSitemap, GameSitemap
-from django.http import HttpResponse
-from django.views import View
-from django.utils import timezone
-
-sitemaps = {
-    'static': StaticViewSitemap,
-    'games': GameSitemap,  # If you have games
-}
-class SitemapXMLView(View):
-    def get(self, request):
-        # Always use production domain
-        base_url = 'https://vidadenoche.com'
-        current_date = timezone.now().strftime('%Y-%m-%d')
-
-        # Simple sitemap with just main pages - no individual games
-        sitemap_xml = f'''<?xml version="1.0" encoding="UTF-8"?>
-<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9"
-        xmlns:xhtml="http://www.w3.org/1999/xhtml">
-    <url>
-        <loc>{base_url}/</loc>
-        <lastmod>{current_date}</lastmod>
-        <changefreq>weekly</changefreq>
-        <priority>1.0</priority>
-        <xhtml:link rel="alternate" hreflang="es" href="{base_url}/"/>
-        <xhtml:link rel="alternate" hreflang="en" href="{base_url}/en/"/>
-        <xhtml:link rel="alternate" hreflang="uk" href="{base_url}/uk/"/>
-    </url>
-    <url>
-        <loc>{base_url}/games/</loc>
-        <lastmod>{current_date}</lastmod>
-        <changefreq>weekly</changefreq>
-        <priority>0.9</priority>
-        <xhtml:link rel="alternate" hreflang="es" href="{base_url}/games/"/>
-        <xhtml:link rel="alternate" hreflang="en" href="{base_url}/en/games/"/>
-        <xhtml:link rel="alternate" hreflang="uk" href="{base_url}/uk/games/"/>
-    </url>
-    <url>
-        <loc>{base_url}/contact/</loc>
-        <lastmod>{current_date}</lastmod>
-        <changefreq>monthly</changefreq>
-        <priority>0.7</priority>
-        <xhtml:link rel="alternate" hreflang="es" href="{base_url}/contact/"/>
-        <xhtml:link rel="alternate" hreflang="en" href="{base_url}/en/contact/"/>
-        <xhtml:link rel="alternate" hreflang="uk" href="{base_url}/uk/contact/"/>
-    </url>
-    <url>
-        <loc>{base_url}/reservations/</loc>
-        <lastmod>{current_date}</lastmod>
-        <changefreq>daily</changefreq>
-        <priority>0.8</priority>
-        <xhtml:link rel="alternate" hreflang="es" href="{base_url}/reservations/"/>
-        <xhtml:link rel="alternate" hreflang="en" href="{base_url}/en/reservations/"/>
-        <xhtml:link rel="alternate" hreflang="uk" href="{base_url}/uk/reservations/"/>
-    </url>
-</urlset>'''
-        
-        return HttpResponse(sitemap_xml, content_type='application/xml')
+from .sitemaps import sitemap_section, sitemap_xml
+from .static import serve_static
+from user.views import home_view
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('sitemap.xml', SitemapXMLView.as_view(), name='sitemap'),
+    path('sitemap.xml', sitemap_xml, name='sitemap'),
+    path('sitemap-<slug:section>.xml', sitemap_section, name='sitemap-section'),
     path('robots.txt', TemplateView.as_view(template_name='robots.txt', content_type='text/plain')),
     path('',include('user.urls',namespace='user')),
     path('api/games/',include('games.urls',namespace='games')),
     path('billing/',include('billing.urls',namespace='billing')),
-    re_path(r'^(?!sitemap\.xml|robots\.txt).*$', TemplateView.as_view(template_name='index.html')),
+    # Collected files, the development server serves static/ through its finders instead
+    re_path(r'^%s(?P<path>.+)$' % settings.STATIC_URL.lstrip('/'), serve_static, name='static'),
+    re_path(r'^(?!sitemap[\w-]*\.xml|robots\.txt).*$', home_view),
 
 ]
 if settings.DEBUG:
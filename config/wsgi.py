@@ -1,4 +1,5 @@
 import os
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 from dotenv import load_dotenv
 
@@ -18,3 +19,9 @@ os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
 
 
 application = get_wsgi_application()
+
+
+# The expiry sweeper belongs to server processes, not to migrate, shell or cron commands
+if settings.RESERVATION_EXPIRY_SWEEP_SECONDS:
+    from games.expiry import start_expiry_scheduler
+    start_expiry_scheduler()
@@ -189,6 +189,9 @@ export function Reservations() {
   const [gameError, setGameError] = useState(null);
   const [userReservations, setUserReservations] = useState([]);
   const [reservationsLoading, setReservationsLoading] = useState(false);
+  const [reservationsNext, setReservationsNext] = useState(null);
+  const [reservationsTotal, setReservationsTotal] = useState(0);
+  const [loadingMoreReservations, setLoadingMoreReservations] = useState(false);
   const [step, setStep] = useState(1);
   const [timeSlots, setTimeSlots] = useState([]);
   const [loading, setLoading] = useState(false);
@@ -221,27 +224,60 @@ export function Reservations() {
     };
   }, [i18n]);
 
+  // API path of a page link, the language is already sent by makeAPIRequest
+  const reservationsPagePath = (link) => {
+    const url = new URL(link, window.location.origin);
+    url.searchParams.delete('lang');
+    url.searchParams.set('count', '0');
+    return `${url.pathname}${url.search}`;
+  };
+
   const fetchUserReservations = async () => {
     setReservationsLoading(true);
     try {
       const response = await makeAPIRequest('/api/reservations/', {}, csrfToken);
       
       if (response.ok) {
+        // The list comes in pages of {count, next, previous, results}, newest first.
+        // Only the first page is loaded here, older ones on demand
         const data = await response.json();
-        setUserReservations(data);
+        setUserReservations(data.results);
+        setReservationsTotal(data.count);
+        setReservationsNext(data.next);
       } else if (response.status === 401) {
         setUserReservations([]);
+        setReservationsNext(null);
       } else {
         console.error('Failed to fetch reservations');
         setUserReservations([]);
+        setReservationsNext(null);
       }
     } catch (error) {
       console.error('Error fetching reservations:', error);
       setUserReservations([]);
+      setReservationsNext(null);
     }
     setReservationsLoading(false);
   };
 
+  const loadMoreReservations = async () => {
+    if (!reservationsNext) return;
+    setLoadingMoreReservations(true);
+    try {
+      const response = await makeAPIRequest(reservationsPagePath(reservationsNext), {}, csrfToken);
+      if (response.ok) {
+        const data = await response.json();
+        setUserReservations((loaded) => [...loaded, ...data.results]);
+        setReservationsNext(data.next);
+      } else {
+        console.error('Failed to fetch more reservations');
+      }
+    } catch (error) {
+      console.error('Error fetching more reservations:', error);
+    }
+    setLoadingMoreReservations(false);
+  };
+
   useEffect(() => {
     if (!csrfLoading) {
       fetchUserReservations();
@@ -713,6 +749,17 @@ export function Reservations() {
                       </div>
                     </div>
                   ))}
+                  {reservationsNext && (
+                    <div className="flex justify-center">
+                      <Button
+                        variant="outline"
+                        onClick={loadMoreReservations}
+                        disabled={loadingMoreReservations}
+                      >
+                        {loadingMoreReservations ? t('common.loading') : t('reservations.loadMore')}
+                      </Button>
+                    </div>
+                  )}
                 </div>
               ) : (
                 <div className="text-center py-12">
@@ -788,14 +835,14 @@ export function Reservations() {
             <span>{t('difficulty.' + game.difficulty.toLowerCase())}</span>
           </div>
           
-          {userReservations.length > 0 && (
+          {reservationsTotal > 0 && (
             <div className="mt-6">
               <Button
                 variant="outline"
                 onClick={() => navigate('/reservations')}
                 className="mb-4"
               >
-                {t('reservations.viewMy')} ({userReservations.length})
+                {t('reservations.viewMy')} ({reservationsTotal})
               </Button>
             </div>
           )}
@@ -16,6 +16,10 @@ from django.utils.html import format_html
 from django.utils.translation import gettext_lazy as _
 from .models import Game
 from .models import Reservation
+from .search import search_games
+from .occupancy import CapacityError
+from django.contrib import messages
+from django.http import HttpResponseRedirect
 
 class GameAdminForm(ModelForm):
     title_ru = CharField(
@@ -100,7 +104,8 @@ class GameAdmin(admin.ModelAdmin):
         'is_active', 'translation_status'
     ]
     
-    search_fields = ['title__ru']
+    # Matched through the search index, every language of title and description
+    search_fields = ['title']
     
     readonly_fields = ['translation_status', 'created_at', 'updated_at', 'get_translations_display']
     
@@ -116,7 +121,7 @@ class GameAdmin(admin.ModelAdmin):
             'fields': ('price', 'max_players', 'duration')
         }),
         ('Рабочие часы', {
-            'fields': ('working_hours_start', 'working_hours_end')
+            'fields': ('working_hours_start', 'working_hours_end', 'slot_interval', 'buffer_minutes')
         }),
         ('Настройки', {
             'fields': ('is_featured', 'is_active')
@@ -137,6 +142,11 @@ class GameAdmin(admin.ModelAdmin):
             'all': ('admin/css/game_toggle.css',)
         }
     
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term:
+            return queryset, False
+        return search_games(queryset, search_term), False
+    
     def get_title_display(self, obj):
         return obj.get_title('ru') or "Без названия"
     get_title_display.short_description = 'Название'
@@ -189,4 +199,17 @@ class GameAdmin(admin.ModelAdmin):
         )
     retranslate_games.short_description = 'Перевести выбранные игры заново'
 
-admin.site.register(Reservation)
\ No newline at end of file
+@admin.register(Reservation)
+class ReservationAdmin(admin.ModelAdmin):
+    # Capacity is validated by Reservation.clean, the save claims it for real
+    list_display = ['reference_number', 'game', 'date', 'time', 'players', 'status']
+    list_filter = ['status', 'date', 'game']
+    search_fields = ['reference_number', 'email']
+
+    def changeform_view(self, request, object_id=None, form_url='', extra_context=None):
+        try:
+            return super().changeform_view(request, object_id, form_url, extra_context)
+        except CapacityError as e:
+            # Booked by somebody else between validation and save, nothing was stored
+            self.message_user(request, f'Недостаточно мест: {e}', messages.ERROR)
+            return HttpResponseRedirect(request.get_full_path())
\ No newline at end of file
@@ -0,0 +1,114 @@
+"""
+Everything the SPA needs on first load in one response
+
+The bundle is built from rendered JSON fragments: featured games and stats
+are cached under the catalog version, contacts until they are edited, and
+the choice labels are localized once per process. A request only joins the
+bytes and adds the CSRF token. The ETag combines the fragment ETags with
+the CSRF secret, so a repeat visit gets a 304 without rendering anything.
+"""
+import hashlib
+import json
+from functools import lru_cache
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import translation
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+from user.models import Contacts
+from user.serializers import ContactsSerializer
+from .catalog import CATALOG_CACHE_TIMEOUT, get_catalog_version
+from .models import CATEGORY_CHOICES, DIFFICULTY_CHOICES, Game
+from .pagination import FeaturedGameKeysetPagination
+from .serializers import FeaturedGameSerializer
+
+FRAGMENTS = ('featured', 'categories', 'difficulties', 'stats', 'contacts')
+
+CONTACTS_KEY = 'bootstrap:contacts'
+
+
+def render_fragment(data):
+    """(etag, JSON bytes) of a fragment"""
+    # JSONRenderer renders None as an empty body
+    content = JSONRenderer().render(data) if data is not None else b'null'
+    return hashlib.md5(content).hexdigest(), content
+
+
+def get_game_stats() -> dict:
+    return Game.objects.filter(is_active=True).order_by().aggregate(
+        total_games=Count('id'),
+        featured_games=Count('id', filter=Q(is_featured=True)),
+        categories_count=Count('category', distinct=True),
+    )
+
+
+def _featured(request, language):
+    # The first page of api/games/featured/
+    games = (
+        Game.objects.filter(is_featured=True, is_active=True)
+        .localized(language)
+        .order_by(*FeaturedGameKeysetPagination.ordering)[:api_settings.PAGE_SIZE]
+    )
+    return FeaturedGameSerializer(games, many=True, context={'request': request, 'language': language}).data
+
+
+def _contacts():
+    contacts = Contacts.objects.first()
+    return ContactsSerializer(contacts).data if contacts else None
+
+
+@lru_cache(maxsize=None)
+def choices_fragment(choices_name, language):
+    """Labels are gettext_lazy, they're evaluated once per language and process"""
+    choices = {'categories': CATEGORY_CHOICES, 'difficulties': DIFFICULTY_CHOICES}[choices_name]
+    with translation.override(language):
+        return render_fragment([{'value': value, 'label': str(label)} for value, label in choices])
+
+
+def get_fragments(request, language) -> dict:
+    """Rendered fragments by name, missing ones are built and cached"""
+    version = get_catalog_version()
+    # Image URLs are absolute, so the featured fragment depends on the host
+    host = hashlib.md5(f'{request.scheme}://{request.get_host()}'.encode()).hexdigest()
+    keys = {
+        'featured': f'catalog:{version}:bootstrap:featured:{language}:{host}',
+        'stats': f'catalog:{version}:bootstrap:stats',
+        'contacts': CONTACTS_KEY,
+    }
+    builders = {
+        'featured': lambda: _featured(request, language),
+        'stats': get_game_stats,
+        'contacts': _contacts,
+    }
+
+    cached = cache.get_many(keys.values())
+    fragments = {}
+    for name, key in keys.items():
+        if key in cached:
+            fragments[name] = cached[key]
+        else:
+            fragments[name] = render_fragment(builders[name]())
+            cache.set(key, fragments[name], timeout=CATALOG_CACHE_TIMEOUT)
+
+    for name in ('categories', 'difficulties'):
+        fragments[name] = choices_fragment(name, language)
+    return fragments
+
+
+def bootstrap_etag(fragments, language, csrf_secret) -> str:
+    parts = [language, csrf_secret] + [fragments[name][0] for name in FRAGMENTS]
+    return hashlib.md5(':'.join(parts).encode()).hexdigest()
+
+
+def render_bootstrap(fragments, language, csrf_token) -> bytes:
+    body = [b'{"language":', json.dumps(language).encode()]
+    for name in FRAGMENTS:
+        body += [b',"', name.encode(), b'":', fragments[name][1]]
+    body += [b',"csrfToken":', json.dumps(csrf_token).encode(), b'}']
+    return b''.join(body)
+
+
+def invalidate_contacts():
+    cache.delete(CONTACTS_KEY)
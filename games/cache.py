@@ -0,0 +1,140 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Tuple
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from .utils import SPAIN_TZ, crosses_midnight, get_available_times, get_spain_now
+
+logger = logging.getLogger(__name__)
+
+# Upper bound for how long an availability response is reused, entries of
+# older versions are never read again and just run out
+AVAILABILITY_CACHE_TIMEOUT = getattr(settings, 'AVAILABILITY_CACHE_TIMEOUT', 300)
+
+STATS_KEYS = {
+    'hits': 'availability:stats:hits',
+    'misses': 'availability:stats:misses',
+    'evictions': 'availability:stats:evictions',
+}
+
+
+def _generation_key(game_id) -> str:
+    return f'availability:generation:{game_id}'
+
+
+def _date_version_key(game_id, selected_date: str) -> str:
+    return f'availability:version:{game_id}:{selected_date}'
+
+
+def _new_version() -> int:
+    # Never reuses the number of a counter the backend evicted, whose entries may still be cached
+    return time.time_ns()
+
+
+def _bump(key: str):
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, _new_version(), timeout=None)
+
+
+def _get_versions(game_id, selected_date: str) -> Tuple[int, int]:
+    """(game generation, date version), created on first use"""
+    keys = [_generation_key(game_id), _date_version_key(game_id, selected_date)]
+    values = cache.get_many(keys)
+    versions = []
+    for key in keys:
+        if key not in values:
+            cache.add(key, _new_version(), timeout=None)
+            values[key] = cache.get(key)
+        versions.append(values[key])
+    return tuple(versions)
+
+
+def availability_cache_key(game_id, selected_date: str, language: str, versions) -> str:
+    """
+    Responses are keyed by the game's generation and the date's version. Both
+    are bumped once the change commits, so a read that started before it can
+    only store under the old versions, which nobody reads again
+    """
+    generation, date_version = versions
+    return f'availability:{game_id}:{generation}:{date_version}:{selected_date}:{language}'
+
+
+def _count(stat: str, amount: int = 1):
+    key = STATS_KEYS[stat]
+    try:
+        cache.incr(key, amount)
+    except ValueError:
+        # Counter missing (first use or evicted by the backend)
+        if not cache.add(key, amount, timeout=None):
+            cache.incr(key, amount)
+
+
+def _cache_timeout(result: Dict, now_spain: datetime) -> int:
+    """
+    Seconds until the response goes stale on its own
+
+    Slots that already started are filtered out of today's response, so a cached
+    response must not outlive the start of its first slot.
+    """
+    timeout = AVAILABILITY_CACHE_TIMEOUT
+    if result['time_slots']:
+        first_slot = datetime.strptime(f"{result['date']} {result['time_slots'][0]['time']}", '%Y-%m-%d %H:%M')
+        seconds_to_first_slot = (SPAIN_TZ.localize(first_slot) - now_spain).total_seconds()
+        timeout = min(timeout, int(seconds_to_first_slot) + 1)
+    return max(1, timeout)
+
+
+def get_cached_available_times(game_id, selected_date: str, language: str = 'ru') -> Dict:
+    """get_available_times behind the cache, keyed by (game, date, language) and their versions"""
+    key = availability_cache_key(game_id, selected_date, language, _get_versions(game_id, selected_date))
+    result = cache.get(key)
+    if result is not None:
+        _count('hits')
+        return result
+
+    _count('misses')
+    result = get_available_times(game_id, selected_date, language)
+
+    # Errors are cheap to recompute and may depend on input that isn't part of the key
+    if 'error' not in result:
+        cache.set(key, result, timeout=_cache_timeout(result, get_spain_now()))
+    return result
+
+
+def invalidate_availability(keys: Iterable[Tuple[int, object]]):
+    """Drop the cached responses of the given (game_id, date) pairs in every language"""
+    keys = set(keys)
+    for game_id, affected_date in keys:
+        date_str = affected_date.strftime('%Y-%m-%d') if hasattr(affected_date, 'strftime') else affected_date
+        _bump(_date_version_key(game_id, date_str))
+    if keys:
+        _count('evictions', len(keys))
+
+
+def invalidate_game_availability(game_id):
+    """Drop every cached date of a game, e.g. after its schedule or title changed"""
+    _bump(_generation_key(game_id))
+    _count('evictions')
+
+
+def reservation_availability_keys(game, reservation_date) -> set:
+    """(game_id, date) pairs whose availability a reservation on reservation_date affects"""
+    keys = {(game.id, reservation_date)}
+    if crosses_midnight(game):
+        # Late slots of the previous day overlap reservations right after midnight
+        keys.add((game.id, reservation_date - timedelta(days=1)))
+    return keys
+
+
+def get_availability_cache_stats() -> Dict:
+    """Hit, miss and eviction counters, evictions count invalidated dates and games"""
+    values = cache.get_many(list(STATS_KEYS.values()))
+    stats = {stat: values.get(key, 0) for stat, key in STATS_KEYS.items()}
+    lookups = stats['hits'] + stats['misses']
+    stats['hit_ratio'] = round(stats['hits'] / lookups, 4) if lookups else None
+    return stats
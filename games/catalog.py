@@ -0,0 +1,195 @@
+"""
+Pre-rendered game catalog responses
+
+The catalog changes a few times a week but is read constantly, so the rendered
+JSON of each (endpoint, language, page) is kept in the shared cache as bytes
+together with its ETag. Every worker reads the same version stamp, bumping it
+on any Game change orphans all rendered pages at once. Production settings
+require a shared cache, with a process-local one entries only live briefly.
+"""
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.core.cache.backends.locmem import LocMemCache
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
+
+from .versions import catalog_etag
+
+
+def cache_is_shared() -> bool:
+    """Whether all workers see the same entries of the default cache"""
+    return not isinstance(caches['default'], LocMemCache)
+
+
+# Safety net, entries are normally replaced through the version stamp. A
+# process-local cache keeps a version stamp per worker, so a change made in one
+# worker only reaches the others once their entries expire
+CATALOG_CACHE_TIMEOUT = getattr(settings, 'CATALOG_CACHE_TIMEOUT', 60 * 60 * 24)
+if not cache_is_shared():
+    CATALOG_CACHE_TIMEOUT = min(CATALOG_CACHE_TIMEOUT, getattr(settings, 'LOCAL_CACHE_TIMEOUT', 10))
+
+CATALOG_LANGUAGES = ['en', 'es', 'uk']
+
+# Only these query parameters are cached, anything else is rendered per request
+CATALOG_CACHE_PARAMS = {'lang', 'cursor', 'count', 'fields'}
+
+# ?fields=compact - what list screens need to draw a game card
+COMPACT_FIELDS = ('id', 'title', 'category', 'price', 'image', 'image_placeholder', 'max_players')
+
+VERSION_KEY = 'catalog:version'
+
+
+def get_catalog_language(request) -> str:
+    """Language of the catalog from the lang parameter, English by default"""
+    language = request.GET.get('lang', 'en')
+    return language if language in CATALOG_LANGUAGES else 'en'
+
+
+def get_catalog_version() -> int:
+    return cache.get_or_set(VERSION_KEY, 1, timeout=None)
+
+
+def bump_catalog_version():
+    """Orphan every rendered catalog page in every worker"""
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.set(VERSION_KEY, 2, timeout=None)
+
+
+def catalog_cache_key(endpoint: str, request):
+    """
+    Cache key of a catalog request, None if the request shouldn't be cached
+
+    Pagination links repeat the request URL, so the full path and host are
+    part of the key and only requests limited to lang and page are cached.
+    """
+    params = request.GET
+    if set(params) - CATALOG_CACHE_PARAMS:
+        return None
+    if 'lang' in params and params['lang'] not in CATALOG_LANGUAGES:
+        return None
+    if len(params.get('cursor', '')) > 200 or params.get('count', '0') not in ('0', '1'):
+        return None
+    # Arbitrary field lists would multiply the cached variants, only the preset is cached
+    if 'fields' in params and params['fields'] != 'compact':
+        return None
+
+    location = hashlib.md5(
+        f'{request.scheme}://{request.get_host()}{request.get_full_path()}'.encode()
+    ).hexdigest()
+    return f'catalog:{get_catalog_version()}:{endpoint}:{get_catalog_language(request)}:{location}'
+
+
+def get_requested_fields(request, available):
+    """
+    Field names selected with ?fields= and ?omit=, None when all are wanted
+
+    fields takes a comma separated list or the "compact" preset, omit drops
+    names from the selection. Unknown names are a 400.
+    """
+    fields_param = request.GET.get('fields')
+    omit_param = request.GET.get('omit')
+    if not fields_param and not omit_param:
+        return None
+
+    if fields_param == 'compact':
+        fields = list(COMPACT_FIELDS)
+    elif fields_param:
+        fields = [name for name in fields_param.split(',') if name]
+    else:
+        fields = list(available)
+    omit = {name for name in (omit_param or '').split(',') if name}
+
+    unknown = (set(fields) | omit) - set(available)
+    if unknown:
+        raise ValidationError({'fields': f'Unknown fields: {", ".join(sorted(unknown))}'})
+
+    return [name for name in fields if name not in omit]
+
+
+class SparseFieldsetViewMixin:
+    """
+    ?fields= / ?omit= for game endpoints
+
+    The serializer drops the fields that weren't asked for and the queryset
+    only reads the columns the remaining fields need.
+    """
+
+    def get_requested_fields(self):
+        if not hasattr(self, '_requested_fields'):
+            self._requested_fields = get_requested_fields(
+                self.request, self.get_serializer_class().get_available_fields()
+            )
+        return self._requested_fields
+
+    def wants_any(self, *names):
+        fields = self.get_requested_fields()
+        return fields is None or any(name in fields for name in names)
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_requested_fields()
+        return context
+
+    def get_queryset(self):
+        return self.narrow_queryset(super().get_queryset())
+
+    def narrow_queryset(self, queryset):
+        """Read only the columns of the requested fields"""
+        fields = self.get_requested_fields()
+        if fields is None:
+            return queryset
+        # Inactive games are dropped by the serializer and the paginator reads
+        # the sort key of the page edges, so those columns are always loaded
+        columns = self.get_serializer_class().get_columns(fields) | {'id', 'is_active'}
+        model_fields = {field.name for field in queryset.model._meta.concrete_fields}
+        ordering = getattr(self.pagination_class, 'ordering', ())
+        columns.update(field.lstrip('-') for field in ordering if field.lstrip('-') in model_fields)
+        return queryset.only(*columns)
+
+
+class CachedCatalogMixin(SparseFieldsetViewMixin):
+    """
+    Serve a public game list from rendered bytes in the cache
+
+    A hit costs two cache reads and no ORM query or serializer call. Variants
+    that aren't cached are rendered per request but still answer a matching
+    If-None-Match with a 304 from catalog_etag.
+    """
+    catalog_endpoint = None
+
+    def get_serializer_context(self):
+        """Pass language to serializer"""
+        context = super().get_serializer_context()
+        context['language'] = get_catalog_language(self.request)
+        return context
+
+    def get(self, request, *args, **kwargs):
+        key = catalog_cache_key(self.catalog_endpoint, request)
+        if key is None:
+            etag = catalog_etag(request)
+            response = get_conditional_response(request._request, etag=etag)
+            if response is None:
+                response = super().get(request, *args, **kwargs)
+            response['ETag'] = etag
+            return response
+
+        entry = cache.get(key)
+        if entry is None:
+            response = super().get(request, *args, **kwargs)
+            content = JSONRenderer().render(response.data)
+            entry = (quote_etag(hashlib.md5(content).hexdigest()), content)
+            cache.set(key, entry, timeout=CATALOG_CACHE_TIMEOUT)
+
+        etag, content = entry
+        response = get_conditional_response(request._request, etag=etag)
+        if response is None:
+            response = HttpResponse(content, content_type='application/json')
+        response['ETag'] = etag
+        return response
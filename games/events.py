@@ -0,0 +1,201 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, Iterable, Set, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections
+
+from .models import Game, SlotOccupancy
+from .occupancy import reservation_slot_keys
+from .utils import build_slot_entry
+
+logger = logging.getLogger(__name__)
+
+# Events buffered per client before the oldest ones are dropped
+SUBSCRIBER_QUEUE_SIZE = 100
+
+# Redis pub/sub channel carrying the touched slots between processes
+EVENTS_CHANNEL = 'availability:events'
+
+# Seconds between reconnects to a lost event channel
+LISTENER_RETRY_SECONDS = 5
+
+
+class AvailabilityBroker:
+    """
+    In-process fan-out of capacity changes to stream subscribers
+
+    Each subscriber is an asyncio queue living on the event loop of the ASGI worker,
+    so idle connections cost a queue, not a thread. Publishing is thread-safe and is
+    called from the (sync) request threads that commit reservation changes, or from
+    the listener thread relaying changes made in other processes.
+    """
+
+    def __init__(self):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def subscribe(self, key: Tuple[int, str]):
+        subscription = (asyncio.get_running_loop(), asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE))
+        with self._lock:
+            self._subscribers[key].add(subscription)
+        return subscription
+
+    def unsubscribe(self, key: Tuple[int, str], subscription):
+        with self._lock:
+            subscribers = self._subscribers.get(key)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[key]
+
+    def has_subscribers(self, key: Tuple[int, str]) -> bool:
+        return key in self._subscribers
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(subscribers) for subscribers in self._subscribers.values())
+
+    def publish(self, key: Tuple[int, str], message: Dict):
+        with self._lock:
+            subscribers = list(self._subscribers.get(key, ()))
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(_deliver, queue, message)
+            except RuntimeError:
+                # The subscriber's loop is already closed, it will unsubscribe itself
+                pass
+
+
+def _deliver(queue: asyncio.Queue, message: Dict):
+    if queue.full():
+        # A slow client loses the oldest delta rather than stalling everybody else
+        queue.get_nowait()
+    queue.put_nowait(message)
+
+
+broker = AvailabilityBroker()
+
+
+def format_event(event: str, data: Dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def changed_slots(changed: Iterable[Tuple]) -> Dict[Tuple[int, str], Set[str]]:
+    """Slot starts (HH:MM) touched per (game_id, date) by the given reservation states"""
+    slots_by_key = defaultdict(set)
+    for game, reservation_date, reservation_time in changed:
+        for slot_date, slot_time in reservation_slot_keys(game, reservation_date, reservation_time):
+            slots_by_key[(game.id, slot_date.strftime('%Y-%m-%d'))].add(slot_time.strftime('%H:%M'))
+    return slots_by_key
+
+
+def publish_capacity_changes(changed: Iterable[Tuple]):
+    """
+    Push the new capacity of every slot touched by the given reservation states
+
+    changed holds (game, reservation date, reservation time) tuples as returned by
+    sync_reservation_occupancy. With AVAILABILITY_EVENTS_URL set the touched slots
+    go out on the shared channel and every process delivers them to its own
+    subscribers, otherwise only subscribers of this process are reached.
+    """
+    slots_by_key = changed_slots(changed)
+    if not slots_by_key:
+        return
+
+    if settings.AVAILABILITY_EVENTS_URL:
+        get_redis().publish(EVENTS_CHANNEL, json.dumps([
+            [game_id, slot_date, sorted(slot_times)]
+            for (game_id, slot_date), slot_times in slots_by_key.items()
+        ]))
+    else:
+        deliver_capacity_changes(slots_by_key)
+
+
+def deliver_capacity_changes(slots_by_key: Dict[Tuple[int, str], Set[str]]):
+    """
+    Send the current capacity of the touched slots to this process's subscribers
+
+    Nothing is read from the database unless somebody is subscribed to an
+    affected (game, date).
+    """
+    slots_by_key = {key: slot_times for key, slot_times in slots_by_key.items() if broker.has_subscribers(key)}
+    if not slots_by_key:
+        return
+
+    games = Game.objects.in_bulk({game_id for game_id, _date in slots_by_key})
+    used = {}
+    for game_id, slot_date, slot_time, used_capacity in SlotOccupancy.objects.filter(
+        game_id__in=games,
+        date__in={slot_date for _game_id, slot_date in slots_by_key},
+    ).order_by().values_list('game_id', 'date', 'time', 'used_capacity'):
+        used[(game_id, slot_date.strftime('%Y-%m-%d'), slot_time.strftime('%H:%M'))] = used_capacity
+
+    for (game_id, slot_date), slot_times in slots_by_key.items():
+        if game_id not in games:
+            continue
+        broker.publish((game_id, slot_date), {
+            'game_id': game_id,
+            'date': slot_date,
+            'time_slots': [
+                build_slot_entry(games[game_id], slot_time, used.get((game_id, slot_date, slot_time), 0))
+                for slot_time in sorted(slot_times)
+            ],
+        })
+
+
+_redis = None
+
+
+def get_redis():
+    """Client of the shared event channel, one connection pool per process"""
+    global _redis
+    if _redis is None:
+        import redis
+        _redis = redis.Redis.from_url(settings.AVAILABILITY_EVENTS_URL)
+    return _redis
+
+
+_listener = None
+_listener_lock = threading.Lock()
+
+
+def _listen():
+    while True:
+        try:
+            pubsub = get_redis().pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(EVENTS_CHANNEL)
+            for message in pubsub.listen():
+                try:
+                    deliver_capacity_changes({
+                        (game_id, slot_date): set(slot_times)
+                        for game_id, slot_date, slot_times in json.loads(message['data'])
+                    })
+                except Exception as e:
+                    logger.error(f"Error delivering capacity changes: {e}")
+                finally:
+                    close_old_connections()
+        except Exception as e:
+            logger.error(f"Availability event channel lost, reconnecting: {e}")
+            time.sleep(LISTENER_RETRY_SECONDS)
+
+
+def start_event_listener():
+    """
+    Start the thread that relays the shared channel to this process's subscribers
+
+    Only needed in processes serving streams, it's started on their first
+    subscriber. Does nothing without AVAILABILITY_EVENTS_URL.
+    """
+    global _listener
+
+    if not settings.AVAILABILITY_EVENTS_URL:
+        return
+    with _listener_lock:
+        if _listener is None:
+            _listener = threading.Thread(target=_listen, name='availability-events', daemon=True)
+            _listener.start()
@@ -0,0 +1,153 @@
+"""
+Expiry of unpaid online bookings
+
+A booking made through create_booking holds its slots as 'pending' until
+hold_expires_at. Abandoned checkouts are cancelled here in batches so their
+capacity goes back on sale.
+"""
+import logging
+import threading
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.utils import timezone
+
+from .models import Reservation
+from .occupancy import apply_occupancy_delta
+
+logger = logging.getLogger(__name__)
+
+
+def get_hold_expiry(now=None):
+    """Moment until which a new pending booking keeps its slots"""
+    return (now or timezone.now()) + timedelta(minutes=settings.RESERVATION_HOLD_MINUTES)
+
+
+def expire_checkout_sessions(session_ids):
+    """
+    Close the Checkout sessions of expired holds, so a customer can't pay for
+    a reservation whose slot went back on sale
+    """
+    from billing.service import Stripe
+
+    stripe_handler = Stripe()
+    for session_id in session_ids:
+        try:
+            stripe_handler.expire(session_id)
+        except Exception as e:
+            # Already paid or expired by Stripe, a late payment is settled by the webhook
+            logger.warning(f"Could not expire checkout session {session_id}: {e}")
+
+
+def _expire_batch(now, batch_size):
+    """Cancel one batch of expired holds, returns the number of cancelled reservations"""
+    from billing.models import Payment
+    from .signals import publish_availability_change
+
+    with transaction.atomic():
+        # Concurrent sweepers take disjoint batches instead of waiting on each other
+        expired = list(
+            Reservation.objects
+            .select_for_update(skip_locked=True, of=('self',))
+            .select_related('game')
+            .filter(status='pending', hold_expires_at__lte=now)
+            .order_by('hold_expires_at')
+            .only('id', 'date', 'time', 'players', 'game')[:batch_size]
+        )
+        if not expired:
+            return 0
+
+        ids = [reservation.id for reservation in expired]
+        # A bulk update skips the post_save signals, occupancy is released below instead
+        Reservation.objects.filter(id__in=ids).update(
+            status='cancelled',
+            hold_expires_at=None,
+            updated_at=now
+        )
+
+        released = defaultdict(int)
+        games = {}
+        for reservation in expired:
+            games[reservation.game_id] = reservation.game
+            released[(reservation.game_id, reservation.date, reservation.time)] += reservation.players
+
+        changed = []
+        for (game_id, reservation_date, reservation_time), players in released.items():
+            apply_occupancy_delta(games[game_id], reservation_date, reservation_time, -players)
+            changed.append((games[game_id], reservation_date, reservation_time))
+
+        payments = Payment.objects.filter(invoice__reservation_id__in=ids, status='pending')
+        sessions = list(payments.exclude(reference__isnull=True).exclude(reference='')
+                        .values_list('reference', flat=True))
+        payments.update(status='timeout')
+
+        publish_availability_change(changed)
+        if sessions:
+            transaction.on_commit(lambda: expire_checkout_sessions(sessions))
+
+    return len(expired)
+
+
+def expire_pending_reservations(now=None, batch_size=None):
+    """
+    Cancel every pending reservation whose hold has run out
+
+    Works in batches of RESERVATION_EXPIRY_BATCH_SIZE so a large backlog never
+    holds locks for long. Linked pending payments are marked as 'timeout' and
+    their Checkout sessions are expired.
+    Returns the number of cancelled reservations.
+    """
+    now = now or timezone.now()
+    batch_size = batch_size or settings.RESERVATION_EXPIRY_BATCH_SIZE
+
+    total = 0
+    while True:
+        expired = _expire_batch(now, batch_size)
+        total += expired
+        if expired < batch_size:
+            break
+
+    if total:
+        logger.info(f"Expired {total} unpaid reservations")
+    return total
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def _run_scheduler(interval, stop_event):
+    while not stop_event.wait(interval):
+        try:
+            expire_pending_reservations()
+        except Exception as e:
+            logger.error(f"Error expiring pending reservations: {e}")
+        finally:
+            close_old_connections()
+
+
+def start_expiry_scheduler(interval=None):
+    """
+    Start the in-process sweeper thread, once per process
+
+    Each web worker runs its own sweeper, the row locks keep them from
+    cancelling the same reservation twice. Started from config.wsgi and
+    config.asgi, so management commands never run one. Returns the stop event.
+    """
+    global _scheduler
+
+    interval = interval or settings.RESERVATION_EXPIRY_SWEEP_SECONDS
+    with _scheduler_lock:
+        if _scheduler is None:
+            stop_event = threading.Event()
+            thread = threading.Thread(
+                target=_run_scheduler,
+                args=(interval, stop_event),
+                name='reservation-expiry',
+                daemon=True
+            )
+            thread.start()
+            _scheduler = stop_event
+    return _scheduler
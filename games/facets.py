@@ -0,0 +1,115 @@
+"""
+Facet counts for the game filters
+
+Each facet counts the games that match every other active filter, so a
+selected category still shows how many games the other categories have. All
+counts come from one conditional aggregate over the active games and are
+cached under the catalog version, so any Game change drops them.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count, Q
+from django.utils import translation
+
+from .catalog import CATALOG_CACHE_TIMEOUT, get_catalog_version
+from .models import CATEGORY_CHOICES, DIFFICULTY_CHOICES, STATUS_CHOICES, Game
+from .search import search_games
+
+# Lower bound inclusive, upper bound exclusive, None is open-ended
+PRICE_BUCKETS = ((None, 20), (20, 30), (30, 40), (40, None))
+
+CHOICE_FACETS = {
+    'category': CATEGORY_CHOICES,
+    'difficulty': DIFFICULTY_CHOICES,
+    'status': STATUS_CHOICES,
+}
+
+
+def price_bucket_label(lower, upper) -> str:
+    return f'{lower if lower is not None else ""}-{upper if upper is not None else ""}'
+
+
+def price_bucket_condition(lower, upper) -> Q:
+    condition = Q()
+    if lower is not None:
+        condition &= Q(price__gte=lower)
+    if upper is not None:
+        condition &= Q(price__lt=upper)
+    return condition
+
+
+def filter_conditions(data) -> dict:
+    """One condition per facet from cleaned GameFilter data"""
+    conditions = {
+        facet: Q(**{facet: data[facet]}) if data.get(facet) else Q()
+        for facet in CHOICE_FACETS
+    }
+    price = Q()
+    if data.get('min_price') is not None:
+        price &= Q(price__gte=data['min_price'])
+    if data.get('max_price') is not None:
+        price &= Q(price__lte=data['max_price'])
+    conditions['price'] = price
+    conditions['players'] = Q(max_players__gte=data['players']) if data.get('players') else Q()
+    return conditions
+
+
+def _combine(conditions, skip=None) -> Q:
+    combined = Q()
+    for facet, condition in conditions.items():
+        if facet != skip:
+            combined &= condition
+    return combined
+
+
+def compute_facets(data) -> dict:
+    """Counts per category, difficulty, status and price bucket in one query"""
+    queryset = Game.objects.filter(is_active=True)
+    if data.get('q'):
+        queryset = search_games(queryset, data['q'])
+    conditions = filter_conditions(data)
+
+    aggregates = {'total': Count('id', filter=_combine(conditions))}
+    for facet, choices in CHOICE_FACETS.items():
+        others = _combine(conditions, skip=facet)
+        for value, _label in choices:
+            aggregates[f'{facet}__{value}'] = Count('id', filter=others & Q(**{facet: value}))
+    others = _combine(conditions, skip='price')
+    for index, (lower, upper) in enumerate(PRICE_BUCKETS):
+        aggregates[f'price__{index}'] = Count('id', filter=others & price_bucket_condition(lower, upper))
+
+    counts = queryset.order_by().aggregate(**aggregates)
+
+    facets = {'total': counts['total']}
+    for facet, choices in CHOICE_FACETS.items():
+        facets[facet] = [
+            {'value': value, 'label': str(label), 'count': counts[f'{facet}__{value}']}
+            for value, label in choices
+        ]
+    facets['price'] = [
+        {
+            'value': price_bucket_label(lower, upper),
+            'min': lower,
+            'max': upper,
+            'count': counts[f'price__{index}'],
+        }
+        for index, (lower, upper) in enumerate(PRICE_BUCKETS)
+    ]
+    return facets
+
+
+def get_facets(data, language) -> dict:
+    """Facets of the current filters with labels in language, cached until the catalog changes"""
+    params = '&'.join(f'{name}={data[name]}' for name in sorted(data) if data[name] not in (None, ''))
+    key = 'catalog:{}:facets:{}:{}'.format(
+        get_catalog_version(),
+        language,
+        hashlib.md5(params.encode()).hexdigest()
+    )
+
+    def build():
+        with translation.override(language):
+            return compute_facets(data)
+
+    return cache.get_or_set(key, build, timeout=CATALOG_CACHE_TIMEOUT)
@@ -0,0 +1,34 @@
+import django_filters
+
+from .models import CATEGORY_CHOICES, DIFFICULTY_CHOICES, STATUS_CHOICES, Game
+from .search import search_games
+
+
+class GameFilter(django_filters.FilterSet):
+    """
+    Catalog filters shared by search and facets
+
+    - q: Words to find in the title or description, in any language
+    - category, difficulty, status: Exact match
+    - min_price, max_price: Price range in EUR
+    - players: Party size the game has to fit
+    """
+    q = django_filters.CharFilter(method='filter_search')
+    category = django_filters.ChoiceFilter(choices=CATEGORY_CHOICES)
+    difficulty = django_filters.ChoiceFilter(choices=DIFFICULTY_CHOICES)
+    status = django_filters.ChoiceFilter(choices=STATUS_CHOICES)
+    min_price = django_filters.NumberFilter(field_name='price', lookup_expr='gte', min_value=0)
+    max_price = django_filters.NumberFilter(field_name='price', lookup_expr='lte', min_value=0)
+    players = django_filters.NumberFilter(field_name='max_players', lookup_expr='gte', min_value=1)
+
+    class Meta:
+        model = Game
+        fields = ['q', 'category', 'difficulty', 'status', 'min_price', 'max_price', 'players']
+
+    def filter_search(self, queryset, name, value):
+        return search_games(queryset, value)
+
+
+class GameSearchFilter(GameFilter):
+    """Catalog filters with a required full-text query, applied together in one query"""
+    q = django_filters.CharFilter(method='filter_search', required=True)
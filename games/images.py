@@ -0,0 +1,196 @@
+"""
+Resized copies of game images
+
+Customers get WebP and JPEG copies of every game image in the widths of
+GAME_IMAGE_WIDTHS instead of the original upload. The copies are encoded in a
+background thread once the game is committed, without EXIF, and stored next
+to the original as games/<name>-<width>.<ext>. Game.image_variants lists them
+together with the upload they were made from, and Game.image_placeholder
+holds what a card shows until the image arrives.
+"""
+import base64
+import logging
+import os
+import threading
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from PIL import Image, ImageOps
+
+from .catalog import bump_catalog_version
+from .models import Game
+
+logger = logging.getLogger(__name__)
+
+# Pillow format, file extension and encoder options of each variant format
+FORMATS = {
+    'webp': ('WEBP', '.webp', {'method': 6}),
+    'jpeg': ('JPEG', '.jpg', {'optimize': True, 'progressive': True}),
+}
+
+# Longest side of the inline preview in pixels, the client scales and blurs it
+PLACEHOLDER_SIZE = 20
+PLACEHOLDER_QUALITY = 50
+# Palette size the dominant colour is picked from
+PLACEHOLDER_COLORS = 8
+
+
+def variant_widths(original_width: int) -> list:
+    """Configured widths below the original, plus the original if it's within range"""
+    configured = sorted(settings.GAME_IMAGE_WIDTHS)
+    widths = [width for width in configured if width < original_width]
+    if original_width <= configured[-1]:
+        widths.append(original_width)
+    return widths
+
+
+def open_image(storage, name):
+    """Decoded, upright RGB image - transparency is flattened on white"""
+    with storage.open(name) as f:
+        image = Image.open(f)
+        image = ImageOps.exif_transpose(image)
+        image.load()
+
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        background = Image.new('RGB', image.size, 'white')
+        background.paste(image, mask=image.getchannel('A'))
+        return background
+    return image.convert('RGB')
+
+
+def build_variants(storage, name, image) -> dict:
+    """Encode and store every variant of an image, returns the image_variants value"""
+    original_width, original_height = image.size
+    stem, _ext = os.path.splitext(name)
+
+    variants = {'source': name, 'width': original_width, 'height': original_height}
+    for width in variant_widths(original_width):
+        if width == original_width:
+            resized = image
+        else:
+            height = max(1, round(original_height * width / original_width))
+            resized = image.resize((width, height), Image.Resampling.LANCZOS)
+
+        for key, (pil_format, extension, options) in FORMATS.items():
+            buffer = BytesIO()
+            # Nothing but pixels is written, which drops EXIF and GPS data of the upload
+            resized.save(buffer, pil_format, quality=settings.GAME_IMAGE_QUALITY, **options)
+            path = f'{stem}-{width}{extension}'
+            if storage.exists(path):
+                storage.delete(path)
+            variants.setdefault(key, {})[str(width)] = storage.save(path, ContentFile(buffer.getvalue()))
+    return variants
+
+
+def build_placeholder(image) -> dict:
+    """
+    Dominant colour and a tiny blurred-up JPEG as a data URI, a few hundred
+    bytes that can go inline with the game
+    """
+    sample = image.copy()
+    sample.thumbnail((64, 64))
+    palette = sample.quantize(colors=PLACEHOLDER_COLORS)
+    _count, index = max(palette.getcolors())
+    red, green, blue = palette.getpalette()[index * 3:index * 3 + 3]
+
+    preview = image.copy()
+    preview.thumbnail((PLACEHOLDER_SIZE, PLACEHOLDER_SIZE), Image.Resampling.BOX)
+    buffer = BytesIO()
+    preview.save(buffer, 'JPEG', quality=PLACEHOLDER_QUALITY)
+    return {
+        'color': f'#{red:02x}{green:02x}{blue:02x}',
+        'preview': 'data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode(),
+        'width': preview.width,
+        'height': preview.height,
+    }
+
+
+def variant_files(variants) -> set:
+    return {path for key in FORMATS for path in (variants or {}).get(key, {}).values()}
+
+
+def delete_variant_files(storage, paths):
+    for path in paths:
+        try:
+            storage.delete(path)
+        except OSError as e:
+            logger.warning(f"Could not delete image variant {path}: {e}")
+
+
+def pick_variant(variants, key, width):
+    """Path of the narrowest copy at least width wide, else of the widest one"""
+    copies = sorted(((int(size), path) for size, path in variants.get(key, {}).items()))
+    if not copies:
+        return None
+    return next((path for size, path in copies if size >= width), copies[-1][1])
+
+
+def current_variants(game):
+    """image_variants of the game if they were made from its current image"""
+    variants = game.image_variants
+    if variants and game.image and variants.get('source') == game.image.name:
+        return variants
+    return None
+
+
+def generate_image_variants(game_id, force=False):
+    """
+    Build the variants and placeholder of a game's current image if they're
+    missing or stale
+
+    Returns True if new variants were stored. The game row is only updated if
+    the image didn't change meanwhile, copies of replaced images are deleted.
+    """
+    game = Game.objects.filter(pk=game_id).only(
+        'id', 'image', 'image_variants', 'image_placeholder'
+    ).first()
+    if game is None:
+        return False
+
+    storage = game.image.storage
+    previous = game.image_variants or {}
+    name = game.image.name
+    if not name:
+        if previous:
+            Game.objects.filter(pk=game_id).update(image_variants={}, image_placeholder={})
+            delete_variant_files(storage, variant_files(previous))
+        return False
+    if not force and previous.get('source') == name and game.image_placeholder:
+        return False
+
+    image = open_image(storage, name)
+    variants = build_variants(storage, name, image)
+    updated = Game.objects.filter(pk=game_id, image=name).update(
+        image_variants=variants,
+        image_placeholder=build_placeholder(image),
+        content_version=F('content_version') + 1
+    )
+    if not updated:
+        # Replaced while encoding, the newer upload has its own job
+        delete_variant_files(storage, variant_files(variants))
+        return False
+
+    delete_variant_files(storage, variant_files(previous) - variant_files(variants))
+    transaction.on_commit(bump_catalog_version)
+    return True
+
+
+def _run(game_id):
+    try:
+        generate_image_variants(game_id)
+    except Exception as e:
+        logger.error(f"Error building image variants for game {game_id}: {e}")
+    finally:
+        close_old_connections()
+
+
+def schedule_image_variants(game_id):
+    """Build the variants in a background thread once the current transaction commits"""
+    def start():
+        threading.Thread(target=_run, args=(game_id,), name='game-image-variants', daemon=True).start()
+
+    transaction.on_commit(start)
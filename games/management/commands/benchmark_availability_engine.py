@@ -0,0 +1,84 @@
+import json
+import random
+import time
+
+from django.core.management.base import BaseCommand
+
+from games.utils import generate_time_slots, sweep_slot_usage, time_to_minutes
+
+
+def naive_slot_usage(slot_starts, slot_length, intervals):
+    """Reference implementation: test every (slot, interval) pair"""
+    return [
+        sum(players for start, end, players in intervals
+            if slot_start < end and slot_start + slot_length > start)
+        for slot_start in slot_starts
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the sweep-line availability engine against the pairwise overlap check'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', type=int, nargs='+', default=[100, 1000, 10000, 100000],
+                            help='Reservations per day to benchmark')
+        parser.add_argument('--interval', type=int, default=15, help='Slot interval in minutes')
+        parser.add_argument('--duration', type=int, default=60, help='Game duration in minutes')
+        parser.add_argument('--naive-limit', type=int, default=10000,
+                            help='Largest size the pairwise reference is run for')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per size, the best one is reported')
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--json', action='store_true', help='Print results as JSON')
+
+    def _best_of(self, repeat, func, *args):
+        timings = []
+        result = None
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = func(*args)
+            timings.append(time.perf_counter() - started)
+        return min(timings), result
+
+    def handle(self, *args, **options):
+        rng = random.Random(options['seed'])
+        duration = options['duration']
+        slots = generate_time_slots('10:00', '00:00', duration, options['interval'])
+        slot_starts = [time_to_minutes(slot) for slot in slots]
+        opening, closing = slot_starts[0], slot_starts[-1]
+
+        results = []
+        for size in options['sizes']:
+            starts = [rng.randint(opening, closing) for _ in range(size)]
+            intervals = [(start, start + duration, rng.randint(1, 6)) for start in starts]
+
+            sweep_seconds, sweep_usage = self._best_of(
+                options['repeat'], sweep_slot_usage, slot_starts, duration, intervals
+            )
+            row = {
+                'reservations': size,
+                'slots': len(slot_starts),
+                'sweep_seconds': sweep_seconds,
+                'sweep_us_per_reservation': sweep_seconds / size * 1e6,
+            }
+
+            if size <= options['naive_limit']:
+                naive_seconds, naive_usage = self._best_of(
+                    1, naive_slot_usage, slot_starts, duration, intervals
+                )
+                row['naive_seconds'] = naive_seconds
+                row['matches_naive'] = naive_usage == sweep_usage
+
+            results.append(row)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+
+        self.stdout.write(f"{'reservations':>12} {'sweep s':>10} {'us/resv':>8} {'naive s':>10} {'match':>6}")
+        for row in results:
+            naive = f"{row['naive_seconds']:10.4f}" if 'naive_seconds' in row else f"{'-':>10}"
+            match = str(row.get('matches_naive', '-'))
+            self.stdout.write(
+                f"{row['reservations']:>12} {row['sweep_seconds']:10.4f} "
+                f"{row['sweep_us_per_reservation']:8.2f} {naive} {match:>6}"
+            )
@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+
+from games.images import generate_image_variants
+from games.models import Game
+
+
+class Command(BaseCommand):
+    help = (
+        'Build the resized WebP and JPEG copies and the inline placeholder of game images '
+        'that have none yet, e.g. for images uploaded before they existed'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--force', action='store_true',
+                            help='Rebuild the copies of every image, also the up to date ones')
+        parser.add_argument('--game', type=int, action='append', dest='games',
+                            help='Game ID to process (repeatable, default: all games)')
+
+    def handle(self, *args, **options):
+        games = Game.objects.exclude(image='').order_by('id')
+        if options['games']:
+            games = games.filter(id__in=options['games'])
+
+        built = failed = 0
+        for game_id in games.values_list('id', flat=True):
+            try:
+                if generate_image_variants(game_id, force=options['force']):
+                    built += 1
+                    self.stdout.write(f'Game {game_id}: image copies built')
+            except Exception as e:
+                failed += 1
+                self.stderr.write(f'Game {game_id}: {e}')
+
+        self.stdout.write(self.style.SUCCESS(f'Built image copies for {built} games, {failed} failed'))
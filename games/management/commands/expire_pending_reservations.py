@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from games.expiry import expire_pending_reservations
+
+
+class Command(BaseCommand):
+    help = (
+        'Cancel unpaid online bookings whose hold has expired, release their slots '
+        'and mark their pending payments as timed out. Meant to run from cron.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int,
+                            help='Reservations cancelled per transaction (default: RESERVATION_EXPIRY_BATCH_SIZE)')
+
+    def handle(self, *args, **options):
+        expired = expire_pending_reservations(batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Expired {expired} pending reservations'))
@@ -0,0 +1,127 @@
+import random
+import threading
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Sum
+
+from games.models import Game, Reservation
+from games.occupancy import CapacityError, claim_capacity
+from games.utils import get_slot_template, get_spain_now
+from user.models import User
+
+LOADTEST_EMAIL = 'loadtest@vidadenoche.invalid'
+
+
+class Command(BaseCommand):
+    help = (
+        'Hammer claim_capacity from concurrent threads and check that no slot gets overbooked. '
+        'Creates a throwaway game and removes it afterwards. Run against PostgreSQL: '
+        'SQLite serializes every writer, so throughput can not scale there.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--attempts', type=int, default=50, help='Booking attempts per thread')
+        parser.add_argument('--slots', type=int, nargs='+', default=[1, 4, 12],
+                            help='Distinct slots the bookings are spread over, one run per value')
+        parser.add_argument('--max-players', type=int, default=8)
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        if connection.vendor == 'sqlite':
+            self.stdout.write(self.style.WARNING('SQLite serializes writers, throughput numbers are not meaningful'))
+
+        user, _created = User.objects.get_or_create(email=LOADTEST_EMAIL)
+        # Slots are one duration apart so bookings of different slots never overlap
+        game = Game.objects.create(
+            title={lang: 'Load test' for lang in ('ru', 'en', 'es', 'uk')},
+            description={lang: 'Load test' for lang in ('ru', 'en', 'es', 'uk')},
+            price=1,
+            max_players=options['max_players'],
+            duration=60,
+            working_hours_start='00:00',
+            working_hours_end='00:00',
+            is_active=False,
+            image='games/loadtest.jpg',
+        )
+        booking_date = get_spain_now().date() + timedelta(days=30)
+
+        failed = False
+        try:
+            for slot_count in options['slots']:
+                failed |= self._run(game, user, booking_date, slot_count, options)
+                booking_date += timedelta(days=1)
+        finally:
+            Reservation.objects.filter(game=game).delete()
+            game.delete()
+            user.delete()
+
+        if failed:
+            self.stderr.write(self.style.ERROR('Overbooking detected'))
+        else:
+            self.stdout.write(self.style.SUCCESS('No slot was overbooked'))
+
+    def _run(self, game, user, booking_date, slot_count, options):
+        slots = list(get_slot_template(game).labels)[:slot_count]
+        counters = {'claimed': 0, 'rejected': 0, 'errors': 0}
+        error_messages = set()
+        lock = threading.Lock()
+
+        def worker(seed):
+            rng = random.Random(seed)
+            try:
+                for _ in range(options['attempts']):
+                    slot = rng.choice(slots)
+                    players = rng.randint(1, 3)
+                    try:
+                        with transaction.atomic():
+                            claim_capacity(game, booking_date, slot, players)
+                            reservation = Reservation(
+                                user=user, game=game, date=booking_date, time=slot,
+                                players=players, email=LOADTEST_EMAIL, status='pending'
+                            )
+                            reservation._capacity_claimed = True
+                            reservation.save()
+                        outcome = 'claimed'
+                    except CapacityError:
+                        outcome = 'rejected'
+                    except Exception as e:
+                        error_messages.add(str(e))
+                        outcome = 'errors'
+                    with lock:
+                        counters[outcome] += 1
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=worker, args=(options['seed'] * 1000 + index,))
+            for index in range(options['threads'])
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        booked = {
+            row['time'].strftime('%H:%M'): row['players']
+            for row in Reservation.objects.filter(game=game, date=booking_date)
+            .values('time').annotate(players=Sum('players'))
+        }
+        overbooked = {slot: players for slot, players in booked.items() if players > game.max_players}
+
+        attempts = options['threads'] * options['attempts']
+        self.stdout.write(
+            f"slots={slot_count:>3} attempts={attempts} claimed={counters['claimed']} "
+            f"rejected={counters['rejected']} errors={counters['errors']} "
+            f"elapsed={elapsed:.2f}s throughput={attempts / elapsed:.0f}/s overbooked={len(overbooked)}"
+        )
+        for message in sorted(error_messages):
+            self.stderr.write(f"  error: {message}")
+        for slot, players in sorted(overbooked.items()):
+            self.stdout.write(f"  {slot}: {players} players booked, max {game.max_players}")
+        return bool(overbooked)
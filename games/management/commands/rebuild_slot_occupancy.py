@@ -0,0 +1,54 @@
+from datetime import datetime, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+
+from games.models import Game
+from games.occupancy import rebuild_occupancy, verify_occupancy
+from games.utils import get_spain_now
+
+
+class Command(BaseCommand):
+    help = 'Rebuild or verify the materialized slot occupancy from the raw reservations'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--verify', action='store_true',
+                            help='Only compare stored occupancy with the reservations, do not write')
+        parser.add_argument('--game', type=int, action='append', dest='games',
+                            help='Game ID to process (repeatable, default: all games)')
+        parser.add_argument('--date-from', help='First date in YYYY-MM-DD format (default: yesterday)')
+        parser.add_argument('--date-to', help='Last date in YYYY-MM-DD format (default: one year ahead)')
+
+    def handle(self, *args, **options):
+        today = get_spain_now().date()
+        try:
+            date_from = (datetime.strptime(options['date_from'], '%Y-%m-%d').date()
+                         if options['date_from'] else today - timedelta(days=1))
+            date_to = (datetime.strptime(options['date_to'], '%Y-%m-%d').date()
+                       if options['date_to'] else today + timedelta(days=365))
+        except ValueError:
+            raise CommandError('Invalid date format. Use YYYY-MM-DD')
+
+        games = Game.objects.all()
+        if options['games']:
+            games = games.filter(id__in=options['games'])
+
+        total_mismatches = 0
+        for game in games:
+            if options['verify']:
+                mismatches = verify_occupancy(game, date_from, date_to)
+                total_mismatches += len(mismatches)
+                for mismatch in mismatches:
+                    self.stdout.write(
+                        f"Game {game.id} {mismatch['date']} {mismatch['time']:%H:%M}: "
+                        f"stored {mismatch['stored']}, expected {mismatch['expected']}"
+                    )
+            else:
+                rows = rebuild_occupancy(game, date_from, date_to)
+                self.stdout.write(f"Game {game.id}: {rows} occupancy rows written")
+
+        if options['verify']:
+            if total_mismatches:
+                raise CommandError(f'{total_mismatches} occupancy mismatches found')
+            self.stdout.write(self.style.SUCCESS('Slot occupancy is consistent with reservations'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Slot occupancy rebuilt from {date_from} to {date_to}'))
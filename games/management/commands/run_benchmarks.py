@@ -0,0 +1,255 @@
+import json
+import platform
+import statistics
+import subprocess
+import time
+from datetime import timedelta
+from importlib import import_module
+from unittest import mock
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.test import RequestFactory
+from django.utils import timezone
+
+from billing.models import Invoice, Payment
+from billing.views import StripeWebhookView
+from games.models import Game, Reservation
+from games.serializers import GameListSerializer
+from games.utils import generate_time_slots, get_available_times, get_slot_template, get_spain_now
+from games.views import create_booking
+from user.models import User
+
+BENCHMARK_EMAIL = 'benchmark-booking@bench.invalid'
+LANGUAGES = ('ru', 'en', 'es', 'uk')
+
+
+class Command(BaseCommand):
+    help = (
+        'Time the booking hot paths and write the results as JSON, so runs can be compared '
+        'across commits. Seed data first with seed_benchmark_data. Stripe and SendGrid are '
+        'stubbed, bookings made by the suite are removed afterwards.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200, help='Timed calls per benchmark')
+        parser.add_argument('--warmup', type=int, default=5, help='Untimed calls before measuring')
+        parser.add_argument('--game', type=int, help='Game ID for availability (default: busiest active game)')
+        parser.add_argument('--date', help='Date for availability in YYYY-MM-DD format (default: tomorrow)')
+        parser.add_argument('--only', nargs='+', help='Run only the named benchmarks')
+        parser.add_argument('--output', help='Write the JSON results to this file instead of stdout')
+        parser.add_argument('--label', default='', help='Free-form label stored with the results')
+
+    def handle(self, *args, **options):
+        self.iterations = options['iterations']
+        self.warmup = options['warmup']
+        self.factory = RequestFactory(SERVER_NAME='localhost')
+
+        game = self.get_game(options['game'])
+        selected_date = options['date'] or str(get_spain_now().date() + timedelta(days=1))
+
+        benchmarks = {
+            'generate_time_slots': lambda: self.bench_generate_time_slots(),
+            'get_available_times': lambda: self.bench_available_times(game, selected_date),
+            'game_list_serializer': lambda: self.bench_game_list(),
+            'create_booking': lambda: self.bench_create_booking(),
+            'stripe_webhook': lambda: self.bench_stripe_webhook(),
+        }
+        selected = options['only'] or list(benchmarks)
+        unknown = set(selected) - set(benchmarks)
+        if unknown:
+            raise CommandError(f'Unknown benchmarks: {", ".join(sorted(unknown))}')
+
+        results = {}
+        for name in selected:
+            self.stderr.write(f'Running {name}...')
+            results[name] = benchmarks[name]()
+
+        report = {
+            'label': options['label'],
+            'commit': self.git_commit(),
+            'timestamp': timezone.now().isoformat(),
+            'environment': {
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'cache': settings.CACHES['default']['BACKEND'],
+            },
+            'dataset': {
+                'games': Game.objects.count(),
+                'users': User.objects.count(),
+                'reservations': Reservation.objects.count(),
+                'invoices': Invoice.objects.count(),
+                'payments': Payment.objects.count(),
+            },
+            'parameters': {
+                'iterations': self.iterations,
+                'game': game.id,
+                'date': selected_date,
+            },
+            'results': results,
+        }
+
+        output = json.dumps(report, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                f.write(output)
+            self.stderr.write(self.style.SUCCESS(f'Results written to {options["output"]}'))
+        else:
+            self.stdout.write(output)
+
+    def get_game(self, game_id):
+        games = Game.objects.filter(is_active=True)
+        if game_id:
+            game = games.filter(id=game_id).first()
+        else:
+            game = games.annotate(reservation_count=Count('reservation')).order_by(
+                '-reservation_count'
+            ).first()
+        if not game:
+            raise CommandError('No active game to benchmark, run seed_benchmark_data first')
+        return game
+
+    def git_commit(self):
+        try:
+            return subprocess.run(
+                ['git', 'rev-parse', '--short', 'HEAD'],
+                cwd=settings.BASE_DIR, capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def measure(self, func, setup=None):
+        """Time func over the configured iterations, setup(i) prepares each call untimed"""
+        for index in range(self.warmup):
+            func(setup(index) if setup else None)
+
+        timings = []
+        queries = []
+        for index in range(self.warmup, self.warmup + self.iterations):
+            argument = setup(index) if setup else None
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                func(argument)
+                timings.append(time.perf_counter() - started)
+            queries.append(len(captured.captured_queries))
+
+        timings.sort()
+        to_ms = 1000
+        return {
+            'iterations': len(timings),
+            'mean_ms': statistics.fmean(timings) * to_ms,
+            'median_ms': statistics.median(timings) * to_ms,
+            'p95_ms': timings[min(len(timings) - 1, int(len(timings) * 0.95))] * to_ms,
+            'min_ms': timings[0] * to_ms,
+            'max_ms': timings[-1] * to_ms,
+            'queries_per_call': statistics.fmean(queries),
+        }
+
+    def bench_generate_time_slots(self):
+        return self.measure(lambda _: generate_time_slots('10:00', '00:00', 60, 15))
+
+    def bench_available_times(self, game, selected_date):
+        return self.measure(lambda _: get_available_times(game.id, selected_date, 'en'))
+
+    def bench_game_list(self):
+        games = Game.objects.filter(is_active=True).localized('en')
+        return self.measure(
+            lambda _: GameListSerializer(games.all(), many=True, context={'language': 'en'}).data
+        )
+
+    def create_booking_game(self):
+        """A throwaway game big enough that no timed booking hits a full slot"""
+        return Game.objects.create(
+            title={language: 'Benchmark booking' for language in LANGUAGES},
+            description={language: 'Benchmark booking' for language in LANGUAGES},
+            price=20,
+            max_players=10 ** 6,
+            duration=60,
+            working_hours_start='10:00',
+            working_hours_end='00:00',
+            is_active=True,
+            image='games/benchmark.jpg',
+        )
+
+    def booking_slot(self, game, index):
+        labels = get_slot_template(game).labels
+        booking_date = get_spain_now().date() + timedelta(days=2 + index // len(labels))
+        return booking_date, labels[index % len(labels)]
+
+    def bench_create_booking(self):
+        game = self.create_booking_game()
+        session_engine = import_module(settings.SESSION_ENGINE)
+
+        def setup(index):
+            booking_date, slot = self.booking_slot(game, index)
+            request = self.factory.post('/api/games/bookings/create/', {
+                'game': game.id,
+                'date': str(booking_date),
+                'time': slot,
+                'players': 2,
+                'email': BENCHMARK_EMAIL,
+                'first_name': 'Benchmark',
+                'last_name': 'Booking',
+            }, content_type='application/json')
+            request.session = session_engine.SessionStore()
+            request.session['booking_email'] = BENCHMARK_EMAIL
+            return request
+
+        def book(request):
+            response = create_booking(request)
+            if response.status_code != 201:
+                raise CommandError(f'create_booking failed: {response.status_code} {response.data}')
+
+        try:
+            return self.measure(book, setup)
+        finally:
+            game.delete()
+            User.objects.filter(email=BENCHMARK_EMAIL).delete()
+
+    def bench_stripe_webhook(self):
+        game = self.create_booking_game()
+        user, _created = User.objects.get_or_create(email=BENCHMARK_EMAIL)
+        view = StripeWebhookView.as_view()
+
+        def setup(index):
+            booking_date, slot = self.booking_slot(game, index)
+            reservation = Reservation.objects.create(
+                user=user, game=game, date=booking_date, time=slot, players=2,
+                email=user.email, language='en'
+            )
+            invoice = Invoice.objects.create(user=user, reservation=reservation, total=reservation.total_price)
+            payment = invoice.create_payment()
+            payment.reference = f'cs_bench_webhook_{payment.id}'
+            payment.save()
+            event = {
+                'type': 'checkout.session.completed',
+                'data': {'object': {'id': payment.reference, 'payment_status': 'paid'}},
+            }
+            return self.factory.post(
+                '/billing/webhooks/stripe/', json.dumps(event),
+                content_type='application/json', HTTP_STRIPE_SIGNATURE='benchmark'
+            )
+
+        def deliver(request):
+            response = view(request)
+            if response.status_code != 200:
+                raise CommandError(f'Stripe webhook failed: {response.status_code}')
+
+        # Signature checks and the confirmation email are external calls
+        construct_event = mock.patch(
+            'billing.views.stripe.Webhook.construct_event',
+            side_effect=lambda payload, signature, secret: json.loads(payload)
+        )
+        send_email = mock.patch('billing.views.sendgrid_send_email', return_value=True)
+        try:
+            with construct_event, send_email:
+                return self.measure(deliver, setup)
+        finally:
+            Invoice.objects.filter(reservation__game=game).delete()
+            game.delete()
+            user.delete()
@@ -0,0 +1,205 @@
+import random
+import time
+import uuid
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.utils import timezone
+
+from billing.models import Invoice, Payment
+from games.models import CATEGORY_CHOICES, DIFFICULTY_CHOICES, Game, Reservation, SlotOccupancy
+from games.occupancy import rebuild_occupancy
+from games.search import index_game
+from games.utils import get_slot_template, get_spain_now
+from user.models import User
+
+# Seeded rows are recognised by these markers so --clear never touches real data
+BENCHMARK_TITLE = 'Benchmark'
+BENCHMARK_EMAIL_DOMAIN = 'bench.invalid'
+LANGUAGES = ('ru', 'en', 'es', 'uk')
+OPENING_HOURS = (('10:00', '22:00'), ('12:00', '00:00'), ('16:00', '00:00'), ('18:00', '02:00'))
+
+
+def benchmark_games():
+    return Game.objects.filter(title__en__startswith=BENCHMARK_TITLE)
+
+
+def benchmark_users():
+    return User.objects.filter(email__endswith=f'@{BENCHMARK_EMAIL_DOMAIN}')
+
+
+class Command(BaseCommand):
+    help = (
+        'Seed synthetic games, users, reservations, invoices and payments for benchmarks. '
+        'Rows are written with bulk_create, so model save() and signals are skipped and '
+        'slot occupancy is rebuilt at the end.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--games', type=int, default=50)
+        parser.add_argument('--users', type=int, default=20000)
+        parser.add_argument('--reservations', type=int, default=2000000)
+        parser.add_argument('--days-back', type=int, default=730, help='History spread over this many past days')
+        parser.add_argument('--days-ahead', type=int, default=60, help='Upcoming bookings spread over this many days')
+        parser.add_argument('--paid-ratio', type=float, default=0.6,
+                            help='Share of reservations that get an invoice and a payment')
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--seed', type=int, default=42)
+        parser.add_argument('--clear', action='store_true', help='Remove previously seeded rows first')
+
+    def handle(self, *args, **options):
+        if options['games'] < 1 or options['users'] < 1:
+            raise CommandError('At least one game and one user are required')
+
+        self.rng = random.Random(options['seed'])
+        self.batch_size = options['batch_size']
+        started = time.perf_counter()
+
+        if options['clear']:
+            self.clear()
+        elif benchmark_games().exists():
+            raise CommandError('Benchmark data already exists, use --clear to replace it')
+
+        games = self.seed_games(options['games'])
+        users = self.seed_users(options['users'])
+        today = get_spain_now().date()
+        date_from = today - timedelta(days=options['days_back'])
+        date_to = today + timedelta(days=options['days_ahead'])
+
+        self.seed_reservations(games, users, options['reservations'], date_from, date_to, today, options['paid_ratio'])
+
+        self.stdout.write('Rebuilding slot occupancy...')
+        for game in games:
+            rebuild_occupancy(game, date_from - timedelta(days=1), date_to)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Seeded {len(games)} games, {len(users)} users and {options["reservations"]} reservations '
+            f'in {time.perf_counter() - started:.1f}s'
+        ))
+
+    def clear(self):
+        games = benchmark_games()
+        users = benchmark_users()
+        with transaction.atomic():
+            Payment.objects.filter(invoice__user__in=users).delete()
+            Invoice.objects.filter(user__in=users).delete()
+            SlotOccupancy.objects.filter(game__in=games).delete()
+            # A plain DELETE: going through the ORM would fire the occupancy
+            # signal once per seeded reservation
+            reservations = Reservation.objects.filter(game__in=games)
+            deleted = reservations._raw_delete(reservations.db)
+            Reservation.objects.filter(user__in=users)._raw_delete(reservations.db)
+            games.delete()
+            users.delete()
+        self.stdout.write(f'Removed {deleted} seeded reservations')
+
+    def seed_games(self, count):
+        games = []
+        for number in range(1, count + 1):
+            start, end = self.rng.choice(OPENING_HOURS)
+            title = f'{BENCHMARK_TITLE} {number}'
+            games.append(Game(
+                title={language: title for language in LANGUAGES},
+                description={language: f'{title} description' for language in LANGUAGES},
+                category=self.rng.choice(CATEGORY_CHOICES)[0],
+                difficulty=self.rng.choice(DIFFICULTY_CHOICES)[0],
+                image='games/benchmark.jpg',
+                price=Decimal(self.rng.randrange(15, 45)),
+                max_players=self.rng.choice((4, 6, 8, 10)),
+                duration=self.rng.choice((60, 90)),
+                working_hours_start=start,
+                working_hours_end=end,
+                is_featured=number <= 4,
+                translation_status='completed',
+            ))
+        games = Game.objects.bulk_create(games, batch_size=self.batch_size)
+        # bulk_create skips the post_save signals that build the list projection
+        # and the search index
+        for game in games:
+            game.refresh_translations()
+            index_game(game)
+        return games
+
+    def seed_users(self, count):
+        # One hash for every user, hashing per row would dominate the run
+        password = make_password(None)
+        users = [
+            User(
+                email=f'user{number}@{BENCHMARK_EMAIL_DOMAIN}',
+                first_name=f'User{number}',
+                last_name='Benchmark',
+                password=password,
+            )
+            for number in range(1, count + 1)
+        ]
+        return User.objects.bulk_create(users, batch_size=self.batch_size)
+
+    def _status(self, reservation_date, today):
+        roll = self.rng.random()
+        if reservation_date < today:
+            return 'completed' if roll < 0.85 else 'cancelled'
+        if roll < 0.6:
+            return 'confirmed'
+        return 'pending' if roll < 0.85 else 'cancelled'
+
+    def seed_reservations(self, games, users, count, date_from, date_to, today, paid_ratio):
+        slot_labels = {game.id: get_slot_template(game).labels for game in games}
+        days = (date_to - date_from).days + 1
+        now = timezone.now()
+        invoice_number = 0
+
+        for offset in range(0, count, self.batch_size):
+            batch = []
+            for _ in range(min(self.batch_size, count - offset)):
+                game = self.rng.choice(games)
+                user = self.rng.choice(users)
+                reservation_date = date_from + timedelta(days=self.rng.randrange(days))
+                players = self.rng.randint(1, game.max_players)
+                status = self._status(reservation_date, today)
+                batch.append(Reservation(
+                    user=user,
+                    game=game,
+                    date=reservation_date,
+                    time=self.rng.choice(slot_labels[game.id]),
+                    players=players,
+                    total_price=game.price if game.category == 'team' else game.price * players,
+                    status=status,
+                    reference_number=f'QB{uuid.UUID(int=self.rng.getrandbits(128)).hex[:12].upper()}',
+                    email=user.email,
+                    hold_expires_at=now + timedelta(minutes=30) if status == 'pending' else None,
+                    language=self.rng.choice(('en', 'es', 'uk')),
+                ))
+
+            with transaction.atomic():
+                reservations = Reservation.objects.bulk_create(batch)
+
+                invoices = []
+                for reservation in reservations:
+                    if reservation.status == 'pending' or self.rng.random() >= paid_ratio:
+                        continue
+                    invoice_number += 1
+                    invoices.append(Invoice(
+                        invoice_id=f'BENCH{invoice_number:012d}',
+                        user_id=reservation.user_id,
+                        reservation=reservation,
+                        total=reservation.total_price,
+                        invoice_date=reservation.date,
+                    ))
+                Invoice.objects.bulk_create(invoices)
+
+                Payment.objects.bulk_create([
+                    Payment(
+                        invoice=invoice,
+                        amount=invoice.total,
+                        currency=invoice.currency,
+                        reference=f'cs_bench_{invoice.invoice_id}',
+                        status='completed' if invoice.reservation.status != 'cancelled' else 'refunded',
+                        paid_date=invoice.invoice_date,
+                    )
+                    for invoice in invoices
+                ])
+
+            self.stdout.write(f'  {offset + len(batch)}/{count} reservations')
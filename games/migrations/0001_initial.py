@@ -0,0 +1,70 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:21
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Game',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('title', models.JSONField(default=dict, help_text='Название на разных языках: {"en": "English Title", "es": "Título Español", "uk": "Українська Назва"}', verbose_name='Название игры')),
+                ('description', models.JSONField(default=dict, help_text='Описание на разных языках: {"en": "English Description", "es": "Descripción", "uk": "Український опис"}', verbose_name='Описание')),
+                ('category', models.CharField(choices=[('escape', 'Побег'), ('adventure', 'Приключения'), ('puzzle', 'Головоломки'), ('horror', 'Хоррор'), ('team', 'Командные')], default='escape', help_text='Выберите категорию игры', max_length=20, verbose_name='Категория')),
+                ('difficulty', models.CharField(choices=[('easy', 'Легкий'), ('medium', 'Средний'), ('hard', 'Сложный')], default='medium', help_text='Уровень сложности игры', max_length=10, verbose_name='Сложность')),
+                ('status', models.CharField(choices=[('available_now', 'Доступно сейчас'), ('pre_reservation', 'Предварительное бронирование')], default='available_now', help_text='Статус доступности игры для бронирования', max_length=20, verbose_name='Статус')),
+                ('available_from', models.DateTimeField(blank=True, help_text='Дата и время, когда игра станет доступна для бронирования (только для предварительного бронирования)', null=True, verbose_name='Доступно с')),
+                ('image', models.ImageField(help_text='Загрузите привлекательное изображение игры (рекомендуется 800x600)', upload_to='games/', verbose_name='Изображение')),
+                ('price', models.DecimalField(decimal_places=2, help_text='Цена за игру в евро (EUR)', max_digits=8, verbose_name='Цена')),
+                ('max_players', models.PositiveIntegerField(help_text='Максимальное количество игроков одновременно', verbose_name='Максимум игроков')),
+                ('duration', models.PositiveIntegerField(help_text='Длительность игры в минутах', verbose_name='Продолжительность (мин)')),
+                ('working_hours_start', models.CharField(choices=[('00:00', '00:00'), ('01:00', '01:00'), ('02:00', '02:00'), ('03:00', '03:00'), ('04:00', '04:00'), ('05:00', '05:00'), ('06:00', '06:00'), ('07:00', '07:00'), ('08:00', '08:00'), ('09:00', '09:00'), ('10:00', '10:00'), ('11:00', '11:00'), ('12:00', '12:00'), ('13:00', '13:00'), ('14:00', '14:00'), ('15:00', '15:00'), ('16:00', '16:00'), ('17:00', '17:00'), ('18:00', '18:00'), ('19:00', '19:00'), ('20:00', '20:00'), ('21:00', '21:00'), ('22:00', '22:00'), ('23:00', '23:00')], help_text='Время открытия для этой игры', max_length=15, verbose_name='Начало работы')),
+                ('working_hours_end', models.CharField(choices=[('00:00', '00:00'), ('01:00', '01:00'), ('02:00', '02:00'), ('03:00', '03:00'), ('04:00', '04:00'), ('05:00', '05:00'), ('06:00', '06:00'), ('07:00', '07:00'), ('08:00', '08:00'), ('09:00', '09:00'), ('10:00', '10:00'), ('11:00', '11:00'), ('12:00', '12:00'), ('13:00', '13:00'), ('14:00', '14:00'), ('15:00', '15:00'), ('16:00', '16:00'), ('17:00', '17:00'), ('18:00', '18:00'), ('19:00', '19:00'), ('20:00', '20:00'), ('21:00', '21:00'), ('22:00', '22:00'), ('23:00', '23:00')], help_text='Время закрытия для этой игры', max_length=15, verbose_name='Конец работы')),
+                ('is_featured', models.BooleanField(default=False, help_text='Показывать на главной странице как рекомендуемую', verbose_name='Рекомендуемая игра')),
+                ('is_active', models.BooleanField(default=True, help_text='Доступна для бронирования клиентами', verbose_name='Активная')),
+                ('translation_status', models.CharField(choices=[('pending', 'Ожидает перевода'), ('processing', 'Переводится'), ('completed', 'Переведено'), ('failed', 'Ошибка перевода')], default='pending', help_text='Статус автоматического перевода', max_length=20, verbose_name='Статус перевода')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Дата обновления')),
+            ],
+            options={
+                'verbose_name': 'Квест-игра',
+                'verbose_name_plural': 'Квест-игры',
+                'ordering': ['-is_featured', 'category', 'id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='Reservation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('time', models.TimeField(verbose_name='Время')),
+                ('players', models.PositiveIntegerField(help_text='Количество игроков для бронирования', verbose_name='Количество игроков')),
+                ('total_price', models.DecimalField(decimal_places=2, max_digits=8, verbose_name='Общая стоимость')),
+                ('special_requirements', models.TextField(blank=True, help_text='Дополнительные пожелания или требования', verbose_name='Особые требования')),
+                ('status', models.CharField(choices=[('pending', 'В ожидании'), ('confirmed', 'Подтверждено'), ('cancelled', 'Отменено'), ('completed', 'Завершено')], default='pending', max_length=20, verbose_name='Статус')),
+                ('reference_number', models.CharField(help_text='Уникальный номер для отслеживания брони', max_length=20, unique=True, verbose_name='Номер брони')),
+                ('email', models.EmailField(max_length=254, verbose_name='Email')),
+                ('phone', models.CharField(blank=True, max_length=20, null=True, verbose_name='Телефон')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('language', models.CharField(blank=True, max_length=20, null=True)),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='games.game')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Бронирование',
+                'verbose_name_plural': 'Бронирования',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
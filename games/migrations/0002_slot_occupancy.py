@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0001_initial'),
+    ]
+
+    # Starts empty, fill it with the rebuild_slot_occupancy management command
+    operations = [
+        migrations.CreateModel(
+            name='SlotOccupancy',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(verbose_name='Дата')),
+                ('time', models.TimeField(verbose_name='Время')),
+                ('used_capacity', models.IntegerField(default=0, verbose_name='Занято мест')),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='slot_occupancy', to='games.game')),
+            ],
+            options={
+                'verbose_name': 'Занятость слота',
+                'verbose_name_plural': 'Занятость слотов',
+                'ordering': ['date', 'time'],
+                'unique_together': {('game', 'date', 'time')},
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0002_slot_occupancy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='slot_interval',
+            field=models.PositiveIntegerField(default=60, help_text='Шаг, с которым начинаются игры, в минутах', verbose_name='Интервал между слотами (мин)'),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='buffer_minutes',
+            field=models.PositiveIntegerField(default=0, help_text='Время на сброс комнаты после каждой игры, в минутах', verbose_name='Подготовка комнаты (мин)'),
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0003_game_slot_interval_buffer_minutes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='content_version',
+            field=models.PositiveBigIntegerField(default=1, editable=False, verbose_name='Версия содержимого'),
+        ),
+        migrations.AddField(
+            model_name='game',
+            name='availability_version',
+            field=models.PositiveBigIntegerField(default=1, editable=False, help_text='Увеличивается при каждом изменении бронирований игры', verbose_name='Версия доступности'),
+        ),
+    ]
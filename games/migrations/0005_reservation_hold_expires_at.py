@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0004_game_versions'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reservation',
+            name='hold_expires_at',
+            field=models.DateTimeField(blank=True, help_text='Неоплаченная бронь будет отменена после этого времени', null=True, verbose_name='Бронь удерживается до'),
+        ),
+    ]
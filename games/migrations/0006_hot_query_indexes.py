@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0005_reservation_hold_expires_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['game', 'date', 'status'], name='reservation_game_date_status'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'confirmed'])), fields=['game', 'date', 'time'], name='reservation_active_slot'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(fields=['user', '-created_at'], name='reservation_user_created'),
+        ),
+        migrations.AddIndex(
+            model_name='reservation',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['hold_expires_at'], name='reservation_pending_hold'),
+        ),
+    ]
@@ -0,0 +1,63 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:26
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.utils.text import Truncator
+
+
+def _localized(values, language):
+    """Same fallback chain as Game.get_title/get_description"""
+    if not isinstance(values, dict) or not values:
+        return ''
+    if language in values:
+        return values[language]
+    if 'en' in values:
+        return values['en']
+    return next(iter(values.values()), '')
+
+
+def build_translations(apps, schema_editor):
+    Game = apps.get_model('games', 'Game')
+    GameTranslation = apps.get_model('games', 'GameTranslation')
+
+    rows = []
+    for game in Game.objects.only('title', 'description').iterator():
+        for language, _name in settings.LANGUAGES:
+            title = _localized(game.title, language)
+            rows.append(GameTranslation(
+                game=game,
+                language=language,
+                title=title[:255],
+                description_preview=Truncator(_localized(game.description, language)).chars(300),
+                sort_key=title.casefold()[:255],
+            ))
+    GameTranslation.objects.bulk_create(rows, batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0006_hot_query_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GameTranslation',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('language', models.CharField(choices=[('ru', 'Русский'), ('en', 'English'), ('es', 'Español'), ('uk', 'Українська')], max_length=5, verbose_name='Язык')),
+                ('title', models.CharField(max_length=255, verbose_name='Название игры')),
+                ('description_preview', models.TextField(blank=True, verbose_name='Краткое описание')),
+                ('sort_key', models.CharField(max_length=255, verbose_name='Ключ сортировки')),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='translations', to='games.game')),
+            ],
+            options={
+                'verbose_name': 'Перевод игры',
+                'verbose_name_plural': 'Переводы игр',
+                'indexes': [models.Index(fields=['language', 'sort_key'], name='game_translation_sort')],
+                'unique_together': {('game', 'language')},
+            },
+        ),
+        migrations.RunPython(build_translations, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,105 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:31
+
+import re
+import unicodedata
+from collections import Counter
+
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector
+from django.db import migrations, models
+from django.db.models import Value
+
+
+# Frozen copy of games.search as of this migration, later changes to the live
+# tokenizer must not change what this migration writes
+WORD_RE = re.compile(r'[^\W_]+')
+MAX_TOKEN_LENGTH = 64
+TITLE_WEIGHT = 4
+DESCRIPTION_WEIGHT = 1
+
+SEARCH_VECTOR_INDEX = GinIndex(fields=['search_vector'], name='game_search_vector')
+
+
+def _words(values):
+    words = []
+    for text in (values.values() if isinstance(values, dict) else []):
+        if not isinstance(text, str):
+            continue
+        decomposed = unicodedata.normalize('NFKD', text)
+        folded = ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+        words.extend(word[:MAX_TOKEN_LENGTH] for word in WORD_RE.findall(folded))
+    return words
+
+
+def build_search_index(apps, schema_editor):
+    Game = apps.get_model('games', 'Game')
+    GameSearchToken = apps.get_model('games', 'GameSearchToken')
+    postgresql = schema_editor.connection.vendor == 'postgresql'
+    for game in Game.objects.only('id', 'title', 'description').iterator():
+        title_words, description_words = _words(game.title), _words(game.description)
+        weights = Counter()
+        for word in title_words:
+            weights[word] += TITLE_WEIGHT
+        for word in description_words:
+            weights[word] += DESCRIPTION_WEIGHT
+        GameSearchToken.objects.bulk_create([
+            GameSearchToken(game=game, token=token, weight=weight)
+            for token, weight in weights.items()
+        ])
+        if postgresql:
+            Game.objects.filter(pk=game.pk).update(search_vector=(
+                SearchVector(Value(' '.join(title_words)), weight='A', config='simple')
+                + SearchVector(Value(' '.join(description_words)), weight='B', config='simple')
+            ))
+
+
+# The index is part of the model state like any other, but GIN only exists on
+# PostgreSQL: other backends search through GameSearchToken and skip it
+def create_search_vector_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.add_index(apps.get_model('games', 'Game'), SEARCH_VECTOR_INDEX)
+
+
+def drop_search_vector_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.remove_index(apps.get_model('games', 'Game'), SEARCH_VECTOR_INDEX)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0007_game_translation'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True, verbose_name='Поисковый вектор'),
+        ),
+        migrations.CreateModel(
+            name='GameSearchToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(max_length=64, verbose_name='Слово')),
+                ('weight', models.PositiveIntegerField(default=1, verbose_name='Вес')),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='search_tokens', to='games.game')),
+            ],
+            options={
+                'verbose_name': 'Поисковое слово',
+                'verbose_name_plural': 'Поисковые слова',
+                'unique_together': {('token', 'game')},
+            },
+        ),
+        migrations.SeparateDatabaseAndState(
+            state_operations=[
+                migrations.AddIndex(model_name='game', index=SEARCH_VECTOR_INDEX),
+            ],
+            database_operations=[
+                migrations.RunPython(create_search_vector_index, drop_search_vector_index),
+            ],
+        ),
+        migrations.RunPython(build_search_index, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0008_game_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Уменьшенные копии изображения'),
+        ),
+    ]
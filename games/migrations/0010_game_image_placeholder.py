@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('games', '0009_game_image_variants'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='game',
+            name='image_placeholder',
+            field=models.JSONField(blank=True, default=dict, editable=False, verbose_name='Заглушка изображения'),
+        ),
+    ]
@@ -1,7 +1,14 @@
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
+from django.db.models import F, FilteredRelation, Q, Value
+from django.db.models.functions import Coalesce
+from django.utils.text import Truncator
 from django.utils.translation import gettext_lazy as _
 from user.models import User
 from django.core.exceptions import ValidationError
+from django.db import transaction
 from datetime import datetime, time, timedelta
 import uuid
 
@@ -32,6 +39,33 @@ DIFFICULTY_CHOICES = [
     ('hard', _('Сложный')),
 ]
 
+# Length of the description shown in game lists, the full text is on the detail endpoint
+DESCRIPTION_PREVIEW_LENGTH = 300
+
+
+# Game columns kept up to date by queryset updates, a full save leaves them alone
+DATABASE_MANAGED_FIELDS = ('availability_version', 'search_vector', 'image_variants', 'image_placeholder')
+
+
+class GameQuerySet(models.QuerySet):
+    def localized(self, language, with_description=True):
+        """
+        Read title, description preview and sort key of one language from the
+        translation projection instead of loading every language's JSON
+        """
+        # A game without a row for the language reads as empty instead of NULL,
+        # which keyset pagination could not compare against
+        columns = {
+            'localized_title': Coalesce(F('localized__title'), Value('')),
+            'localized_sort_key': Coalesce(F('localized__sort_key'), Value('')),
+        }
+        if with_description:
+            columns['localized_description'] = Coalesce(F('localized__description_preview'), Value(''), output_field=models.TextField())
+        return self.annotate(
+            localized=FilteredRelation('translations', condition=Q(translations__language=language))
+        ).annotate(**columns).defer('title', 'description', 'search_vector')
+
+
 class Game(models.Model):
     # Multilingual fields - store as JSON
     title = models.JSONField(
@@ -83,6 +117,22 @@ class Game(models.Model):
         help_text=_('Загрузите привлекательное изображение игры (рекомендуется 800x600)')
     )
     
+    # Resized WebP and JPEG copies of image, written by games.images in the background
+    image_variants = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name=_('Уменьшенные копии изображения')
+    )
+    
+    # Dominant colour and a tiny inline preview shown until the image loads
+    image_placeholder = models.JSONField(
+        default=dict,
+        blank=True,
+        editable=False,
+        verbose_name=_('Заглушка изображения')
+    )
+    
     # Game details
     price = models.DecimalField(
         max_digits=8, 
@@ -101,6 +151,18 @@ class Game(models.Model):
         help_text=_('Длительность игры в минутах')
     )
     
+    slot_interval = models.PositiveIntegerField(
+        default=60,
+        verbose_name=_('Интервал между слотами (мин)'),
+        help_text=_('Шаг, с которым начинаются игры, в минутах')
+    )
+    
+    buffer_minutes = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_('Подготовка комнаты (мин)'),
+        help_text=_('Время на сброс комнаты после каждой игры, в минутах')
+    )
+    
     # Working hours
     working_hours_start = models.CharField(
         max_length=15,
@@ -141,6 +203,27 @@ class Game(models.Model):
         help_text=_('Статус автоматического перевода')
     )
     
+    # Monotonic counters behind the ETags of the game endpoints
+    content_version = models.PositiveBigIntegerField(
+        default=1,
+        editable=False,
+        verbose_name=_('Версия содержимого')
+    )
+    
+    availability_version = models.PositiveBigIntegerField(
+        default=1,
+        editable=False,
+        verbose_name=_('Версия доступности'),
+        help_text=_('Увеличивается при каждом изменении бронирований игры')
+    )
+    
+    # Folded title and description of every language, only filled on PostgreSQL
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+        verbose_name=_('Поисковый вектор')
+    )
+    
     created_at = models.DateTimeField(
         auto_now_add=True,
         verbose_name=_('Дата создания')
@@ -151,10 +234,16 @@ class Game(models.Model):
         verbose_name=_('Дата обновления')
     )
 
+    objects = GameQuerySet.as_manager()
+
     class Meta:
         verbose_name = _('Квест-игра')
         verbose_name_plural = _('Квест-игры')
         ordering = ['-is_featured', 'category', 'id']
+        indexes = [
+            # Created on PostgreSQL only, see migration 0008_game_search_index
+            GinIndex(fields=['search_vector'], name='game_search_vector'),
+        ]
 
     def __str__(self):
         # Use Russian title for admin display, fallback to first available
@@ -201,6 +290,32 @@ class Game(models.Model):
         
         return ''
     
+    def refresh_translations(self):
+        """Rebuild the per-language projection used by list queries"""
+        rows = []
+        for language, _name in settings.LANGUAGES:
+            title = self.get_title(language)
+            rows.append(GameTranslation(
+                game=self,
+                language=language,
+                title=title[:255],
+                description_preview=Truncator(self.get_description(language)).chars(DESCRIPTION_PREVIEW_LENGTH),
+                sort_key=title.casefold()[:255],
+            ))
+        GameTranslation.objects.bulk_create(
+            rows,
+            update_conflicts=True,
+            unique_fields=['game', 'language'],
+            update_fields=['title', 'description_preview', 'sort_key']
+        )
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored state so schedule changes can be detected on save
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+    
     def needs_translation(self):
         """Check if the game needs translation"""
         required_languages = ['en', 'es', 'uk']
@@ -224,7 +339,25 @@ class Game(models.Model):
             self.title = {}
         if not isinstance(self.description, dict):
             self.description = {}
+        
+        # Every save is a potential content change. The version is incremented in
+        # the database, a stale instance must not write back a version already used
+        adding = self._state.adding
+        if not adding:
+            self.content_version = F('content_version') + 1
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            kwargs['update_fields'] = set(update_fields) | {'content_version', 'updated_at'}
+        elif not adding:
+            # These are only written in the database, never written back from a
+            # possibly stale instance
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in DATABASE_MANAGED_FIELDS
+            ]
         super().save(*args, **kwargs)
+        if not adding:
+            self.refresh_from_db(fields=['content_version'])
 
     def clean(self):
         """Custom validation"""
@@ -236,10 +369,62 @@ class Game(models.Model):
                 'available_from': _('Поле "Доступно с" обязательно для предварительного бронирования')
             })
         
+        if self.slot_interval == 0:
+            raise ValidationError({
+                'slot_interval': _('Интервал между слотами должен быть больше 0')
+            })
+        
         if self.status == 'available_now' and self.available_from:
             # Optionally clear the field or just warn
             self.available_from = None
 
+
+
+class GameTranslation(models.Model):
+    """
+    Title and description preview of a game in one language
+
+    Denormalized from Game.title/description on every save so game lists
+    read a single narrow row per game instead of all translations.
+    """
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name='translations')
+    language = models.CharField(max_length=5, choices=settings.LANGUAGES, verbose_name=_('Язык'))
+    title = models.CharField(max_length=255, verbose_name=_('Название игры'))
+    description_preview = models.TextField(blank=True, verbose_name=_('Краткое описание'))
+    sort_key = models.CharField(max_length=255, verbose_name=_('Ключ сортировки'))
+
+    class Meta:
+        verbose_name = _('Перевод игры')
+        verbose_name_plural = _('Переводы игр')
+        unique_together = ['game', 'language']
+        indexes = [
+            models.Index(fields=['language', 'sort_key'], name='game_translation_sort'),
+        ]
+
+    def __str__(self):
+        return f"{self.game_id} [{self.language}] {self.title}"
+
+
+class GameSearchToken(models.Model):
+    """
+    One accent- and case-folded word of a game's title or description
+
+    Inverted index over every language, kept in line with the game on save.
+    Weight adds up the occurrences, title words count more.
+    """
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name='search_tokens')
+    token = models.CharField(max_length=64, verbose_name=_('Слово'))
+    weight = models.PositiveIntegerField(default=1, verbose_name=_('Вес'))
+
+    class Meta:
+        verbose_name = _('Поисковое слово')
+        verbose_name_plural = _('Поисковые слова')
+        # Token first, the unique index also serves exact and prefix lookups
+        unique_together = ['token', 'game']
+
+    def __str__(self):
+        return f"{self.game_id} {self.token} ({self.weight})"
+
     
 class Reservation(models.Model):
     STATUS_CHOICES = [
@@ -294,6 +479,14 @@ class Reservation(models.Model):
         verbose_name=_('Телефон')
     )
     
+    # Online bookings hold their slots only until this moment unless paid
+    hold_expires_at = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name=_('Бронь удерживается до'),
+        help_text=_('Неоплаченная бронь будет отменена после этого времени')
+    )
+    
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -305,6 +498,31 @@ class Reservation(models.Model):
         ordering = ['-created_at']
         # Prevent double booking
         # unique_together = ['game', 'date', 'time']
+        indexes = [
+            # Reservations of a game by date and status (availability, occupancy rebuilds)
+            models.Index(fields=['game', 'date', 'status'], name='reservation_game_date_status'),
+            # Only the reservations that hold capacity, on backends with partial indexes
+            models.Index(
+                fields=['game', 'date', 'time'],
+                condition=models.Q(status__in=['pending', 'confirmed']),
+                name='reservation_active_slot'
+            ),
+            # A user's reservations, newest first
+            models.Index(fields=['user', '-created_at'], name='reservation_user_created'),
+            # Expiry queue of unpaid holds
+            models.Index(
+                fields=['hold_expires_at'],
+                condition=models.Q(status='pending'),
+                name='reservation_pending_hold'
+            ),
+        ]
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored state so slot occupancy can be adjusted by the difference on save
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
     
     def save(self, *args, **kwargs):
         # Generate reference number if not exists
@@ -318,7 +536,16 @@ class Reservation(models.Model):
             else:
                 self.total_price = self.game.price * self.players
         
-        super().save(*args, **kwargs)
+        # Only a pending reservation can expire
+        if self.status != 'pending' and self.hold_expires_at:
+            self.hold_expires_at = None
+            update_fields = kwargs.get('update_fields')
+            if update_fields is not None:
+                kwargs['update_fields'] = {*update_fields, 'hold_expires_at'}
+        
+        # Slot occupancy is updated from post_save, keep both in one transaction
+        with transaction.atomic():
+            super().save(*args, **kwargs)
     
     def generate_reference_number(self):
         """Generate unique reference number"""
@@ -338,7 +565,38 @@ class Reservation(models.Model):
                 raise ValidationError({
                     'players': _('Максимум игроков для этой игры: %(max)s') % {'max': self.game.max_players}
                 })
+        
+        if self.game_id and self.players and self.date and self.time:
+            from .occupancy import CapacityError, check_capacity
+            try:
+                check_capacity(self)
+            except CapacityError as e:
+                raise ValidationError(_('Недостаточно мест: %(error)s') % {'error': e})
     
     def __str__(self):
         return f"{self.game.get_title('ru')} - {self.date} {self.time} ({self.reference_number})"
 
+
+class SlotOccupancy(models.Model):
+    """
+    Materialized used capacity per (game, date, slot start)
+
+    Maintained incrementally from Reservation signals and rebuilt with the
+    rebuild_slot_occupancy management command.
+    """
+    game = models.ForeignKey(Game, on_delete=models.CASCADE, related_name='slot_occupancy')
+    date = models.DateField(verbose_name=_('Дата'))
+    time = models.TimeField(verbose_name=_('Время'))
+    used_capacity = models.IntegerField(
+        default=0,
+        verbose_name=_('Занято мест')
+    )
+
+    class Meta:
+        verbose_name = _('Занятость слота')
+        verbose_name_plural = _('Занятость слотов')
+        ordering = ['date', 'time']
+        unique_together = ['game', 'date', 'time']
+
+    def __str__(self):
+        return f"{self.game_id} - {self.date} {self.time}: {self.used_capacity}"
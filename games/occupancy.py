@@ -0,0 +1,311 @@
+from collections import defaultdict
+from datetime import date, time, timedelta
+from typing import Dict, List, Tuple
+import logging
+
+from django.db import transaction
+from django.db.models import F
+
+from .models import Game, Reservation, SlotOccupancy
+from .utils import (
+    ACTIVE_RESERVATION_STATUSES,
+    MINUTES_PER_DAY,
+    calculate_slot_capacity,
+    crosses_midnight,
+    get_slot_template,
+    time_to_minutes,
+)
+from .versions import bump_availability_versions
+from .cache import invalidate_game_availability
+
+logger = logging.getLogger(__name__)
+
+
+class CapacityError(Exception):
+    """The requested slot can't take the requested number of players"""
+
+
+def _as_date(value) -> date:
+    return Reservation._meta.get_field('date').to_python(value)
+
+
+def _as_time(value) -> time:
+    return Reservation._meta.get_field('time').to_python(value)
+
+
+def get_game_slots(game) -> List[str]:
+    """All slot starts of a game's day in HH:MM format, without filtering past hours"""
+    return list(get_slot_template(game).labels)
+
+
+def reservation_slot_keys(game, reservation_date, reservation_time) -> List[Tuple[date, time]]:
+    """
+    (date, slot start) keys whose capacity a reservation consumes
+
+    Mirrors calculate_slot_capacity: a reservation counts against overlapping slots
+    of its own day, and of the previous day when working hours cross midnight.
+    """
+    reservation_date = _as_date(reservation_date)
+    reservation_time = _as_time(reservation_time)
+
+    template = get_slot_template(game)
+    reservation_start = time_to_minutes(reservation_time)
+    reservation_end = reservation_start + template.block
+
+    # Slot days paired with the reservation's offset on that day's minute axis
+    slot_days = [(reservation_date, 0)]
+    if crosses_midnight(game):
+        slot_days.append((reservation_date - timedelta(days=1), MINUTES_PER_DAY))
+
+    keys = []
+    for slot_date, offset in slot_days:
+        for slot_start, slot in zip(template.offsets, template.labels):
+            if (slot_start < reservation_end + offset
+                    and slot_start + template.block > reservation_start + offset):
+                keys.append((slot_date, time.fromisoformat(slot)))
+    return keys
+
+
+def apply_occupancy_delta(game, reservation_date, reservation_time, players: int):
+    """Add (or with negative players, release) a reservation's capacity on every slot it covers"""
+    if not players:
+        return
+
+    with transaction.atomic():
+        for slot_date, slot_time in reservation_slot_keys(game, reservation_date, reservation_time):
+            updated = SlotOccupancy.objects.filter(
+                game=game, date=slot_date, time=slot_time
+            ).update(used_capacity=F('used_capacity') + players)
+
+            # Releasing capacity never creates rows (e.g. the game's rows are being cascade-deleted)
+            if not updated and players > 0:
+                SlotOccupancy.objects.get_or_create(game=game, date=slot_date, time=slot_time)
+                SlotOccupancy.objects.filter(
+                    game=game, date=slot_date, time=slot_time
+                ).update(used_capacity=F('used_capacity') + players)
+
+
+def claim_capacity(game, reservation_date, reservation_time, players: int, bookable_only: bool = True):
+    """
+    Atomically take capacity for a new reservation on every slot it covers
+
+    Each slot row is bumped with a conditional UPDATE that only matches while the
+    slot still has room, so concurrent bookings serialize on the rows of the slots
+    they book and never on the whole table. Rows are visited in a fixed order to
+    avoid deadlocks between overlapping claims.
+
+    Must run in the same transaction that saves the reservation, which then has to
+    carry _capacity_claimed = True so the post_save sync doesn't add it twice.
+    Raises CapacityError when any slot is full, the caller's transaction rolls back.
+    bookable_only=False also accepts times off the slot grid, e.g. entered by staff.
+    """
+    reservation_date = _as_date(reservation_date)
+    reservation_time = _as_time(reservation_time)
+
+    if bookable_only and reservation_time.strftime('%H:%M') not in get_slot_template(game).labels:
+        raise CapacityError('Selected time is not a bookable slot')
+    if players > game.max_players:
+        raise CapacityError(f'Maximum players for this game: {game.max_players}')
+
+    keys = sorted(reservation_slot_keys(game, reservation_date, reservation_time))
+    with transaction.atomic():
+        SlotOccupancy.objects.bulk_create(
+            [SlotOccupancy(game=game, date=slot_date, time=slot_time) for slot_date, slot_time in keys],
+            ignore_conflicts=True
+        )
+        for slot_date, slot_time in keys:
+            claimed = SlotOccupancy.objects.filter(
+                game=game,
+                date=slot_date,
+                time=slot_time,
+                used_capacity__lte=game.max_players - players
+            ).update(used_capacity=F('used_capacity') + players)
+
+            if not claimed:
+                raise CapacityError(
+                    f'Not enough capacity at {slot_date} {slot_time.strftime("%H:%M")}'
+                )
+
+
+OCCUPANCY_FIELDS = ('game_id', 'date', 'time', 'players', 'status')
+
+
+def _reservation_state(values) -> Tuple:
+    """(game_id, date, time, players) if the reservation holds capacity, otherwise None"""
+    if not values or values['status'] not in ACTIVE_RESERVATION_STATUSES:
+        return None
+    return (values['game_id'], _as_date(values['date']), _as_time(values['time']), values['players'])
+
+
+def _current_values(reservation) -> Dict:
+    return {field: getattr(reservation, field) for field in OCCUPANCY_FIELDS}
+
+
+def _stored_state(reservation) -> Tuple:
+    loaded_values = getattr(reservation, '_loaded_values', None)
+    if loaded_values is not None:
+        # Deferred fields weren't loaded, so their stored value is still the current one
+        loaded_values = {
+            field: loaded_values[field] if field in loaded_values else getattr(reservation, field)
+            for field in OCCUPANCY_FIELDS
+        }
+    return _reservation_state(loaded_values)
+
+
+def check_capacity(reservation):
+    """
+    Raise CapacityError if saving the reservation would overfill a slot
+
+    A read-only check for forms, counting the capacity the reservation already
+    holds as free. The claim on save stays the authoritative one.
+    """
+    old_state = _stored_state(reservation)
+    new_state = _reservation_state(_current_values(reservation))
+    if not new_state or new_state == old_state:
+        return
+
+    game = reservation.game
+    if new_state[3] > game.max_players:
+        raise CapacityError(f'Maximum players for this game: {game.max_players}')
+
+    keys = reservation_slot_keys(game, new_state[1], new_state[2])
+    held = {}
+    if old_state and old_state[0] == game.id:
+        held = dict.fromkeys(reservation_slot_keys(game, old_state[1], old_state[2]), old_state[3])
+
+    used = {
+        (slot_date, slot_time): used_capacity
+        for slot_date, slot_time, used_capacity in SlotOccupancy.objects.filter(
+            game=game, date__in={slot_date for slot_date, _time in keys}
+        ).values_list('date', 'time', 'used_capacity')
+    }
+    for key in sorted(keys):
+        if used.get(key, 0) - held.get(key, 0) + new_state[3] > game.max_players:
+            raise CapacityError(f'Not enough capacity at {key[0]} {key[1].strftime("%H:%M")}')
+
+
+def sync_reservation_occupancy(reservation, deleted: bool = False):
+    """
+    Move a reservation's capacity from its stored state to its current state
+
+    The stored state is what from_db loaded (nothing for new reservations),
+    the current state is the saved instance (nothing when deleted).
+
+    Capacity is only ever added through claim_capacity, so re-activating a cancelled
+    reservation into a full slot raises CapacityError and Reservation.save rolls back.
+
+    Returns the (game, reservation date, reservation time) states that were released or added.
+    """
+    old_state = _stored_state(reservation)
+    new_state = None if deleted else _reservation_state(_current_values(reservation))
+
+    changed = []
+    if old_state != new_state:
+        with transaction.atomic():
+            if old_state:
+                game = reservation.game if old_state[0] == reservation.game_id else Game.objects.get(pk=old_state[0])
+                apply_occupancy_delta(game, old_state[1], old_state[2], -old_state[3])
+                changed.append((game, old_state[1], old_state[2]))
+            if new_state:
+                # A new reservation booked through claim_capacity already holds its slots.
+                # Anything else taking capacity (a new or re-activated reservation, a move
+                # to another slot, more players) claims it, raising CapacityError when full
+                if old_state or not getattr(reservation, '_capacity_claimed', False):
+                    claim_capacity(reservation.game, new_state[1], new_state[2], new_state[3],
+                                   bookable_only=False)
+                changed.append((reservation.game, new_state[1], new_state[2]))
+
+    reservation._capacity_claimed = False
+
+    # The saved state becomes the baseline for the next save of this instance
+    reservation._loaded_values = None if deleted else _current_values(reservation)
+    return changed
+
+
+def compute_occupancy(game, date_from: date, date_to: date) -> Dict[Tuple[date, time], int]:
+    """Used capacity per (date, slot start) recomputed from the raw reservations"""
+    query_end = date_to + timedelta(days=1) if crosses_midnight(game) else date_to
+    reservations_by_date = defaultdict(list)
+    for reservation_date, reservation_time, players in Reservation.objects.filter(
+        game=game,
+        date__range=(date_from, query_end),
+        status__in=ACTIVE_RESERVATION_STATUSES
+    ).order_by().values_list('date', 'time', 'players'):
+        reservations_by_date[reservation_date].append((reservation_time, players))
+
+    slots = get_game_slots(game)
+    occupancy = {}
+
+    # Only days holding reservations (or followed by one, for late slots) can have usage
+    days = set(reservations_by_date)
+    if crosses_midnight(game):
+        days.update(day - timedelta(days=1) for day in reservations_by_date)
+
+    for day in sorted(days):
+        if day < date_from or day > date_to:
+            continue
+        next_day = day + timedelta(days=1)
+        for slot in calculate_slot_capacity(
+            game,
+            day,
+            slots,
+            reservations_by_date.get(day, []),
+            reservations_by_date.get(next_day, []) if crosses_midnight(game) else []
+        ):
+            if slot['used_capacity']:
+                occupancy[(day, time.fromisoformat(slot['time']))] = slot['used_capacity']
+    return occupancy
+
+
+def _stored_occupancy(game, date_from: date, date_to: date) -> Dict[Tuple[date, time], int]:
+    return {
+        (slot_date, slot_time): used
+        for slot_date, slot_time, used in SlotOccupancy.objects.filter(
+            game=game, date__range=(date_from, date_to)
+        ).exclude(used_capacity=0).values_list('date', 'time', 'used_capacity')
+    }
+
+
+def rebuild_occupancy(game, date_from: date, date_to: date) -> int:
+    """Replace the stored occupancy of a game's date range, returns the number of rows written"""
+    occupancy = compute_occupancy(game, date_from, date_to)
+
+    with transaction.atomic():
+        SlotOccupancy.objects.filter(game=game, date__range=(date_from, date_to)).delete()
+        SlotOccupancy.objects.bulk_create([
+            SlotOccupancy(game=game, date=slot_date, time=slot_time, used_capacity=used)
+            for (slot_date, slot_time), used in occupancy.items()
+        ], batch_size=1000)
+        # Cached availability of the game was read from the replaced rows
+        bump_availability_versions([game.id])
+        transaction.on_commit(lambda: invalidate_game_availability(game.id))
+
+    logger.info(f"Rebuilt {len(occupancy)} occupancy rows for game {game.id}")
+    return len(occupancy)
+
+
+def verify_occupancy(game, date_from: date, date_to: date) -> List[Dict]:
+    """List the (date, time) keys where stored and recomputed occupancy disagree"""
+    expected = compute_occupancy(game, date_from, date_to)
+    stored = _stored_occupancy(game, date_from, date_to)
+
+    mismatches = []
+    for slot_date, slot_time in sorted(set(expected) | set(stored)):
+        if expected.get((slot_date, slot_time), 0) != stored.get((slot_date, slot_time), 0):
+            mismatches.append({
+                'date': slot_date,
+                'time': slot_time,
+                'expected': expected.get((slot_date, slot_time), 0),
+                'stored': stored.get((slot_date, slot_time), 0),
+            })
+    return mismatches
+
+
+def get_occupancy(game_ids, date_from: date, date_to: date) -> Dict[Tuple[int, date, str], int]:
+    """Stored used capacity keyed by (game_id, date, HH:MM) - a single indexed range scan"""
+    return {
+        (game_id, slot_date, slot_time.strftime('%H:%M')): used
+        for game_id, slot_date, slot_time, used in SlotOccupancy.objects.filter(
+            game_id__in=game_ids, date__range=(date_from, date_to)
+        ).order_by().values_list('game_id', 'date', 'time', 'used_capacity')
+    }
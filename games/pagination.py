@@ -0,0 +1,166 @@
+"""
+Keyset (cursor) pagination
+
+Pages are selected with a WHERE on the full sort key of the last row seen
+instead of OFFSET, so every page costs the same as the first one. Unlike
+DRF's CursorPagination the whole ordering tuple goes into the cursor, which
+keeps low-cardinality leading fields like is_featured cheap.
+"""
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Forward and backward keyset pagination over a fixed ordering
+
+    The last ordering field must be unique. The total count is included unless
+    the client passes ?count=0, which saves the COUNT(*) on every page.
+    """
+    ordering = ('id',)
+    page_size = api_settings.PAGE_SIZE
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    count_query_param = 'count'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        return min(max(page_size, 1), self.max_page_size)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode()).decode())
+            values, reverse = cursor['p'], bool(cursor.get('r'))
+        except (TypeError, ValueError, KeyError, UnicodeDecodeError):
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(values, list) or len(values) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return values, reverse
+
+    def encode_cursor(self, values, reverse=False):
+        cursor = {'p': values}
+        if reverse:
+            cursor['r'] = 1
+        # Full isoformat: a timestamp rounded to milliseconds would skip or repeat rows
+        encoded = urlsafe_b64encode(
+            json.dumps(cursor, default=lambda value: value.isoformat()).encode()
+        ).decode()
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def clean_position(self, queryset, values):
+        """Cursor values converted to the types of their ordering fields"""
+        cleaned = []
+        for field, value in zip(self.ordering, values):
+            name = field.lstrip('-')
+            if name in queryset.query.annotations:
+                model_field = queryset.query.annotations[name].output_field
+            else:
+                model_field = queryset.model._meta.get_field(name)
+            try:
+                if value is None:
+                    raise ValueError(value)
+                cleaned.append(model_field.to_python(value))
+            except (TypeError, ValueError, ValidationError):
+                raise NotFound(self.invalid_cursor_message)
+        return cleaned
+
+    def get_position(self, obj):
+        return [getattr(obj, field.lstrip('-')) for field in self.ordering]
+
+    @staticmethod
+    def position_filter(ordering, values):
+        """Rows strictly after the given position in the given ordering"""
+        condition = Q()
+        equal = {}
+        for field, value in zip(ordering, values):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        page_size = self.get_page_size(request)
+        values, reverse = self.decode_cursor(request)
+        if values is not None:
+            values = self.clean_position(queryset, values)
+
+        self.include_count = request.query_params.get(self.count_query_param) not in ('0', 'false')
+        if self.include_count:
+            self.count = queryset.order_by().count()
+
+        ordering = self.ordering
+        if reverse:
+            ordering = [field[1:] if field.startswith('-') else f'-{field}' for field in ordering]
+
+        queryset = queryset.order_by(*ordering)
+        if values is not None:
+            queryset = queryset.filter(self.position_filter(ordering, values))
+
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+
+        # Going backwards, the page we came from is always ahead
+        has_next = True if reverse else has_more
+        has_previous = has_more if reverse else values is not None
+
+        self.next_position = self.get_position(results[-1]) if has_next and results else None
+        self.previous_position = self.get_position(results[0]) if has_previous and results else None
+        return results
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    def get_paginated_response(self, data):
+        response = OrderedDict()
+        if self.include_count:
+            response['count'] = self.count
+        response['next'] = self.get_next_link()
+        response['previous'] = self.get_previous_link()
+        response['results'] = data
+        return Response(response)
+
+
+class GameKeysetPagination(KeysetPagination):
+    """Games in catalog order: featured first, then by category"""
+    ordering = ('-is_featured', 'category', 'id')
+
+
+class FeaturedGameKeysetPagination(KeysetPagination):
+    """Featured games by category and localized title, needs Game.objects.localized()"""
+    ordering = ('category', 'localized_sort_key', 'id')
+
+
+class ReservationKeysetPagination(KeysetPagination):
+    """A user's reservations, newest first"""
+    ordering = ('-created_at', 'id')
+    page_size = 20
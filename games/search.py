@@ -0,0 +1,146 @@
+"""
+Multilingual game search
+
+Title and description of every language are folded into plain words (accents
+stripped, case folded), so "panico" finds "Pánico" and a query in any
+language finds the game. The words are kept in the GameSearchToken inverted
+index. On PostgreSQL the same folded text is also stored in Game.search_vector
+behind a GIN index and ranked with ts_rank.
+"""
+import re
+import unicodedata
+from collections import Counter
+from functools import reduce
+from operator import or_
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connections, transaction
+from django.db.models import Exists, F, OuterRef, Q, Subquery, Sum, Value
+
+from .models import Game, GameSearchToken
+
+# Letters and digits only, so tokens are also valid tsquery lexemes
+WORD_RE = re.compile(r'[^\W_]+')
+
+MAX_TOKEN_LENGTH = 64
+MAX_QUERY_TERMS = 8
+
+TITLE_WEIGHT = 4
+DESCRIPTION_WEIGHT = 1
+
+# Sorts after every character a prefix can be followed by
+PREFIX_UPPER_BOUND = '\U0010ffff'
+
+
+def fold_text(text: str) -> str:
+    """Strip accents and fold case: 'Pánico' -> 'panico', 'Їжак' -> 'іжак'"""
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(char for char in decomposed if not unicodedata.combining(char)).casefold()
+
+
+def tokenize(text) -> list:
+    if not isinstance(text, str):
+        return []
+    return [word[:MAX_TOKEN_LENGTH] for word in WORD_RE.findall(fold_text(text))]
+
+
+def _translations(value):
+    return value.values() if isinstance(value, dict) else []
+
+
+def document_words(title, description):
+    """Folded words of every language of a title and description JSON"""
+    title_words = [word for text in _translations(title) for word in tokenize(text)]
+    description_words = [word for text in _translations(description) for word in tokenize(text)]
+    return title_words, description_words
+
+
+def document_weights(title, description) -> Counter:
+    title_words, description_words = document_words(title, description)
+    weights = Counter()
+    for word in title_words:
+        weights[word] += TITLE_WEIGHT
+    for word in description_words:
+        weights[word] += DESCRIPTION_WEIGHT
+    return weights
+
+
+def search_document(title, description):
+    """tsvector expression of a game, title words rank above description words"""
+    title_words, description_words = document_words(title, description)
+    return (
+        SearchVector(Value(' '.join(title_words)), weight='A', config='simple')
+        + SearchVector(Value(' '.join(description_words)), weight='B', config='simple')
+    )
+
+
+def index_game(game):
+    """Bring the search index of one game in line with its title and description"""
+    weights = document_weights(game.title, game.description)
+    with transaction.atomic():
+        stored = dict(GameSearchToken.objects.filter(game=game).values_list('token', 'weight'))
+        removed = set(stored) - set(weights)
+        if removed:
+            GameSearchToken.objects.filter(game=game, token__in=removed).delete()
+
+        changed = [
+            GameSearchToken(game=game, token=token, weight=weight)
+            for token, weight in weights.items()
+            if stored.get(token) != weight
+        ]
+        if changed:
+            GameSearchToken.objects.bulk_create(
+                changed,
+                update_conflicts=True,
+                unique_fields=['token', 'game'],
+                update_fields=['weight']
+            )
+
+        if connections[Game.objects.db].vendor == 'postgresql':
+            Game.objects.filter(pk=game.pk).update(
+                search_vector=search_document(game.title, game.description)
+            )
+
+
+def _search_postgresql(queryset, terms):
+    *words, prefix = terms
+    query = SearchQuery(' & '.join(words + [f'{prefix}:*']), search_type='raw', config='simple')
+    return queryset.filter(search_vector=query).annotate(
+        search_rank=SearchRank(F('search_vector'), query)
+    )
+
+
+def _search_tokens(queryset, terms):
+    *words, prefix = terms
+    conditions = [Q(token=word) for word in words]
+    conditions.append(Q(token__gte=prefix, token__lt=prefix + PREFIX_UPPER_BOUND))
+
+    # Every word has to match, in any language
+    for condition in conditions:
+        queryset = queryset.filter(
+            Exists(GameSearchToken.objects.filter(condition, game=OuterRef('pk')))
+        )
+
+    rank = (
+        GameSearchToken.objects
+        .filter(reduce(or_, conditions), game=OuterRef('pk'))
+        .order_by()
+        .values('game')
+        .annotate(total=Sum('weight'))
+        .values('total')
+    )
+    return queryset.annotate(search_rank=Subquery(rank))
+
+
+def search_games(queryset, query):
+    """
+    Games of queryset matching every word of query, the last word as a prefix
+
+    Annotates search_rank, higher is better. A query without words matches nothing.
+    """
+    terms = tokenize(query)[:MAX_QUERY_TERMS]
+    if not terms:
+        return queryset.none().annotate(search_rank=Value(0))
+    if connections[queryset.db].vendor == 'postgresql':
+        return _search_postgresql(queryset, terms)
+    return _search_tokens(queryset, terms)
@@ -1,26 +1,79 @@
 from rest_framework import serializers
+from django.conf import settings
 from .models import Game
+from .images import FORMATS, current_variants, pick_variant
 from django.contrib.auth import get_user_model
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError as DjangoValidationError
 
 User = get_user_model()
 
-class GameSerializer(serializers.ModelSerializer):
+class SparseFieldsetMixin:
+    """
+    Serialize only the field names listed in context['fields'] (all when missing)
+
+    Meta.field_columns maps fields that aren't backed by a model column of the
+    same name to the columns they read, so views can narrow their queryset.
+    """
+    extra_fields = ()
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        requested = self.context.get('fields')
+        if requested is not None:
+            for name in set(self.fields) - set(requested):
+                self.fields.pop(name)
+    
+    def wants(self, name):
+        requested = self.context.get('fields')
+        return requested is None or name in requested
+    
+    @classmethod
+    def get_available_fields(cls):
+        """Every field a client can request, including the ones added in to_representation"""
+        return [*cls().fields, *cls.extra_fields]
+    
+    @classmethod
+    def get_columns(cls, field_names):
+        """Model columns the given fields read"""
+        model_fields = {field.name for field in cls.Meta.model._meta.concrete_fields}
+        field_columns = getattr(cls.Meta, 'field_columns', {})
+        declared = cls().fields
+        
+        columns = set()
+        for name in field_names:
+            if name in field_columns:
+                columns.update(field_columns[name])
+            elif name in declared and declared[name].source in model_fields:
+                columns.add(declared[name].source)
+        return columns
+
+class GameSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
     """Serializer for API - returns data for frontend with language-specific content"""
     
     # Add computed fields for current language
     title_localized = serializers.SerializerMethodField()
     description_localized = serializers.SerializerMethodField()
+    image_srcset = serializers.SerializerMethodField()
+    image_placeholder = serializers.SerializerMethodField()
+    
+    extra_fields = ('working_hours',)
     
     class Meta:
         model = Game
         fields = [
             'id', 'title', 'description', 'title_localized', 'description_localized',
-            'category', 'difficulty', 'status', 'image', 'price', 
+            'category', 'difficulty', 'status', 'image', 'image_srcset', 'image_placeholder', 'price', 
             'max_players', 'duration', 'working_hours_start', 
             'working_hours_end', 'is_featured', 'is_active'
         ]
+        field_columns = {
+            'title_localized': ['title'],
+            'description_localized': ['description'],
+            'image_srcset': ['image', 'image_variants'],
+            'image_placeholder': ['image', 'image_variants', 'image_placeholder'],
+            'working_hours': ['working_hours_start', 'working_hours_end'],
+        }
     
     def get_title_localized(self, obj):
         """Get title in the requested language"""
@@ -44,15 +97,47 @@ class GameSerializer(serializers.ModelSerializer):
         language = self.context.get('language', 'en')
         
         # Replace title and description with localized versions
-        data['title'] = instance.get_title(language)
-        data['description'] = instance.get_description(language)
+        if 'title' in data:
+            data['title'] = instance.get_title(language)
+        if 'description' in data:
+            data['description'] = instance.get_description(language)
         
         # Format working hours for frontend
-        if instance.working_hours_start and instance.working_hours_end:
+        if self.wants('working_hours') and instance.working_hours_start and instance.working_hours_end:
             data['working_hours'] = f"{instance.working_hours_start}-{instance.working_hours_end}"
         
         return data
     
+    def media_url(self, name):
+        url = Game._meta.get_field('image').storage.url(name)
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request else url
+    
+    def get_image_srcset(self, obj):
+        """
+        Resized copies as srcset strings per format plus the original size,
+        None until they've been built for the current image
+        """
+        variants = current_variants(obj)
+        if variants is None:
+            return None
+        srcset = {
+            key: ', '.join(
+                f'{self.media_url(path)} {width}w'
+                for width, path in sorted(variants[key].items(), key=lambda item: int(item[0]))
+            )
+            for key in FORMATS if variants.get(key)
+        }
+        srcset['width'] = variants['width']
+        srcset['height'] = variants['height']
+        return srcset
+    
+    def get_image_placeholder(self, obj):
+        """Dominant colour and inline preview of the current image, None until built"""
+        if current_variants(obj) is None or not obj.image_placeholder:
+            return None
+        return obj.image_placeholder
+    
     def get_image_url(self, obj):
         """
         Get full URL for the image
@@ -64,15 +149,62 @@ class GameSerializer(serializers.ModelSerializer):
             return obj.image.url
         return None
 
-class FeaturedGameSerializer(GameSerializer):
+class GameListSerializer(GameSerializer):
     """
-    Serializer for featured games with additional fields if needed
+    Game lists from a Game.objects.localized() queryset
+
+    Title and description come from the single-language projection, the
+    description is shortened to a preview.
     """
+    title = serializers.CharField(source='localized_title', read_only=True)
+    description = serializers.CharField(source='localized_description', read_only=True)
+    title_localized = serializers.CharField(source='localized_title', read_only=True)
+    description_localized = serializers.CharField(source='localized_description', read_only=True)
+    
+    image = serializers.SerializerMethodField()
+    
     class Meta(GameSerializer.Meta):
+        # Title and description come from annotations, not from columns
+        field_columns = {
+            'image': ['image', 'image_variants'],
+            'image_srcset': ['image', 'image_variants'],
+            'image_placeholder': ['image', 'image_variants', 'image_placeholder'],
+            'working_hours': ['working_hours_start', 'working_hours_end'],
+        }
+    
+    def get_image(self, obj):
+        """Lists link the list-sized JPEG copy, the original only until it's built"""
+        if not obj.image:
+            return None
+        variants = current_variants(obj)
+        path = variants and pick_variant(variants, 'jpeg', settings.GAME_IMAGE_LIST_WIDTH)
+        return self.media_url(path or obj.image.name)
+    
+    def to_representation(self, instance):
+        # Skip GameSerializer's per-object language lookups
+        data = serializers.ModelSerializer.to_representation(self, instance)
+        
+        if not instance.is_active:
+            return None
+        
+        if self.wants('working_hours') and instance.working_hours_start and instance.working_hours_end:
+            data['working_hours'] = f"{instance.working_hours_start}-{instance.working_hours_end}"
+        
+        return data
+
+class FeaturedGameSerializer(GameListSerializer):
+    """
+    Serializer for featured games with additional fields if needed
+    """
+    class Meta(GameListSerializer.Meta):
         pass
 
 from rest_framework import serializers
+from django.db import transaction
 from .models import Game, Reservation
+from .occupancy import claim_capacity
+from .expiry import get_hold_expiry
+from .utils import get_booking_restriction, get_spain_now
 
 class TimeSlotSerializer(serializers.Serializer):
     time = serializers.CharField()
@@ -121,7 +253,18 @@ class BookingSerializer(serializers.ModelSerializer):
             'first_name', 'last_name', 'email'
         ]
     
+    def validate(self, attrs):
+        game = attrs['game']
+        if not game.is_active:
+            raise serializers.ValidationError({'game': 'This game is not available for booking'})
+        
+        error = get_booking_restriction(game, attrs['date'], get_spain_now())
+        if error:
+            raise serializers.ValidationError({'date': error})
+        return attrs
+    
     def create(self, validated_data):
+        """Create the reservation, raises CapacityError if the slot is already full"""
         # Extract user data
         first_name = validated_data.pop('first_name')
         last_name = validated_data.pop('last_name')
@@ -148,7 +291,21 @@ class BookingSerializer(serializers.ModelSerializer):
         validated_data['user'] = user
         validated_data['email'] = email
         
-        return super().create(validated_data)
+        # Capacity is claimed and the reservation saved in one transaction,
+        # so two concurrent bookings can't both take the last places of a slot
+        with transaction.atomic():
+            claim_capacity(
+                validated_data['game'],
+                validated_data['date'],
+                validated_data['time'],
+                validated_data['players']
+            )
+            reservation = Reservation(**validated_data)
+            reservation.hold_expires_at = get_hold_expiry()
+            reservation._capacity_claimed = True
+            reservation.save()
+        
+        return reservation
     
 class ReservationSerializer(serializers.ModelSerializer):
     game = GameSerializer(read_only=True)  # Include game details
@@ -158,5 +315,5 @@ class ReservationSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'reference_number', 'game', 'date', 'time', 
             'players', 'total_price', 'status', 'special_requirements',
-            'created_at'
+            'hold_expires_at', 'created_at'
         ]
\ No newline at end of file
@@ -1,10 +1,28 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Game
+from .models import Game, Reservation
 from . services import GeminiTranslationService
+from .occupancy import sync_reservation_occupancy, rebuild_occupancy
+from .utils import get_spain_now, invalidate_slot_template
+from .versions import bump_availability_versions
+from .cache import invalidate_availability, invalidate_game_availability, reservation_availability_keys
+from .events import publish_capacity_changes
+from .catalog import bump_catalog_version
+from .search import index_game
+from .images import schedule_image_variants
+from .bootstrap import invalidate_contacts
+from user.models import Contacts
+from datetime import timedelta
 import logging
 logger = logging.getLogger(__name__)
 
+# Game fields that define the slot grid - changing any of them invalidates stored occupancy
+SCHEDULE_FIELDS = ('working_hours_start', 'working_hours_end', 'duration', 'slot_interval', 'buffer_minutes')
+
+# How far ahead occupancy is rebuilt after a schedule change
+OCCUPANCY_REBUILD_DAYS = 365
+
 
 @receiver(post_save, sender=Game)
 def handle_game_translation(sender, instance, created, **kwargs):
@@ -38,4 +56,110 @@ def handle_game_translation(sender, instance, created, **kwargs):
         logger.error(f"Error in translation signal handler: {e}")
         instance.translation_status = 'failed'
         instance._skip_translation = True
-        instance.save(update_fields=['translation_status'])
\ No newline at end of file
+        instance.save(update_fields=['translation_status'])
+
+
+def publish_availability_change(changed):
+    """
+    Bump the games' availability versions for the ETags, then once committed
+    drop the cached availability of exactly the touched dates and push the new
+    capacities to stream subscribers
+    """
+    if not changed:
+        return
+
+    bump_availability_versions({game.id for game, _date, _time in changed})
+
+    def on_commit():
+        invalidate_availability(
+            key for game, reservation_date, _time in changed
+            for key in reservation_availability_keys(game, reservation_date)
+        )
+        try:
+            publish_capacity_changes(changed)
+        except Exception as e:
+            # The write already committed, a failed push must not surface as a booking error
+            logger.error(f"Error publishing capacity changes: {e}")
+
+    transaction.on_commit(on_commit)
+
+
+@receiver(post_save, sender=Reservation)
+def update_slot_occupancy(sender, instance, **kwargs):
+    """Keep slot occupancy in line with reservation create, status or slot changes"""
+    publish_availability_change(sync_reservation_occupancy(instance))
+
+
+@receiver(post_delete, sender=Reservation)
+def release_slot_occupancy(sender, instance, **kwargs):
+    """Release the capacity held by a deleted reservation"""
+    publish_availability_change(sync_reservation_occupancy(instance, deleted=True))
+
+
+@receiver(post_save, sender=Game)
+@receiver(post_delete, sender=Game)
+def drop_slot_template(sender, instance, **kwargs):
+    """The memoized slot grid is recompiled from the saved schedule on next use"""
+    invalidate_slot_template(instance.pk)
+    # Title, schedule and capacity are all part of the cached availability
+    game_id = instance.pk
+    transaction.on_commit(lambda: invalidate_game_availability(game_id))
+
+
+@receiver(post_save, sender=Game)
+def refresh_game_translations(sender, instance, created, update_fields=None, **kwargs):
+    """Keep the per-language list projection in line with title and description"""
+    if created or update_fields is None or {'title', 'description'} & set(update_fields):
+        instance.refresh_translations()
+
+
+@receiver(post_save, sender=Game)
+def refresh_game_search_index(sender, instance, created, update_fields=None, **kwargs):
+    """Re-index the words of the game when title or description may have changed"""
+    if created or update_fields is None or {'title', 'description'} & set(update_fields):
+        index_game(instance)
+
+
+@receiver(post_save, sender=Game)
+@receiver(post_delete, sender=Game)
+def invalidate_catalog(sender, instance, **kwargs):
+    """Every rendered catalog page is re-rendered on next request after any game change"""
+    transaction.on_commit(bump_catalog_version)
+
+
+@receiver(post_save, sender=Game)
+def build_image_variants(sender, instance, update_fields=None, **kwargs):
+    """Resize a new or replaced image in the background"""
+    if update_fields is not None and 'image' not in update_fields:
+        return
+    built_from = (instance.image_variants or {}).get('source', '')
+    if (instance.image.name or '') != built_from:
+        schedule_image_variants(instance.pk)
+
+
+@receiver(post_save, sender=Contacts)
+@receiver(post_delete, sender=Contacts)
+def drop_contacts_fragment(sender, instance, **kwargs):
+    """Contacts are part of the bootstrap response"""
+    transaction.on_commit(invalidate_contacts)
+
+
+@receiver(post_save, sender=Game)
+def rebuild_occupancy_on_schedule_change(sender, instance, created, **kwargs):
+    """Slot starts and overlaps depend on the schedule, so recompute upcoming occupancy"""
+    loaded_values = getattr(instance, '_loaded_values', None)
+
+    # Fields that were deferred on load can't have been changed through this instance
+    if not created and loaded_values and any(
+        loaded_values[field] != getattr(instance, field)
+        for field in SCHEDULE_FIELDS if field in loaded_values
+    ):
+        today = get_spain_now().date()
+        rebuild_occupancy(instance, today - timedelta(days=1), today + timedelta(days=OCCUPANCY_REBUILD_DAYS))
+
+    # The saved schedule becomes the baseline for the next save of this instance
+    if loaded_values is None:
+        instance._loaded_values = loaded_values = {}
+    for field in SCHEDULE_FIELDS:
+        if field in instance.__dict__:
+            loaded_values[field] = getattr(instance, field)
@@ -1,4 +1,43 @@
-from django.test import TestCase
+import asyncio
+import json
+import random
+import re
+import shutil
+import tempfile
+from base64 import urlsafe_b64encode
+from datetime import date, datetime, time, timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.db.models import F
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone, translation
+from PIL import Image
+
+from billing.models import Invoice, Payment
+from games.cache import get_availability_cache_stats, get_cached_available_times
+from games.catalog import COMPACT_FIELDS
+from games.events import EVENTS_CHANNEL, broker, deliver_capacity_changes, publish_capacity_changes
+from games.facets import get_facets
+from games.images import (
+    PLACEHOLDER_SIZE, build_placeholder, build_variants, generate_image_variants, open_image, variant_widths
+)
+from games.models import DESCRIPTION_PREVIEW_LENGTH, Game, GameTranslation, Reservation, SlotOccupancy
+from games.occupancy import CapacityError, claim_capacity
+from games.search import MAX_TOKEN_LENGTH, fold_text, search_games, tokenize
+from games.utils import (
+    ACTIVE_RESERVATION_STATUSES, MINUTES_PER_DAY, SPAIN_TZ, find_next_available_slots,
+    generate_time_slots, get_available_times, get_available_times_range, get_spain_now,
+    get_venue_availability, sweep_slot_usage
+)
+from user.models import Contacts, User
 
 import qrcode
 def create_qr():
@@ -8,3 +47,963 @@ def create_qr():
 
   img = qr.make_image(fill_color="black", back_color="white")
   img.save("vidadenoche_qr.png")
+
+
+LANGUAGES = ('ru', 'en', 'es', 'uk')
+
+
+def create_game(**kwargs):
+    fields = {
+        'title': {language: 'Game' for language in LANGUAGES},
+        'description': {language: 'Game' for language in LANGUAGES},
+        'price': 10,
+        'max_players': 4,
+        'duration': 60,
+        'working_hours_start': '10:00',
+        'working_hours_end': '22:00',
+        'image': 'games/game.jpg',
+    }
+    fields.update(kwargs)
+    return Game.objects.create(**fields)
+
+
+def used_capacity(game, slot_date, slot_time):
+    occupancy = SlotOccupancy.objects.filter(
+        game=game, date=slot_date, time=time.fromisoformat(slot_time)
+    ).first()
+    return occupancy.used_capacity if occupancy else 0
+
+
+class HotQueryPlanTests(TestCase):
+    """
+    Every hot reservation and billing query must be answered from an index
+
+    The plans are taken with EXPLAIN on the test database. PostgreSQL is told to
+    avoid sequential scans, so a seq scan in its plan means no usable index exists.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.game = create_game(max_players=6, working_hours_start='18:00', working_hours_end='00:00')
+        cls.user = User.objects.create(email='plans@example.com')
+        cls.date = date.today() + timedelta(days=1)
+        cls.reservation = Reservation.objects.create(
+            user=cls.user, game=cls.game, date=cls.date, time='18:00',
+            players=2, email=cls.user.email
+        )
+        Invoice.objects.create(user=cls.user, reservation=cls.reservation, total=20)
+
+    def hot_queries(self):
+        week = (self.date, self.date + timedelta(days=7))
+        return {
+            'availability': Reservation.objects.filter(
+                game=self.game, date__range=week, status__in=ACTIVE_RESERVATION_STATUSES
+            ).order_by().values_list('date', 'time', 'players'),
+            'occupancy': SlotOccupancy.objects.filter(
+                game_id__in=[self.game.id], date__range=week
+            ).order_by(),
+            'user reservations': Reservation.objects.filter(user=self.user).order_by('-created_at'),
+            'expired holds': Reservation.objects.filter(
+                status='pending', hold_expires_at__lte=timezone.now()
+            ).order_by('hold_expires_at'),
+            'payment by reference': Payment.objects.filter(reference='cs_test'),
+            'invoice by reservation': Invoice.objects.filter(reservation=self.reservation),
+            'invoice numbering': Invoice.objects.filter(
+                invoice_date__gte=self.date.replace(day=1), invoice_date__lt=self.date + timedelta(days=31)
+            ),
+        }
+
+    def test_hot_queries_use_indexes(self):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                cursor.execute('SET LOCAL enable_seqscan = off')
+            full_scan = re.compile(r'Seq Scan on (\w+)')
+        elif connection.vendor == 'sqlite':
+            full_scan = re.compile(r'\bSCAN (\w+)')
+        else:
+            self.skipTest(f'No query plan check for {connection.vendor}')
+
+        for name, queryset in self.hot_queries().items():
+            with self.subTest(query=name):
+                plan = queryset.explain()
+                self.assertIsNone(full_scan.search(plan), f'{name} scans a whole table:\n{plan}')
+
+
+class CapacityClaimTests(TestCase):
+    """Slot capacity is only ever taken through the conditional claim"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.game = create_game()
+        cls.user = User.objects.create(email='claims@example.com')
+        cls.date = get_spain_now().date() + timedelta(days=2)
+
+    def reserve(self, players, slot='19:00', **kwargs):
+        return Reservation.objects.create(
+            user=self.user, game=self.game, date=self.date, time=slot,
+            players=players, email=self.user.email, **kwargs
+        )
+
+    def book(self, players):
+        session = self.client.session
+        session['booking_email'] = self.user.email
+        session.save()
+        return self.client.post(reverse('games:create-booking'), {
+            'game': self.game.id,
+            'date': self.date.isoformat(),
+            'time': '19:00',
+            'players': players,
+            'email': self.user.email,
+            'first_name': 'Ana',
+            'last_name': 'Garcia',
+        }, content_type='application/json')
+
+    def test_booking_a_full_slot_conflicts(self):
+        self.assertEqual(self.book(4).status_code, 201)
+
+        response = self.book(1)
+        self.assertEqual(response.status_code, 409)
+        self.assertEqual(self.game.reservation_set.count(), 1)
+        self.assertEqual(used_capacity(self.game, self.date, '19:00'), 4)
+
+    def test_claim_only_updates_slots_with_room(self):
+        claim_capacity(self.game, self.date, '19:00', 3)
+        with self.assertRaises(CapacityError):
+            claim_capacity(self.game, self.date, '19:00', 2)
+        claim_capacity(self.game, self.date, '19:00', 1)
+
+        self.assertEqual(used_capacity(self.game, self.date, '19:00'), 4)
+
+    def test_reactivating_into_a_full_slot_is_refused(self):
+        expired = self.reserve(4)
+        expired.status = 'cancelled'
+        expired.save()
+        self.reserve(4)
+
+        expired.status = 'confirmed'
+        with self.assertRaises(CapacityError):
+            expired.save()
+
+        expired.refresh_from_db()
+        self.assertEqual(expired.status, 'cancelled')
+        self.assertEqual(used_capacity(self.game, self.date, '19:00'), 4)
+
+    def test_reactivating_into_a_free_slot_claims_it(self):
+        reservation = self.reserve(3, status='cancelled')
+        self.assertEqual(used_capacity(self.game, self.date, '19:00'), 0)
+
+        reservation.status = 'confirmed'
+        reservation.save()
+        self.assertEqual(used_capacity(self.game, self.date, '19:00'), 3)
+
+
+class ReservationAdminTests(TestCase):
+    """Staff saving a reservation into a full slot get a form error, not a 500"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.game = create_game()
+        cls.staff = User.objects.create_superuser(email='staff@example.com', password='secret')
+        cls.date = get_spain_now().date() + timedelta(days=2)
+
+    def setUp(self):
+        self.client.force_login(self.staff)
+        Reservation.objects.create(
+            user=self.staff, game=self.game, date=self.date, time='19:00', players=3, email=self.staff.email
+        )
+        self.reservation = Reservation.objects.create(
+            user=self.staff, game=self.game, date=self.date, time='19:00', players=1,
+            email=self.staff.email, status='cancelled'
+        )
+
+    def change(self, **fields):
+        data = {
+            'user': self.staff.id,
+            'game': self.game.id,
+            'date': self.date.isoformat(),
+            'time': '19:00',
+            'players': self.reservation.players,
+            'total_price': '10',
+            'status': self.reservation.status,
+            'reference_number': self.reservation.reference_number,
+            'email': self.reservation.email,
+            'hold_expires_at_0': '',
+            'hold_expires_at_1': '',
+        }
+        data.update(fields)
+        return self.client.post(reverse('admin:games_reservation_change', args=[self.reservation.pk]), data)
+
+    def test_overfilling_a_slot_is_a_form_error(self):
+        response = self.change(status='confirmed', players=2)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'Not enough capacity at')
+
+        self.reservation.refresh_from_db()
+        self.assertEqual(self.reservation.status, 'cancelled')
+        self.assertEqual(used_capacity(self.game, self.date, '19:00'), 3)
+
+    def test_saving_within_capacity(self):
+        response = self.change(status='confirmed')
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(used_capacity(self.game, self.date, '19:00'), 4)
+
+        # The capacity the reservation already holds counts as free
+        self.reservation.refresh_from_db()
+        self.assertEqual(self.change(special_requirements='Birthday').status_code, 302)
+
+    def test_slot_taken_between_validation_and_save(self):
+        with mock.patch('games.occupancy.check_capacity'):
+            claim_capacity(self.game, self.date, '19:00', 1)
+            response = self.change(status='confirmed')
+
+        self.assertRedirects(response, reverse('admin:games_reservation_change', args=[self.reservation.pk]))
+        self.reservation.refresh_from_db()
+        self.assertEqual(self.reservation.status, 'cancelled')
+
+
+def encode_cursor(values):
+    return urlsafe_b64encode(json.dumps({'p': values}).encode()).decode()
+
+
+class KeysetPaginationTests(TestCase):
+    def walk(self, url, **params):
+        """ids of every page reached by following next"""
+        ids = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids += [game['id'] for game in response.json()['results']]
+            if not response.json()['next']:
+                return ids
+            response = self.client.get(response.json()['next'])
+
+    def test_cursor_values_of_the_wrong_type_are_not_found(self):
+        create_game()
+        for values in ([True, 'a', 'abc'], [True, 'escape', None], [True, 'escape', [1]]):
+            with self.subTest(values=values):
+                response = self.client.get(reverse('games:game-list'), {'cursor': encode_cursor(values)})
+                self.assertEqual(response.status_code, 404)
+                self.assertEqual(response.json(), {'detail': 'Invalid cursor'})
+
+    def test_featured_pages_keep_games_without_a_translation_row(self):
+        games = [create_game(is_featured=True, title={'en': title}) for title in ('Bravo', 'Alpha', 'Charlie')]
+        games[0].translations.filter(language='en').delete()
+
+        ids = self.walk(reverse('games:featured-games'), page_size=1, lang='en', count=0)
+        self.assertEqual(ids, [games[0].id, games[1].id, games[2].id])
+
+
+class ContentVersionTests(TestCase):
+    def test_stale_save_never_reuses_a_version(self):
+        game = create_game()
+        stale = Game.objects.get(pk=game.pk)
+        # The image job bumps the version in the database meanwhile
+        Game.objects.filter(pk=game.pk).update(content_version=F('content_version') + 1)
+
+        stale.price = 12
+        stale.save()
+        self.assertEqual(stale.content_version, 3)
+        self.assertEqual(Game.objects.get(pk=game.pk).content_version, 3)
+
+        stale.save(update_fields=['price'])
+        self.assertEqual(Game.objects.get(pk=game.pk).content_version, 4)
+
+
+class GameTranslationTests(TestCase):
+    """Game lists read one GameTranslation row per game instead of the JSON columns"""
+
+    def setUp(self):
+        cache.clear()
+
+    def row(self, game, language):
+        return GameTranslation.objects.get(game=game, language=language)
+
+    def list_titles(self, language='en'):
+        response = self.client.get(reverse('games:game-list'), {'lang': language})
+        self.assertEqual(response.status_code, 200)
+        return [game['title'] for game in response.json()['results']]
+
+    def test_rows_are_built_for_every_language(self):
+        game = create_game(title={'en': 'Panic Room', 'es': 'Sala del Pánico'}, description={'en': 'x' * 400})
+
+        self.assertEqual(game.translations.count(), len(LANGUAGES))
+        spanish = self.row(game, 'es')
+        self.assertEqual(spanish.title, 'Sala del Pánico')
+        self.assertEqual(spanish.sort_key, 'sala del pánico')
+        # Missing languages fall back to English like Game.get_title
+        self.assertEqual(self.row(game, 'uk').title, 'Panic Room')
+        self.assertEqual(len(self.row(game, 'en').description_preview), DESCRIPTION_PREVIEW_LENGTH)
+
+    def test_rows_are_rebuilt_on_save(self):
+        game = create_game(title={'en': 'Panic'})
+
+        game.title = {'en': 'Renamed'}
+        game.save()
+        self.assertEqual(self.row(game, 'en').title, 'Renamed')
+
+        # Saves that can't have touched title or description leave the rows alone
+        GameTranslation.objects.filter(game=game, language='en').update(title='Stale')
+        game.price = 20
+        game.save(update_fields=['price'])
+        self.assertEqual(self.row(game, 'en').title, 'Stale')
+
+        game.refresh_translations()
+        self.assertEqual(self.row(game, 'en').title, 'Renamed')
+
+    def test_list_reads_the_projection(self):
+        game = create_game(title={'en': 'Panic'})
+        GameTranslation.objects.filter(game=game, language='en').update(title='Projected')
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.list_titles(), ['Projected'])
+        self.assertFalse(any('"games_game"."title"' in query['sql'] for query in queries))
+
+    def test_game_without_a_row_for_the_language_is_listed_untitled(self):
+        game = create_game(title={'en': 'Panic'})
+        create_game(title={'en': 'Pirate'})
+        game.translations.filter(language='en').delete()
+
+        self.assertEqual(sorted(self.list_titles()), ['', 'Pirate'])
+        self.assertEqual(Game.objects.localized('en').get(pk=game.pk).localized_sort_key, '')
+
+
+class TimeSlotTests(TestCase):
+    def test_hour_fractions_align_to_the_clock(self):
+        self.assertEqual(generate_time_slots('10:30', '14:00', 60), ['11:00', '12:00', '13:00'])
+        self.assertEqual(generate_time_slots('10:10', '11:30', 30, 30), ['10:30', '11:00'])
+        self.assertEqual(generate_time_slots('22:00', '00:00', 60), ['22:00', '23:00'])
+
+    def test_other_intervals_step_from_opening(self):
+        self.assertEqual(
+            generate_time_slots('10:00', '22:00', 90, 90),
+            ['10:00', '11:30', '13:00', '14:30', '16:00', '17:30', '19:00', '20:30']
+        )
+        self.assertEqual(generate_time_slots('18:00', '23:00', 50, 50),
+                         ['18:00', '18:50', '19:40', '20:30', '21:20', '22:10'])
+
+
+class AvailabilityCacheTests(TestCase):
+    """Cached availability is dropped per (game, date) once a change commits"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.game = create_game()
+        cls.user = User.objects.create(email='cache@example.com')
+        cls.date = get_spain_now().date() + timedelta(days=2)
+
+    def setUp(self):
+        cache.clear()
+
+    def used_at(self, slot, game=None, day=None):
+        result = get_cached_available_times((game or self.game).id, (day or self.date).isoformat(), 'en')
+        return next(entry['used_capacity'] for entry in result['time_slots'] if entry['time'] == slot)
+
+    def book(self, slot='19:00', game=None, day=None):
+        with self.captureOnCommitCallbacks(execute=True):
+            Reservation.objects.create(
+                user=self.user, game=game or self.game, date=day or self.date, time=slot,
+                players=3, email=self.user.email
+            )
+
+    def test_hits_skip_the_database(self):
+        get_cached_available_times(self.game.id, self.date.isoformat(), 'en')
+        with self.assertNumQueries(0):
+            get_cached_available_times(self.game.id, self.date.isoformat(), 'en')
+        self.assertEqual(get_availability_cache_stats()['hits'], 1)
+
+    def test_booking_drops_only_its_date(self):
+        other_date = self.date + timedelta(days=1)
+        self.assertEqual(self.used_at('19:00'), 0)
+        self.assertEqual(self.used_at('19:00', day=other_date), 0)
+
+        self.book()
+        self.assertEqual(get_availability_cache_stats()['evictions'], 1)
+        self.assertEqual(self.used_at('19:00'), 3)
+        with self.assertNumQueries(0):
+            self.used_at('19:00', day=other_date)
+
+    def test_nothing_changes_before_commit(self):
+        self.assertEqual(self.used_at('19:00'), 0)
+        with self.captureOnCommitCallbacks(execute=False) as callbacks:
+            Reservation.objects.create(
+                user=self.user, game=self.game, date=self.date, time='19:00',
+                players=3, email=self.user.email
+            )
+            # A read inside the uncommitted change is stored under the current versions
+            self.assertEqual(self.used_at('19:00'), 0)
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.used_at('19:00'), 3)
+
+    def test_booking_after_midnight_drops_the_previous_day(self):
+        late_game = create_game(working_hours_start='18:00', working_hours_end='00:00', buffer_minutes=30)
+        next_day = self.date + timedelta(days=1)
+        self.assertEqual(self.used_at('23:00', game=late_game), 0)
+
+        self.book('00:00', game=late_game, day=next_day)
+        self.assertEqual(get_availability_cache_stats()['evictions'], 2)
+        self.assertEqual(self.used_at('23:00', game=late_game), 3)
+
+    def test_game_edit_drops_every_date(self):
+        get_cached_available_times(self.game.id, self.date.isoformat(), 'en')
+        with self.captureOnCommitCallbacks(execute=True), mock.patch('games.signals.schedule_image_variants'):
+            self.game.title = {**self.game.title, 'en': 'Renamed'}
+            self.game.save()
+
+        result = get_cached_available_times(self.game.id, self.date.isoformat(), 'en')
+        self.assertEqual(result['game_title'], 'Renamed')
+
+    def test_unknown_game_is_an_error(self):
+        self.assertIn('error', get_cached_available_times(0, self.date.isoformat(), 'en'))
+
+
+class AvailabilityEventTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.game = create_game()
+        cls.date = get_spain_now().date() + timedelta(days=2)
+
+    def test_changes_cross_processes_on_the_shared_channel(self):
+        claim_capacity(self.game, self.date, '19:00', 2)
+        with override_settings(AVAILABILITY_EVENTS_URL='redis://localhost:6379/2'), \
+                mock.patch('games.events.get_redis') as get_redis:
+            publish_capacity_changes([(self.game, self.date, time(19))])
+        channel, payload = get_redis.return_value.publish.call_args.args
+        self.assertEqual(channel, EVENTS_CHANNEL)
+        self.assertEqual(json.loads(payload), [[self.game.id, self.date.isoformat(), ['19:00']]])
+
+        # What the listener of another process does with the message
+        loop = asyncio.new_event_loop()
+        key = (self.game.id, self.date.isoformat())
+
+        async def subscribe():
+            return broker.subscribe(key)
+
+        try:
+            subscription = loop.run_until_complete(subscribe())
+            deliver_capacity_changes({key: {'19:00'}})
+            message = loop.run_until_complete(asyncio.wait_for(subscription[1].get(), timeout=1))
+        finally:
+            broker.unsubscribe(key, subscription)
+            loop.close()
+        self.assertEqual(message['time_slots'][0]['time'], '19:00')
+        self.assertEqual(message['time_slots'][0]['used_capacity'], 2)
+
+
+class SlotOccupancyTests(TestCase):
+    """The SlotOccupancy counters follow every reservation change"""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.game = create_game(max_players=6)
+        # Open until midnight, with the room reset the 23:00 session runs past it
+        cls.late_game = create_game(max_players=6, working_hours_start='18:00', working_hours_end='00:00',
+                                    buffer_minutes=30)
+        cls.user = User.objects.create(email='occupancy@example.com')
+        cls.date = get_spain_now().date() + timedelta(days=2)
+
+    def reserve(self, game=None, slot='19:00', players=2, reservation_date=None, **kwargs):
+        return Reservation.objects.create(
+            user=self.user, game=game or self.game, date=reservation_date or self.date,
+            time=slot, players=players, email=self.user.email, **kwargs
+        )
+
+    def test_create_takes_capacity(self):
+        self.reserve(players=2)
+        self.reserve(players=3)
+        self.assertEqual(used_capacity(self.game, self.date, '19:00'), 5)
+        self.assertEqual(used_capacity(self.game, self.date, '18:00'), 0)
+
+    def test_status_changes_release_and_retake_capacity(self):
+        reservation = self.reserve(players=3)
+
+        reservation.status = 'confirmed'
+        reservation.save()
+        self.assertEqual(used_capacity(self.game, self.date, '19:00'), 3)
+
+        reservation.status = 'cancelled'
+        reservation.save()
+        self.assertEqual(used_capacity(self.game, self.date, '19:00'), 0)
+
+        reservation.status = 'pending'
+        reservation.save()
+        self.assertEqual(used_capacity(self.game, self.date, '19:00'), 3)
+
+    def test_moving_a_reservation_moves_its_capacity(self):
+        reservation = self.reserve(players=3)
+
+        reservation.time = '20:00'
+        reservation.players = 4
+        reservation.save()
+        self.assertEqual(used_capacity(self.game, self.date, '19:00'), 0)
+        self.assertEqual(used_capacity(self.game, self.date, '20:00'), 4)
+
+    def test_delete_releases_capacity(self):
+        reservation = self.reserve(players=3)
+        self.reserve(players=1)
+
+        reservation.delete()
+        self.assertEqual(used_capacity(self.game, self.date, '19:00'), 1)
+
+    def test_reservations_after_midnight_use_late_slots_of_the_previous_day(self):
+        next_day = self.date + timedelta(days=1)
+        self.reserve(game=self.late_game, slot='00:00', players=4, reservation_date=next_day)
+
+        self.assertEqual(used_capacity(self.late_game, self.date, '23:00'), 4)
+        self.assertEqual(used_capacity(self.late_game, self.date, '22:00'), 0)
+
+        slots = get_available_times(self.late_game.id, self.date.isoformat())['time_slots']
+        late_slot = next(slot for slot in slots if slot['time'] == '23:00')
+        self.assertEqual(late_slot['used_capacity'], 4)
+
+    def test_rebuild_command_verifies_and_repairs(self):
+        self.reserve(players=3)
+        self.reserve(game=self.late_game, slot='00:00', players=2,
+                     reservation_date=self.date + self.date.resolution)
+        options = {'date_from': self.date.isoformat(), 'date_to': self.date.isoformat(), 'stdout': StringIO()}
+
+        call_command('rebuild_slot_occupancy', verify=True, **options)
+
+        SlotOccupancy.objects.filter(game=self.game).update(used_capacity=5)
+        with self.assertRaisesMessage(CommandError, '1 occupancy mismatches found'):
+            call_command('rebuild_slot_occupancy', verify=True, **options)
+
+        call_command('rebuild_slot_occupancy', **options)
+        call_command('rebuild_slot_occupancy', verify=True, **options)
+        self.assertEqual(used_capacity(self.game, self.date, '19:00'), 3)
+        self.assertEqual(used_capacity(self.late_game, self.date, '23:00'), 2)
+
+
+def pairwise_slot_usage(slot_starts, slot_length, intervals):
+    """The overlap loops the sweep replaced: every (slot, interval) pair"""
+    return [
+        sum(players for start, end, players in intervals
+            if slot_start < end and slot_start + slot_length > start)
+        for slot_start in slot_starts
+    ]
+
+
+class SweepSlotUsageTests(TestCase):
+    def test_matches_pairwise_overlaps(self):
+        rng = random.Random(7)
+        for _ in range(300):
+            slot_length = rng.choice([30, 45, 60, 90, 120])
+            interval = rng.choice([15, 30, 60, 90])
+            opening = rng.randrange(0, 16 * 60, 15)
+            slot_starts = list(range(opening, MINUTES_PER_DAY, interval))
+
+            intervals = []
+            for _ in range(rng.randint(0, 40)):
+                edge = rng.choice(slot_starts) + rng.choice([0, slot_length, -slot_length])
+                start = rng.choice([
+                    edge,                                    # touching a slot at either end
+                    rng.randrange(0, MINUTES_PER_DAY),       # anywhere on the day
+                    MINUTES_PER_DAY + rng.randrange(0, 180), # after midnight, next day's axis
+                ])
+                intervals.append((start, start + slot_length, rng.randint(1, 6)))
+
+            with self.subTest(slot_length=slot_length, interval=interval, intervals=intervals):
+                self.assertEqual(
+                    sweep_slot_usage(slot_starts, slot_length, intervals),
+                    pairwise_slot_usage(slot_starts, slot_length, intervals)
+                )
+
+    def test_touching_intervals_dont_overlap(self):
+        # Sessions ending when the slot starts or starting when it ends leave it free
+        self.assertEqual(sweep_slot_usage([600, 660, 720], 60, [(540, 600, 2), (720, 780, 3)]), [0, 0, 3])
+        # A late slot runs into a session right after midnight
+        self.assertEqual(sweep_slot_usage([1380], 90, [(1440, 1530, 4)]), [4])
+
+
+class CatalogCacheTests(TestCase):
+    """Game lists are served from rendered bytes until any game changes"""
+
+    def setUp(self):
+        cache.clear()
+        self.game = create_game(title={'en': 'Panic'})
+
+    def titles(self, **params):
+        response = self.client.get(reverse('games:game-list'), {'lang': 'en', **params})
+        self.assertEqual(response.status_code, 200)
+        return [game['title'] for game in response.json()['results']]
+
+    def change(self, action):
+        with self.captureOnCommitCallbacks(execute=True), mock.patch('games.signals.schedule_image_variants'):
+            action()
+
+    def test_hit_skips_the_orm_and_serializers(self):
+        first = self.client.get(reverse('games:game-list'), {'lang': 'en'})
+        with self.assertNumQueries(0), \
+                mock.patch('games.views.GameListAPIView.get_serializer') as get_serializer:
+            second = self.client.get(reverse('games:game-list'), {'lang': 'en'})
+        get_serializer.assert_not_called()
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+    def test_game_save_and_delete_bump_the_version(self):
+        other = create_game(title={'en': 'Pirate'})
+        self.assertEqual(sorted(self.titles()), ['Panic', 'Pirate'])
+
+        self.game.title = {'en': 'Renamed'}
+        self.change(self.game.save)
+        self.assertEqual(sorted(self.titles()), ['Pirate', 'Renamed'])
+
+        self.change(other.delete)
+        self.assertEqual(self.titles(), ['Renamed'])
+
+    def test_revalidation_is_a_304(self):
+        etag = self.client.get(reverse('games:game-list'), {'lang': 'en'})['ETag']
+        response = self.client.get(reverse('games:game-list'), {'lang': 'en'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_uncached_variants_keep_an_etag(self):
+        for params in ({'page_size': 1}, {'fields': 'id,title'}, {'omit': 'description'}):
+            with self.subTest(params=params):
+                url = reverse('games:game-list')
+                etag = self.client.get(url, params)['ETag']
+                self.assertEqual(self.client.get(url, params, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        etag = self.client.get(reverse('games:game-list'), {'page_size': 1})['ETag']
+        self.change(lambda: Game.objects.get(pk=self.game.pk).save())
+        self.assertNotEqual(self.client.get(reverse('games:game-list'), {'page_size': 1})['ETag'], etag)
+
+
+class BootstrapTests(TestCase):
+    """The SPA startup calls in one response, revalidated from the fragment ETags"""
+
+    def setUp(self):
+        cache.clear()
+        self.game = create_game(title={'en': 'Panic', 'es': 'Pánico'}, is_featured=True)
+        self.contacts = Contacts.objects.create(
+            facebook_page='fb', instagram_page='ig', whatsapp_number='+34600000000'
+        )
+
+    def get(self, **headers):
+        return self.client.get(reverse('games:bootstrap'), {'lang': 'es'}, **headers)
+
+    def change(self, action):
+        with self.captureOnCommitCallbacks(execute=True), mock.patch('games.signals.schedule_image_variants'):
+            action()
+
+    def test_fragments(self):
+        response = self.get()
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+
+        self.assertEqual(data['language'], 'es')
+        self.assertEqual([game['title'] for game in data['featured']], ['Pánico'])
+        self.assertEqual(data['stats'], {'total_games': 1, 'featured_games': 1, 'categories_count': 1})
+        self.assertEqual(data['contacts']['whatsapp_number'], '+34600000000')
+        self.assertIn('escape', [choice['value'] for choice in data['categories']])
+        self.assertIn('easy', [choice['value'] for choice in data['difficulties']])
+        self.assertTrue(data['csrfToken'])
+        self.assertIn('csrftoken', response.cookies)
+        self.assertIn('private', response['Cache-Control'])
+
+    def test_repeat_visit_is_a_304(self):
+        etag = self.get()['ETag']
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+
+    def test_contacts_change_the_etag(self):
+        etag = self.get()['ETag']
+        self.contacts.whatsapp_number = '+34611111111'
+        self.change(self.contacts.save)
+
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['contacts']['whatsapp_number'], '+34611111111')
+
+    def test_catalog_change_the_etag(self):
+        etag = self.get()['ETag']
+        self.change(lambda: create_game(is_featured=True))
+
+        response = self.get(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['stats']['featured_games'], 2)
+
+
+class FacetTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_labels_follow_the_requested_language(self):
+        with mock.patch('games.facets.compute_facets', side_effect=lambda data: translation.get_language()):
+            for language in ('es', 'uk'):
+                response = self.client.get('/api/games/facets/', {'lang': language})
+                # Built with the language active and cached per language
+                self.assertEqual(response.json(), language)
+
+    def test_counts_skip_their_own_filter(self):
+        create_game(category='horror', price=25)
+        create_game(category='horror', price=35)
+        create_game(category='team', price=25)
+
+        facets = get_facets({'category': 'horror', 'min_price': None, 'max_price': 30}, 'en')
+        self.assertEqual(facets['total'], 1)
+        counts = {entry['value']: entry['count'] for entry in facets['category']}
+        self.assertEqual((counts['horror'], counts['team']), (1, 1))
+        counts = {entry['value']: entry['count'] for entry in facets['price']}
+        self.assertEqual((counts['20-30'], counts['30-40']), (1, 1))
+
+
+class AvailabilityRangeTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = SPAIN_TZ.localize(datetime(2030, 1, 10, 19, 30))
+        cls.game = create_game(working_hours_start='18:00', working_hours_end='20:00')
+        for slot in ('18:00', '19:00'):
+            claim_capacity(cls.game, date(2030, 1, 11), slot, 3)
+
+    def get_range(self, date_from, date_to, players=None, game_id=None):
+        with mock.patch('games.utils.get_spain_now', return_value=self.now):
+            return get_available_times_range(str(game_id or self.game.id), date_from, date_to, players)
+
+    def test_days(self):
+        result = self.get_range('2030-01-09', '2030-01-12', players=2)
+        days = {day['date']: day for day in result['days']}
+
+        self.assertEqual(days['2030-01-09']['error'], 'Cannot book for past dates')
+        # Both of today's slots already started
+        self.assertEqual(days['2030-01-10']['time_slots'], [])
+        self.assertEqual(
+            [(slot['time'], slot['available_capacity']) for slot in days['2030-01-11']['time_slots']],
+            [('18:00', 1), ('19:00', 1)]
+        )
+        self.assertEqual(result['summary'], {
+            '2030-01-09': False, '2030-01-10': False, '2030-01-11': False, '2030-01-12': True,
+        })
+        self.assertTrue(self.get_range('2030-01-11', '2030-01-11', players=1)['summary']['2030-01-11'])
+
+    def test_query_count_does_not_depend_on_the_days(self):
+        with CaptureQueriesContext(connection) as one_day:
+            self.get_range('2030-01-11', '2030-01-11')
+        with CaptureQueriesContext(connection) as thirty_days:
+            result = self.get_range('2030-01-11', '2030-02-09')
+        self.assertEqual(len(result['days']), 30)
+        self.assertEqual(len(thirty_days), len(one_day))
+
+    def test_invalid_input(self):
+        self.assertEqual(self.get_range('2030-01-11', '2030-01-11', game_id='abc')['error'], 'Invalid game_id')
+        self.assertEqual(self.get_range('11/01/2030', '2030-01-11')['error'], 'Invalid date format. Use YYYY-MM-DD')
+        self.assertEqual(self.get_range('2030-01-11', '2030-01-11', game_id=self.game.id + 1)['error'], 'Game not found')
+
+        response = self.client.get(reverse('games:available-times-range'), {
+            'game_id': 'abc', 'date_from': '2030-01-11', 'date_to': '2030-01-11'
+        })
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Invalid game_id', 'days': []})
+
+
+class VenueAvailabilityTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = SPAIN_TZ.localize(datetime(2030, 1, 10, 19, 30))
+        cls.hourly = create_game(title={'en': 'Hourly'}, working_hours_start='18:00', working_hours_end='21:00')
+        cls.long = create_game(
+            title={'en': 'Long'}, working_hours_start='18:00', working_hours_end='21:00',
+            duration=90, slot_interval=30
+        )
+
+    def get_venue(self, selected_date='2030-01-11', players=None):
+        with mock.patch('games.utils.get_spain_now', return_value=self.now):
+            return get_venue_availability(selected_date, players)
+
+    def rows(self, result):
+        return {row['title']: row for row in result['games']}
+
+    def test_games_are_aligned_on_the_shared_hours(self):
+        result = self.get_venue()
+        self.assertEqual(result['hours'], ['18:00', '18:30', '19:00', '19:30', '20:00'])
+        rows = self.rows(result)
+        self.assertEqual(rows['Hourly']['capacity'], [4, None, 4, None, 4])
+        self.assertEqual(rows['Long']['capacity'], [4, 4, 4, 4, None])
+
+    def test_bookable_summary(self):
+        # 18:30-20:00 overlaps every slot of the long game
+        claim_capacity(self.long, date(2030, 1, 11), '18:30', 3)
+
+        rows = self.rows(self.get_venue(players=2))
+        self.assertEqual(rows['Long']['capacity'], [1, 1, 1, 1, None])
+        self.assertFalse(rows['Long']['bookable'])
+        self.assertTrue(rows['Hourly']['bookable'])
+        self.assertTrue(self.rows(self.get_venue(players=1))['Long']['bookable'])
+
+        # Today only the slots that didn't start yet count
+        result = self.get_venue('2030-01-10')
+        self.assertEqual(result['hours'], ['19:30', '20:00'])
+        rows = self.rows(result)
+        self.assertEqual(rows['Hourly']['capacity'], [None, 4])
+        self.assertEqual(rows['Long']['capacity'], [4, None])
+
+    def test_query_count_does_not_depend_on_the_number_of_games(self):
+        with CaptureQueriesContext(connection) as two_games:
+            self.get_venue()
+        for _ in range(5):
+            create_game()
+        with CaptureQueriesContext(connection) as seven_games:
+            result = self.get_venue()
+        self.assertEqual(len(result['games']), 7)
+        self.assertEqual(len(seven_games), len(two_games))
+
+
+class NextAvailableSlotTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.now = SPAIN_TZ.localize(datetime(2030, 1, 10, 19, 30))
+        cls.game = create_game(working_hours_start='18:00', working_hours_end='22:00')
+
+    def search(self, players, **kwargs):
+        with mock.patch('games.utils.get_spain_now', return_value=self.now):
+            return find_next_available_slots(players, **kwargs)
+
+    def test_slots_that_already_started_are_skipped(self):
+        result = self.search(2, limit=3)
+        self.assertEqual(
+            [(slot['date'], slot['time']) for slot in result['results']],
+            [('2030-01-10', '20:00'), ('2030-01-10', '21:00'), ('2030-01-11', '18:00')]
+        )
+
+    def test_search_stops_at_the_horizon(self):
+        for slot in ('20:00', '21:00'):
+            claim_capacity(self.game, date(2030, 1, 10), slot, 4)
+
+        self.assertEqual(self.search(1, horizon_days=1)['results'], [])
+        result = self.search(1, horizon_days=2)
+        self.assertEqual((result['results'][0]['date'], result['results'][0]['time']), ('2030-01-11', '18:00'))
+        self.assertEqual(result['date_to'], '2030-01-11')
+
+    def test_days_are_validated(self):
+        response = self.client.get(reverse('games:next-available-slots'), {'players': 2, 'days': 0})
+        self.assertEqual(response.status_code, 400)
+
+
+class SparseFieldsetTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.game = create_game()
+
+    def get(self, **params):
+        return self.client.get(reverse('games:game-detail', kwargs={'id': self.game.id}), params)
+
+    def test_fields_selects_and_omit_drops(self):
+        self.assertEqual(set(self.get(fields='id,title').json()), {'id', 'title'})
+        self.assertEqual(set(self.get(fields='id,title,price', omit='price').json()), {'id', 'title'})
+
+        full = self.get().json()
+        omitted = self.get(omit='description').json()
+        self.assertEqual(set(full) - set(omitted), {'description'})
+
+    def test_compact_preset(self):
+        self.assertEqual(set(self.get(fields='compact').json()), set(COMPACT_FIELDS))
+
+    def test_unknown_fields_are_rejected(self):
+        response = self.get(fields='id,password')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'fields': 'Unknown fields: password'})
+
+        response = self.get(omit='secret')
+        self.assertEqual(response.status_code, 400)
+
+
+class SearchTests(TestCase):
+    def test_tokenize_folds_accents_case_and_punctuation(self):
+        self.assertEqual(fold_text('Pánico'), 'panico')
+        self.assertEqual(tokenize('¡El PÁNICO, de_la casa!'), ['el', 'panico', 'de', 'la', 'casa'])
+        self.assertEqual(tokenize('Квест-кімната 2'), ['квест', 'кімната', '2'])
+        self.assertEqual(tokenize('a' * 100), ['a' * MAX_TOKEN_LENGTH])
+        self.assertEqual(tokenize(None), [])
+
+    def test_title_match_ranks_above_description_match(self):
+        described = create_game(
+            title={'es': 'Laboratorio', 'en': 'Laboratory'},
+            description={'es': 'Un hospital abandonado', 'en': 'An abandoned hospital'},
+        )
+        titled = create_game(
+            title={'es': 'Hospital', 'en': 'Hospital'},
+            description={'es': 'Escapa', 'en': 'Escape'},
+        )
+        create_game(title={'es': 'Pirata', 'en': 'Pirate'})
+
+        found = search_games(Game.objects.all(), 'HOSPITAL').order_by('-search_rank', 'id')
+        self.assertEqual(list(found), [titled, described])
+
+        # The last word is a prefix, every word has to match
+        self.assertEqual(list(search_games(Game.objects.all(), 'abandoned hosp')), [described])
+        self.assertEqual(list(search_games(Game.objects.all(), '?!')), [])
+
+    def test_search_endpoint(self):
+        game = create_game(title={'es': 'Pánico', 'en': 'Panic'})
+        create_game(title={'es': 'Pirata', 'en': 'Pirate'})
+
+        response = self.client.get(reverse('games:game-search'), {'q': 'panico', 'fields': 'id'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), [{'id': game.id}])
+
+
+class ImageVariantTests(TestCase):
+    def setUp(self):
+        media_root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media_root)
+        settings_override = override_settings(MEDIA_ROOT=media_root, GAME_IMAGE_WIDTHS=[320, 640])
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def upload(self, name, size, color='red', exif=None):
+        buffer = BytesIO()
+        Image.new('RGB', size, color).save(buffer, 'JPEG', exif=exif or Image.Exif())
+        return default_storage.save(name, ContentFile(buffer.getvalue()))
+
+    def test_variant_widths(self):
+        self.assertEqual(variant_widths(1000), [320, 640])
+        self.assertEqual(variant_widths(500), [320, 500])
+        self.assertEqual(variant_widths(320), [320])
+        self.assertEqual(variant_widths(100), [100])
+
+    def test_variants_are_resized_without_exif(self):
+        exif = Image.Exif()
+        exif[0x010f] = 'Camera'
+        name = self.upload('games/photo.jpg', (1000, 500), exif=exif)
+
+        variants = build_variants(default_storage, name, open_image(default_storage, name))
+        self.assertEqual((variants['source'], variants['width'], variants['height']), (name, 1000, 500))
+        self.assertEqual(set(variants['webp']), {'320', '640'})
+        self.assertEqual(variants['jpeg']['640'], 'games/photo-640.jpg')
+
+        with default_storage.open(variants['jpeg']['320']) as f:
+            copy = Image.open(f)
+            self.assertEqual(copy.size, (320, 160))
+            self.assertEqual(len(copy.getexif()), 0)
+        with default_storage.open(variants['webp']['640']) as f:
+            self.assertEqual(Image.open(f).format, 'WEBP')
+
+    def test_placeholder(self):
+        placeholder = build_placeholder(Image.new('RGB', (400, 200), (20, 40, 200)))
+        self.assertEqual(placeholder['color'], '#1428c8')
+        self.assertTrue(placeholder['preview'].startswith('data:image/jpeg;base64,'))
+        self.assertEqual((placeholder['width'], placeholder['height']), (PLACEHOLDER_SIZE, PLACEHOLDER_SIZE // 2))
+
+    def test_generate_image_variants_stores_them_once(self):
+        game = create_game(image=self.upload('games/room.jpg', (800, 600)))
+        content_version = Game.objects.get(pk=game.pk).content_version
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertTrue(generate_image_variants(game.pk))
+        game.refresh_from_db()
+        self.assertEqual(game.image_variants['source'], game.image.name)
+        self.assertTrue(default_storage.exists(game.image_variants['webp']['640']))
+        self.assertTrue(game.image_placeholder['preview'])
+        self.assertEqual(game.content_version, content_version + 1)
+
+        # Current variants are not rebuilt
+        self.assertFalse(generate_image_variants(game.pk))
+
+        # Copies of a replaced image are deleted
+        old_variants = game.image_variants
+        Game.objects.filter(pk=game.pk).update(image=self.upload('games/other.jpg', (300, 200)))
+        self.assertTrue(generate_image_variants(game.pk))
+        self.assertFalse(default_storage.exists(old_variants['webp']['640']))
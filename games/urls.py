@@ -8,14 +8,22 @@ urlpatterns = [
     path('', views.GameListAPIView.as_view(), name='game-list'),
     path('<int:id>/', views.GameDetailView.as_view(), name='game-detail'),
     path('featured/', views.FeaturedGamesView.as_view(), name='featured-games'),
+    path('search/', views.GameSearchView.as_view(), name='game-search'),
     
     # Utility endpoints
     path('categories/', views.game_categories, name='game-categories'),
     path('difficulties/', views.game_difficulties, name='game-difficulties'),
     path('stats/', views.game_stats, name='game-stats'),
+    path('facets/', views.game_facets, name='game-facets'),
+    path('bootstrap/', views.bootstrap, name='bootstrap'),
 
    #reservations
    path('available-times/', views.get_available_times_api, name='available-times') ,
+   path('available-times/range/', views.get_available_times_range_api, name='available-times-range'),
+   path('available-times/venue/', views.get_venue_availability_api, name='venue-availability'),
+   path('available-times/next/', views.get_next_available_slots_api, name='next-available-slots'),
+   path('available-times/cache-stats/', views.availability_cache_stats, name='availability-cache-stats'),
+   path('available-times/stream/', views.availability_stream, name='availability-stream'),
    path('send-otp/',views.SendOTPView.as_view(),name='send-otp'),
    path('verify-otp/',views.verify_otp,name='verify-otp'),
    path('create/',views.create_booking,name='create-booking')
@@ -1,5 +1,6 @@
 
-from typing import List, Dict
+from typing import List, Dict, NamedTuple, Tuple
+from functools import lru_cache
 from django.db.models import Q
 from datetime import datetime, date, time, timedelta
 import pytz
@@ -33,6 +34,23 @@ def sendgrid_send_email(to_email,  dynamic_template_data,template_id='d-e35c392e
         print(f"Error sending email to {to_email}: {e}")
         return False
 
+MINUTES_PER_DAY = 24 * 60
+
+
+def time_to_minutes(value) -> int:
+    """Minutes since midnight for a time object or an HH:MM string"""
+    if isinstance(value, str):
+        hour, minute = map(int, value.split(':')[:2])
+        return hour * 60 + minute
+    return value.hour * 60 + value.minute
+
+
+def minutes_to_slot(minutes: int) -> str:
+    """HH:MM representation of minutes since midnight (wraps past 24:00)"""
+    minutes %= MINUTES_PER_DAY
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
 def generate_time_slots(start_time: str, end_time: str, duration: int, interval: int = 60) -> List[str]:
     """
     Generate available time slots based on game working hours
@@ -44,177 +62,271 @@ def generate_time_slots(start_time: str, end_time: str, duration: int, interval:
         interval: Interval between slots in minutes (default 60)
     
     Returns:
-        List of time slots in HH:MM format (only round hours)
+        List of time slots in HH:MM format. Intervals that divide an hour start
+        at the first multiple of the interval at or after opening (round hours
+        for the default interval), other intervals step from opening time
     """
-    slots = []
-    
-    # Parse start and end times
-    start_hour, start_minute = map(int, start_time.split(':'))
-    end_hour, end_minute = map(int, end_time.split(':'))
-    
-    start_dt = datetime.combine(datetime.today(), time(start_hour, start_minute))
+    start_minutes = time_to_minutes(start_time)
+    end_minutes = time_to_minutes(end_time)
     
     # Handle end time - if 00:00, it means next day midnight
-    if end_hour == 0 and end_minute == 0:
-        end_dt = datetime.combine(datetime.today() + timedelta(days=1), time(0, 0))
-    else:
-        end_dt = datetime.combine(datetime.today(), time(end_hour, end_minute))
+    if end_minutes == 0:
+        end_minutes = MINUTES_PER_DAY
     
-    # Generate slots starting from the next round hour
-    current_hour = start_hour
-    if start_minute > 0:
-        current_hour += 1
-    
-    # Generate only round hour slots
-    while True:
-        # Handle hour overflow (past 23:00)
-        display_hour = current_hour % 24
-        slot_time = time(display_hour, 0)
-        
-        # Create datetime for the slot (could be next day if current_hour >= 24)
-        if current_hour >= 24:
-            slot_dt = datetime.combine(datetime.today() + timedelta(days=1), slot_time)
-        else:
-            slot_dt = datetime.combine(datetime.today(), slot_time)
-        
-        # Break if we've reached or passed the end time
-        if slot_dt >= end_dt:
-            break
-        
-        # Check if game can finish within working hours
-        if slot_dt + timedelta(minutes=duration) <= end_dt:
-            slots.append(f"{display_hour:02d}:00")
-        
-        current_hour += 1
+    if 60 % interval == 0:
+        # Start from the first multiple of the interval at or after opening
+        first_slot = -(-start_minutes // interval) * interval
+    else:
+        # Multiples of e.g. 90 minutes from midnight could skip the opening slot
+        first_slot = start_minutes
     
-    return slots
+    # Keep slots whose game can finish within working hours
+    return [
+        minutes_to_slot(slot)
+        for slot in range(first_slot, end_minutes, interval)
+        if slot + duration <= end_minutes
+    ]
+
+
+class SlotTemplate(NamedTuple):
+    """Precompiled slot grid of a game's day"""
+    labels: Tuple[str, ...]   # slot starts in HH:MM format
+    offsets: Tuple[int, ...]  # slot starts in minutes since midnight
+    block: int                # minutes a session keeps the room busy (duration + reset buffer)
+
+
+@lru_cache(maxsize=256)
+def compile_slot_template(start_time: str, end_time: str, duration: int,
+                          interval: int = 60, buffer: int = 0) -> SlotTemplate:
+    """Build the slot grid for a schedule, memoized by its parameters"""
+    labels = tuple(generate_time_slots(start_time, end_time, duration, interval))
+    return SlotTemplate(
+        labels=labels,
+        offsets=tuple(time_to_minutes(label) for label in labels),
+        block=duration + buffer,
+    )
+
+
+# Game ID -> (schedule key, template), dropped from the Game save/delete signals
+_game_slot_templates = {}
+
+
+def _schedule_key(game) -> Tuple:
+    return (
+        game.working_hours_start,
+        game.working_hours_end,
+        game.duration,
+        game.slot_interval or 60,
+        game.buffer_minutes or 0,
+    )
+
+
+def get_slot_template(game) -> SlotTemplate:
+    """Ready-made slot grid of a game, compiled once per schedule"""
+    key = _schedule_key(game)
+    cached = _game_slot_templates.get(game.pk)
+    if cached is None or cached[0] != key:
+        cached = (key, compile_slot_template(*key))
+        _game_slot_templates[game.pk] = cached
+    return cached[1]
+
+
+def invalidate_slot_template(game_id):
+    _game_slot_templates.pop(game_id, None)
+
+
+def sweep_slot_usage(slot_starts: List[int], slot_length: int, intervals) -> List[int]:
+    """
+    Used capacity of every slot, computed with a single sweep over sorted events
+
+    A slot [start, start + slot_length) uses the players of every interval it
+    overlaps. Instead of testing each (slot, interval) pair, interval starts and
+    ends are sorted once and turned into prefix sums, so each slot costs two
+    pointer moves: usage = players starting before the slot ends
+    - players ending at or before the slot starts.
+
+    Args:
+        slot_starts: Slot start offsets in minutes, ascending
+        slot_length: Slot length in minutes
+        intervals: (start, end, players) tuples in minutes, on the same axis as slot_starts
+
+    Returns:
+        Used capacity per slot, in slot order
+    """
+    starts = sorted((start, players) for start, _, players in intervals)
+    ends = sorted((end, players) for _, end, players in intervals)
+
+    usage = []
+    started = ended = 0
+    start_index = end_index = 0
+    for slot_start in slot_starts:
+        slot_end = slot_start + slot_length
+        while start_index < len(starts) and starts[start_index][0] < slot_end:
+            started += starts[start_index][1]
+            start_index += 1
+        while end_index < len(ends) and ends[end_index][0] <= slot_start:
+            ended += ends[end_index][1]
+            end_index += 1
+        usage.append(started - ended)
+    return usage
+
+
+SPAIN_TZ = pytz.timezone('Europe/Madrid')
+
+ACTIVE_RESERVATION_STATUSES = ['pending', 'confirmed']
+
+# Upper bound for the range endpoint so a single request can't scan years of reservations
+MAX_RANGE_DAYS = 62
+
+# Days of occupancy loaded per query by the next-available-slot search
+SEARCH_WINDOW_DAYS = 7
+
+# Upper bound for the number of slots the next-available-slot search returns
+MAX_SEARCH_RESULTS = 50
+
+
+def get_spain_now() -> datetime:
+    """Current time in the venue timezone (Spain)"""
+    return datetime.now(SPAIN_TZ)
+
+
+def crosses_midnight(game) -> bool:
+    """Working hours ending at 00:00 mean late slots can collide with next-day reservations"""
+    return int(game.working_hours_end.split(':')[0]) == 0
+
+
+def get_booking_restriction(game, date_obj: date, now_spain: datetime):
+    """
+    Return an error message if the game can't be booked on the given date, otherwise None
+    """
+    # Check if date is in the past (but allow today in Spain timezone)
+    if date_obj < now_spain.date():
+        return 'Cannot book for past dates'
+
+    # Check if game is available (for pre_reservation games)
+    if game.status == 'pre_reservation' and game.available_from:
+        selected_datetime = datetime.combine(date_obj, datetime.min.time())
+
+        # If available_from is timezone-aware, make selected_datetime aware too
+        if game.available_from.tzinfo is not None:
+            selected_datetime = SPAIN_TZ.localize(selected_datetime)
+
+        if selected_datetime < game.available_from:
+            return f'Game available from {game.available_from.strftime("%Y-%m-%d %H:%M")}'
+
+    return None
+
+
+def filter_past_slots(slots: List[str], date_obj: date, now_spain: datetime) -> List[str]:
+    """Drop slots that already started - only relevant for today"""
+    if date_obj != now_spain.date():
+        return slots
+
+    # A slot that already started (even by a minute) can't be booked anymore
+    current_minutes = now_spain.hour * 60 + now_spain.minute
+
+    return [slot for slot in slots if time_to_minutes(slot) >= current_minutes]
+
+
+def build_slot_entry(game, slot: str, used_capacity: int) -> Dict:
+    """Capacity information of a single slot"""
+    available_capacity = max(0, game.max_players - used_capacity)
+
+    return {
+        'time': slot,
+        'available_capacity': available_capacity,
+        'used_capacity': used_capacity,
+        'max_capacity': game.max_players,
+        'available': available_capacity > 0
+    }
+
+
+def calculate_slot_capacity(game, date_obj: date, slots: List[str],
+                            reservations_today, reservations_next_day=()) -> List[Dict]:
+    """
+    Calculate capacity for each slot of a day
+
+    Args:
+        game: Game instance
+        date_obj: Day the slots belong to
+        slots: Slots in HH:MM format
+        reservations_today: (time, players) pairs of active reservations on date_obj
+        reservations_next_day: (time, players) pairs for the following day,
+            only needed when working hours cross midnight
+
+    Returns:
+        List of slot dictionaries with capacity information
+    """
+    # Sessions keep the room busy for the game plus its reset buffer
+    block = get_slot_template(game).block
+
+    # Both days on one minute axis starting at date_obj midnight
+    intervals = [
+        (time_to_minutes(reservation_time), time_to_minutes(reservation_time) + block, players)
+        for reservation_time, players in reservations_today
+    ]
+    intervals.extend(
+        (MINUTES_PER_DAY + time_to_minutes(reservation_time),
+         MINUTES_PER_DAY + time_to_minutes(reservation_time) + block,
+         players)
+        for reservation_time, players in reservations_next_day
+    )
+
+    slot_starts = sorted(time_to_minutes(slot) for slot in slots)
+    usage = dict(zip(slot_starts, sweep_slot_usage(slot_starts, block, intervals)))
+
+    return [build_slot_entry(game, slot, usage[time_to_minutes(slot)]) for slot in slots]
 
 
 # Updated backend for Stripe Checkout redirect flow
 
-def get_available_times(game_id: str, selected_date: str) -> Dict:
+def get_available_times(game_id: str, selected_date: str, language: str = 'ru') -> Dict:
     """
     Get available time slots for a game on a specific date with capacity information
     
     Args:
         game_id: Game ID
         selected_date: Date in YYYY-MM-DD format
+        language: Language code for the game title
     
     Returns:
         Dictionary with time slots and their capacity information
     """
     
-    from .models import Game, Reservation
+    from .models import Game
+    from .occupancy import get_occupancy
     
     try:
         game = Game.objects.get(id=game_id, is_active=True)
         date_obj = datetime.strptime(selected_date, '%Y-%m-%d').date()
         
         # FIXED: Get current time in Spain timezone
-        spain_tz = pytz.timezone('Europe/Madrid')
-        now_spain = datetime.now(spain_tz)
-        today_spain = now_spain.date()
+        now_spain = get_spain_now()
         
-        # Check if date is in the past (but allow today in Spain timezone)
-        if date_obj < today_spain:
+        error = get_booking_restriction(game, date_obj, now_spain)
+        if error:
             return {
-                'error': 'Cannot book for past dates',
+                'error': error,
                 'time_slots': []
             }
         
-        # Check if game is available (for pre_reservation games)
-        if game.status == 'pre_reservation' and game.available_from:
-            # FIX: Make the comparison datetime timezone-aware
-            selected_datetime = datetime.combine(date_obj, datetime.min.time())
-            
-            # If available_from is timezone-aware, make selected_datetime aware too
-            if game.available_from.tzinfo is not None:
-                selected_datetime = spain_tz.localize(selected_datetime)
-            
-            if selected_datetime < game.available_from:
-                return {
-                    'error': f'Game available from {game.available_from.strftime("%Y-%m-%d %H:%M")}',
-                    'time_slots': []
-                }
-        
         # Generate all possible time slots
-        all_slots = generate_time_slots(
-            game.working_hours_start,
-            game.working_hours_end,
-            game.duration
-        )
+        all_slots = list(get_slot_template(game).labels)
         
         # Filter out past time slots ONLY for today
-        if date_obj == today_spain:
-            current_hour = now_spain.hour
-            # If we're past the current hour's start, move to next hour
-            if now_spain.minute > 0:
-                current_hour += 1
-            
-            # Filter slots to only include future times (only for today)
-            all_slots = [slot for slot in all_slots if int(slot.split(':')[0]) >= current_hour]
-        
-        # Get reservations for this date and calculate capacity for each slot
-        reservations_today = Reservation.objects.filter(
-            game=game,
-            date=date_obj,
-            status__in=['pending', 'confirmed']
-        )
+        all_slots = filter_past_slots(all_slots, date_obj, now_spain)
         
-        # Also check next day for slots that might conflict (if working hours cross midnight)
-        reservations_next_day = []
-        end_hour = int(game.working_hours_end.split(':')[0])
-        if end_hour == 0:  # Working hours cross midnight
-            next_date = date_obj + timedelta(days=1)
-            reservations_next_day = Reservation.objects.filter(
-                game=game,
-                date=next_date,
-                status__in=['pending', 'confirmed']
-            )
+        # Used capacity is materialized per slot (midnight-crossing overlaps included)
+        occupancy = get_occupancy([game.id], date_obj, date_obj)
         
         # Calculate capacity for each time slot
-        time_slots = []
-        for slot in all_slots:
-            slot_hour = int(slot.split(':')[0])
-            slot_time = datetime.combine(date_obj, time(slot_hour, 0))
-            slot_end_time = slot_time + timedelta(minutes=game.duration)
-            
-            # Calculate used capacity for this slot
-            used_capacity = 0
-            
-            # Check overlapping reservations from today
-            for reservation in reservations_today:
-                reservation_datetime = datetime.combine(date_obj, reservation.time)
-                reservation_end_time = reservation_datetime + timedelta(minutes=game.duration)
-                
-                # Check for overlap
-                if (slot_time < reservation_end_time and slot_end_time > reservation_datetime):
-                    used_capacity += reservation.players
-            
-            # Check overlapping reservations from next day (for late night slots)
-            if reservations_next_day:
-                next_date = date_obj + timedelta(days=1)
-                for reservation in reservations_next_day:
-                    reservation_datetime = datetime.combine(next_date, reservation.time)
-                    reservation_end_time = reservation_datetime + timedelta(minutes=game.duration)
-                    
-                    # Check for overlap
-                    if (slot_time < reservation_end_time and slot_end_time > reservation_datetime):
-                        used_capacity += reservation.players
-            
-            # Calculate available capacity
-            available_capacity = max(0, game.max_players - used_capacity)
-            
-            time_slots.append({
-                'time': slot,
-                'available_capacity': available_capacity,
-                'used_capacity': used_capacity,
-                'max_capacity': game.max_players,
-                'available': available_capacity > 0
-            })
+        time_slots = [
+            build_slot_entry(game, slot, occupancy.get((game.id, date_obj, slot), 0))
+            for slot in all_slots
+        ]
         
         return {
-            'game_title': game.get_title('ru'),
+            'game_title': game.get_title(language),
             'date': selected_date,
             'time_slots': time_slots,
             'duration': game.duration,
@@ -230,4 +342,305 @@ def get_available_times(game_id: str, selected_date: str) -> Dict:
         return {
             'error': 'Invalid date format. Use YYYY-MM-DD',
             'time_slots': []
-        }
\ No newline at end of file
+        }
+
+
+def get_available_times_range(game_id: str, date_from: str, date_to: str, players: int = None) -> Dict:
+    """
+    Get available time slots for a game over a range of dates
+
+    The slot occupancy of the whole window is loaded with a single query,
+    so the query count doesn't depend on the number of days.
+
+    Args:
+        game_id: Game ID
+        date_from: First date in YYYY-MM-DD format
+        date_to: Last date (inclusive) in YYYY-MM-DD format
+        players: Optional party size used for the per-day summary (default 1)
+
+    Returns:
+        Dictionary with per-day slots and a per-day "bookable for N players" summary
+    """
+
+    from .models import Game
+    from .occupancy import get_occupancy
+
+    try:
+        game_id = int(game_id)
+    except (TypeError, ValueError):
+        return {
+            'error': 'Invalid game_id',
+            'days': []
+        }
+
+    try:
+        start_date = datetime.strptime(date_from, '%Y-%m-%d').date()
+        end_date = datetime.strptime(date_to, '%Y-%m-%d').date()
+    except ValueError:
+        return {
+            'error': 'Invalid date format. Use YYYY-MM-DD',
+            'days': []
+        }
+
+    try:
+        game = Game.objects.get(id=game_id, is_active=True)
+    except Game.DoesNotExist:
+        return {
+            'error': 'Game not found',
+            'days': []
+        }
+
+    if end_date < start_date:
+        return {
+            'error': 'date_to must not be before date_from',
+            'days': []
+        }
+
+    if (end_date - start_date).days + 1 > MAX_RANGE_DAYS:
+        return {
+            'error': f'Date range can not exceed {MAX_RANGE_DAYS} days',
+            'days': []
+        }
+
+    party_size = players or 1
+    now_spain = get_spain_now()
+
+    # One query for the whole window
+    occupancy = get_occupancy([game.id], start_date, end_date)
+
+    # Working hours are the same every day, so the slot list is built once
+    all_slots = list(get_slot_template(game).labels)
+
+    days = []
+    summary = {}
+    current_date = start_date
+    while current_date <= end_date:
+        date_str = current_date.strftime('%Y-%m-%d')
+        error = get_booking_restriction(game, current_date, now_spain)
+
+        if error:
+            time_slots = []
+        else:
+            time_slots = [
+                build_slot_entry(game, slot, occupancy.get((game.id, current_date, slot), 0))
+                for slot in filter_past_slots(all_slots, current_date, now_spain)
+            ]
+
+        has_availability = any(slot['available_capacity'] >= party_size for slot in time_slots)
+        day = {
+            'date': date_str,
+            'time_slots': time_slots,
+            'has_availability': has_availability
+        }
+        if error:
+            day['error'] = error
+
+        days.append(day)
+        summary[date_str] = has_availability
+        current_date += timedelta(days=1)
+
+    return {
+        'game_title': game.get_title('ru'),
+        'date_from': date_from,
+        'date_to': date_to,
+        'players': party_size,
+        'duration': game.duration,
+        'max_players': game.max_players,
+        'days': days,
+        'summary': summary
+    }
+
+
+def get_venue_availability(selected_date: str, players: int = None, language: str = 'en') -> Dict:
+    """
+    Get a game x hour capacity matrix for every active game on a date
+
+    Games and the slot occupancy of all of them for the date are fetched in one
+    batched pass each.
+
+    Args:
+        selected_date: Date in YYYY-MM-DD format
+        players: Optional party size, a game is bookable if any slot fits it (default 1)
+        language: Language code for game titles
+
+    Returns:
+        Dictionary with the sorted union of hours and one capacity row per game
+    """
+
+    from .models import Game
+    from .occupancy import get_occupancy
+
+    try:
+        date_obj = datetime.strptime(selected_date, '%Y-%m-%d').date()
+    except ValueError:
+        return {
+            'error': 'Invalid date format. Use YYYY-MM-DD',
+            'games': []
+        }
+
+    now_spain = get_spain_now()
+    if date_obj < now_spain.date():
+        return {
+            'error': 'Cannot book for past dates',
+            'games': []
+        }
+
+    party_size = players or 1
+
+    games = list(Game.objects.filter(is_active=True))
+    occupancy = get_occupancy([game.id for game in games], date_obj, date_obj)
+
+    rows = []
+    hours = set()
+    for game in games:
+        error = get_booking_restriction(game, date_obj, now_spain)
+
+        if error:
+            time_slots = []
+        else:
+            slots = filter_past_slots(
+                list(get_slot_template(game).labels),
+                date_obj,
+                now_spain
+            )
+            time_slots = [
+                build_slot_entry(game, slot, occupancy.get((game.id, date_obj, slot), 0))
+                for slot in slots
+            ]
+
+        hours.update(slot['time'] for slot in time_slots)
+        row = {
+            'game_id': game.id,
+            'title': game.get_title(language),
+            'duration': game.duration,
+            'max_players': game.max_players,
+            'slots': {slot['time']: slot['available_capacity'] for slot in time_slots},
+            'bookable': any(slot['available_capacity'] >= party_size for slot in time_slots)
+        }
+        if error:
+            row['error'] = error
+        rows.append(row)
+
+    hours = sorted(hours)
+    for row in rows:
+        # Align every game on the shared hour axis, None where the game has no slot
+        slots = row.pop('slots')
+        row['capacity'] = [slots.get(hour) for hour in hours]
+
+    return {
+        'date': selected_date,
+        'players': party_size,
+        'hours': hours,
+        'games': rows
+    }
+
+
+def find_next_available_slots(players: int, category: str = None, difficulty: str = None,
+                              time_from: str = None, time_to: str = None, horizon_days: int = 14,
+                              limit: int = 5, language: str = 'en') -> Dict:
+    """
+    Find the earliest bookable (game, date, time) slots for a party size
+
+    Occupancy of all candidate games is loaded one window of SEARCH_WINDOW_DAYS
+    at a time and scanned in chronological order, so the search stops as soon as
+    enough slots are found instead of querying day by day.
+
+    Args:
+        players: Party size every returned slot must fit
+        category: Optional game category
+        difficulty: Optional game difficulty
+        time_from: Optional earliest slot start in HH:MM format
+        time_to: Optional latest slot start in HH:MM format
+        horizon_days: Number of days to search, starting today
+        limit: Maximum number of slots to return
+        language: Language code for game titles
+
+    Returns:
+        Dictionary with the found slots ordered by date, time and game
+    """
+
+    from .models import Game
+    from .occupancy import get_occupancy
+
+    try:
+        earliest = time_to_minutes(datetime.strptime(time_from, '%H:%M')) if time_from else 0
+        latest = time_to_minutes(datetime.strptime(time_to, '%H:%M')) if time_to else MINUTES_PER_DAY
+    except ValueError:
+        return {
+            'error': 'Invalid time format. Use HH:MM',
+            'results': []
+        }
+
+    if horizon_days < 1 or horizon_days > MAX_RANGE_DAYS:
+        return {
+            'error': f'Horizon must be between 1 and {MAX_RANGE_DAYS} days',
+            'results': []
+        }
+
+    games = Game.objects.filter(is_active=True, max_players__gte=players)
+    if category:
+        games = games.filter(category=category)
+    if difficulty:
+        games = games.filter(difficulty=difficulty)
+    games = list(games)
+
+    # Slot grids repeat every day: merge them once into a single chronological list
+    candidates = sorted(
+        (time_to_minutes(slot), game.id, slot, game)
+        for game in games
+        for slot in get_slot_template(game).labels
+        if earliest <= time_to_minutes(slot) <= latest
+    )
+
+    now_spain = get_spain_now()
+    today = now_spain.date()
+    current_minutes = now_spain.hour * 60 + now_spain.minute
+    end_date = today + timedelta(days=horizon_days - 1)
+    game_ids = [game.id for game in games]
+
+    results = []
+    window_start = today
+    while candidates and window_start <= end_date and len(results) < limit:
+        window_end = min(window_start + timedelta(days=SEARCH_WINDOW_DAYS - 1), end_date)
+        occupancy = get_occupancy(game_ids, window_start, window_end)
+
+        current_date = window_start
+        while current_date <= window_end and len(results) < limit:
+            restricted = {
+                game.id for game in games
+                if get_booking_restriction(game, current_date, now_spain)
+            }
+            for minutes, game_id, slot, game in candidates:
+                if game_id in restricted or (current_date == today and minutes < current_minutes):
+                    continue
+
+                available_capacity = game.max_players - occupancy.get((game_id, current_date, slot), 0)
+                if available_capacity < players:
+                    continue
+
+                results.append({
+                    'game_id': game_id,
+                    'title': game.get_title(language),
+                    'category': game.category,
+                    'difficulty': game.difficulty,
+                    'date': current_date.strftime('%Y-%m-%d'),
+                    'time': slot,
+                    'available_capacity': available_capacity,
+                    'max_players': game.max_players,
+                    'duration': game.duration,
+                    'price': str(game.price)
+                })
+                if len(results) >= limit:
+                    break
+
+            current_date += timedelta(days=1)
+
+        window_start = window_end + timedelta(days=1)
+
+    return {
+        'players': players,
+        'horizon_days': horizon_days,
+        'date_from': today.strftime('%Y-%m-%d'),
+        'date_to': end_date.strftime('%Y-%m-%d'),
+        'results': results
+    }
@@ -0,0 +1,76 @@
+import hashlib
+
+from django.db.models import Count, F, Max, Sum
+from django.utils.http import quote_etag
+
+from .models import Game
+from .utils import filter_past_slots, get_slot_template, get_spain_now
+
+
+def bump_availability_versions(game_ids):
+    """Invalidate availability ETags of the given games, inside the caller's transaction"""
+    if game_ids:
+        Game.objects.filter(pk__in=set(game_ids)).update(
+            availability_version=F('availability_version') + 1
+        )
+
+
+def _query_signature(request, exclude=()) -> str:
+    # Hashed: a comma or quote from the query would break the If-None-Match parsing
+    return hashlib.md5('&'.join(
+        f'{key}={value}' for key, value in sorted(request.GET.items()) if key not in exclude
+    ).encode()).hexdigest()
+
+
+def availability_etag(request, *args, **kwargs):
+    """
+    ETag of get_available_times_api from the game's versions, without loading reservations
+
+    For today the number of slots that already started is part of the tag,
+    since those are filtered out of the response.
+    """
+    game_id = request.GET.get('game_id')
+    selected_date = request.GET.get('date')
+    if not game_id or not selected_date or not game_id.isdigit():
+        return None
+
+    game = Game.objects.filter(id=game_id, is_active=True).only(
+        'availability_version', 'content_version', 'working_hours_start', 'working_hours_end',
+        'duration', 'slot_interval', 'buffer_minutes'
+    ).first()
+    if game is None:
+        return None
+
+    now_spain = get_spain_now()
+    past_slots = 0
+    if selected_date == now_spain.strftime('%Y-%m-%d'):
+        labels = list(get_slot_template(game).labels)
+        past_slots = len(labels) - len(filter_past_slots(labels, now_spain.date(), now_spain))
+
+    return quote_etag(
+        f'avail-{game.id}-{game.availability_version}-{game.content_version}-'
+        f'{past_slots}-{_query_signature(request)}'
+    )
+
+
+def catalog_etag(request, *args, **kwargs):
+    """ETag of a game list variant that isn't cached, from one aggregate over the content versions"""
+    versions = Game.objects.aggregate(
+        games=Count('id'),
+        total=Sum('content_version'),
+        latest=Max('content_version'),
+    )
+    return quote_etag(
+        f'catalog-{versions["games"]}-{versions["total"] or 0}-{versions["latest"] or 0}-'
+        f'{hashlib.md5(request.path.encode()).hexdigest()}-{_query_signature(request)}'
+    )
+
+
+def game_etag(request, *args, **kwargs):
+    """ETag of a single game from its content version"""
+    content_version = Game.objects.filter(
+        id=kwargs.get('id'), is_active=True
+    ).values_list('content_version', flat=True).first()
+    if content_version is None:
+        return None
+    return quote_etag(f'game-{kwargs.get("id")}-{content_version}-{_query_signature(request)}')
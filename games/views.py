@@ -4,15 +4,33 @@ from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from django.db.models import Q
 from django.utils.translation import gettext as _
-from .models import Game
+from .models import Game, CATEGORY_CHOICES, DIFFICULTY_CHOICES
 from games.models import Reservation
-from .serializers import GameSerializer, FeaturedGameSerializer,BookingSerializer,SendOTPSerializer,VerifyOTPSerializer
+from .serializers import GameSerializer, GameListSerializer, FeaturedGameSerializer,BookingSerializer,SendOTPSerializer,VerifyOTPSerializer
 from rest_framework.decorators import api_view, permission_classes,authentication_classes
-from rest_framework.permissions import AllowAny
+from rest_framework.permissions import AllowAny, IsAdminUser
 
 from rest_framework import status
-from django.http import JsonResponse
-from .utils import get_available_times
+from django.http import HttpResponse, JsonResponse
+from .utils import get_available_times_range, get_venue_availability, find_next_available_slots, MAX_SEARCH_RESULTS
+from .cache import get_cached_available_times, get_availability_cache_stats
+from .versions import availability_etag, game_etag
+from .catalog import CachedCatalogMixin, SparseFieldsetViewMixin, get_catalog_language
+from .filters import GameFilter, GameSearchFilter
+from .facets import get_facets
+from .bootstrap import bootstrap_etag, get_fragments, get_game_stats, render_bootstrap
+from django.middleware.csrf import get_token
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django_filters.rest_framework import DjangoFilterBackend
+from .pagination import GameKeysetPagination, FeaturedGameKeysetPagination
+from .events import broker, format_event, start_event_listener
+from .occupancy import CapacityError
+from django.views.decorators.http import condition, require_GET
+from django.http import StreamingHttpResponse
+from asgiref.sync import sync_to_async
+from datetime import datetime
+import asyncio
 from .serializers import AvailableTimesSerializer
 import random
 import string
@@ -26,38 +44,91 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework_simplejwt.tokens import RefreshToken
 
+# Seconds between keep-alive comments on an idle availability stream
+STREAM_HEARTBEAT_SECONDS = 15
+
 def generate_otp():
     """Generate 6-digit OTP"""
     return ''.join(random.choices(string.digits, k=6))
 
-class GameListAPIView(generics.ListAPIView):
-    """API endpoint for games with language support"""
-    queryset = Game.objects.filter(is_active=True)
-    serializer_class = GameSerializer
+class GameListAPIView(CachedCatalogMixin, generics.ListAPIView):
+    """
+    API endpoint for games with language support
+
+    ?fields=compact returns only what a game card needs (id, title, category,
+    price, image, image_placeholder, max_players), ?fields=a,b and ?omit=a,b
+    select fields freely.
+    Pages are walked with the next/previous cursor links, ?count=0 skips the total.
+    """
+    authentication_classes = []
+    serializer_class = GameListSerializer
+    pagination_class = GameKeysetPagination
+    catalog_endpoint = 'games'
     
-    def get_serializer_context(self):
-        """Pass language to serializer"""
-        context = super().get_serializer_context()
-        
-        # Get language from query parameter or Accept-Language header
-        language = self.request.GET.get('lang', 'en')
-        
-        # Validate language code
-        valid_languages = ['en', 'es', 'uk']
-        if language not in valid_languages:
-            language = 'en'
-        
-        context['language'] = language
-        return context
+    def get_queryset(self):
+        return self.narrow_queryset(
+            Game.objects.filter(is_active=True).localized(
+                get_catalog_language(self.request),
+                with_description=self.wants_any('description', 'description_localized')
+            )
+        )
 
-class FeaturedGamesView(generics.ListAPIView):
+class FeaturedGamesView(CachedCatalogMixin, generics.ListAPIView):
     """
     List only featured games
     """
+    authentication_classes = []
+    catalog_endpoint = 'featured'
     serializer_class = FeaturedGameSerializer
-    queryset = Game.objects.filter(is_featured=True, is_active=True).order_by('category', 'title')
+    pagination_class = FeaturedGameKeysetPagination
+    
+    def get_queryset(self):
+        return self.narrow_queryset(
+            Game.objects.filter(is_featured=True, is_active=True).localized(
+                get_catalog_language(self.request),
+                with_description=self.wants_any('description', 'description_localized')
+            )
+        )
 
-class GameDetailView(generics.RetrieveAPIView):
+class GameSearchView(SparseFieldsetViewMixin, generics.ListAPIView):
+    """
+    Search games by title and description in every language
+
+    ?q= is required, category, difficulty, min_price, max_price and players
+    narrow the result in the same query. Best matches come first, ?limit=
+    caps the result (default 20). Supports ?lang= and ?fields= like the list.
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = []
+    serializer_class = GameListSerializer
+    pagination_class = None
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = GameSearchFilter
+    default_limit = 20
+
+    def get_queryset(self):
+        return self.narrow_queryset(
+            Game.objects.filter(is_active=True).localized(
+                get_catalog_language(self.request),
+                with_description=self.wants_any('description', 'description_localized')
+            )
+        )
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['language'] = get_catalog_language(self.request)
+        return context
+
+    def filter_queryset(self, queryset):
+        try:
+            limit = int(self.request.GET.get('limit', self.default_limit))
+        except ValueError:
+            limit = self.default_limit
+        limit = min(max(limit, 1), MAX_SEARCH_RESULTS)
+        return super().filter_queryset(queryset).order_by('-search_rank', 'id')[:limit]
+
+@method_decorator(condition(etag_func=game_etag), name='dispatch')
+class GameDetailView(SparseFieldsetViewMixin, generics.RetrieveAPIView):
 
     """
     Get details of a specific game
@@ -91,20 +162,50 @@ def game_stats(request):
     """
     Get general statistics about games
     """
-    total_games = Game.objects.filter(is_active=True).count()
-    featured_games = Game.objects.filter(is_featured=True, is_active=True).count()
-    categories_count = Game.objects.filter(is_active=True).values('category').distinct().count()
-    
-    stats = {
-        'total_games': total_games,
-        'featured_games': featured_games,
-        'categories_count': categories_count,
-    }
-    
-    return Response(stats)
+    return Response(get_game_stats())
+
+@require_GET
+def bootstrap(request):
+    """
+    Featured games, categories, difficulties, stats, contacts and the CSRF
+    token in one response, for ?lang= (en, es, uk)
 
+    Sets the CSRF cookie like api/csrf-token/. Answers 304 while neither the
+    catalog, the contacts nor the CSRF cookie changed.
+    """
+    language = get_catalog_language(request)
+    fragments = get_fragments(request, language)
+    csrf_token = get_token(request)
+    etag = quote_etag(bootstrap_etag(fragments, language, request.META['CSRF_COOKIE']))
 
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(render_bootstrap(fragments, language, csrf_token), content_type='application/json')
+    response['ETag'] = etag
+    # The body holds a CSRF token, shared caches must not keep it
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def game_facets(request):
+    """
+    Game counts per category, difficulty, status and price bucket
+
+    Takes the same filters as the search endpoint (q, category, difficulty,
+    status, min_price, max_price, players). Each facet is counted with every
+    filter except its own applied, the total with all of them. Labels are in
+    ?lang= (en, es, uk).
+    """
+    filterset = GameFilter(request.GET, queryset=Game.objects.none())
+    if not filterset.is_valid():
+        return Response(filterset.errors, status=status.HTTP_400_BAD_REQUEST)
+    return Response(get_facets(filterset.form.cleaned_data, get_catalog_language(request)))
+
+
+
+@condition(etag_func=availability_etag)
 @api_view(['GET'])
 @authentication_classes([])
 @permission_classes([AllowAny])
@@ -115,16 +216,21 @@ def get_available_times_api(request):
     Query parameters:
     - game_id: ID of the game
     - date: Date in YYYY-MM-DD format
+    - lang: Optional language for the game title (ru by default)
     """
     game_id = request.GET.get('game_id')
     selected_date = request.GET.get('date')
+    language = request.GET.get('lang', 'ru')
          
     if not game_id or not selected_date:
         return Response({
             'error': 'game_id and date parameters are required'
         }, status=status.HTTP_400_BAD_REQUEST)
+    
+    if language not in ['ru', 'en', 'es', 'uk']:
+        language = 'ru'
          
-    result = get_available_times(game_id, selected_date)
+    result = get_cached_available_times(game_id, selected_date, language)
          
     if 'error' in result:
         return Response(result, status=status.HTTP_400_BAD_REQUEST)
@@ -142,6 +248,222 @@ def get_available_times_api(request):
     return Response(response_data, status=status.HTTP_200_OK)
 
 
+@require_GET
+async def availability_stream(request):
+    """
+    Server-Sent Events stream of capacity changes for a game on a date
+
+    Sends a "snapshot" event with the current slots, then a "capacity" event with
+    the touched slots whenever a reservation for that game and date is created,
+    confirmed or cancelled. Must be served under ASGI (config.asgi): every idle
+    client only holds a queue on the event loop, not a worker thread. Changes made
+    in other processes arrive through AVAILABILITY_EVENTS_URL, without it only
+    changes made by this process are streamed.
+
+    Query parameters:
+    - game_id: ID of the game
+    - date: Date in YYYY-MM-DD format
+    - lang: Optional language for the game title (ru by default)
+    """
+    game_id = request.GET.get('game_id', '')
+    selected_date = request.GET.get('date', '')
+    language = request.GET.get('lang', 'ru')
+    if language not in ['ru', 'en', 'es', 'uk']:
+        language = 'ru'
+
+    try:
+        if not game_id.isdigit():
+            raise ValueError
+        selected_date = datetime.strptime(selected_date, '%Y-%m-%d').strftime('%Y-%m-%d')
+    except ValueError:
+        return JsonResponse({
+            'error': 'game_id and date (YYYY-MM-DD) parameters are required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    # Subscribe before reading the snapshot so no change falls in between
+    start_event_listener()
+    key = (int(game_id), selected_date)
+    subscription = broker.subscribe(key)
+
+    snapshot = await sync_to_async(get_cached_available_times)(game_id, selected_date, language)
+    if 'error' in snapshot:
+        broker.unsubscribe(key, subscription)
+        return JsonResponse(snapshot, status=status.HTTP_400_BAD_REQUEST)
+
+    async def events():
+        _loop, queue = subscription
+        try:
+            yield format_event('snapshot', snapshot)
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=STREAM_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield format_event('capacity', message)
+        finally:
+            broker.unsubscribe(key, subscription)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@api_view(['GET'])
+@permission_classes([IsAdminUser])
+def availability_cache_stats(request):
+    """
+    Hit, miss and eviction counters of the availability cache
+    """
+    return Response(get_availability_cache_stats())
+
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def get_available_times_range_api(request):
+    """
+    Get available time slots for a game over a range of dates in one request
+
+    Query parameters:
+    - game_id: ID of the game
+    - date_from: First date in YYYY-MM-DD format
+    - date_to: Last date (inclusive) in YYYY-MM-DD format
+    - players: Optional party size for the per-day summary
+    """
+    game_id = request.GET.get('game_id')
+    date_from = request.GET.get('date_from')
+    date_to = request.GET.get('date_to')
+    players = request.GET.get('players')
+
+    if not game_id or not date_from or not date_to:
+        return Response({
+            'error': 'game_id, date_from and date_to parameters are required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    if players is not None:
+        try:
+            players = int(players)
+            if players < 1:
+                raise ValueError
+        except ValueError:
+            return Response({
+                'error': 'players must be a positive integer'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+    result = get_available_times_range(game_id, date_from, date_to, players)
+
+    if 'error' in result:
+        return Response(result, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(result, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def get_venue_availability_api(request):
+    """
+    Get capacity of every active game on a date as a game x hour matrix
+
+    Query parameters:
+    - date: Date in YYYY-MM-DD format
+    - players: Optional party size, marks games that can fit it
+    - lang: Language for game titles (en, es, uk)
+    """
+    selected_date = request.GET.get('date')
+    players = request.GET.get('players')
+
+    if not selected_date:
+        return Response({
+            'error': 'date parameter is required'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    if players is not None:
+        try:
+            players = int(players)
+            if players < 1:
+                raise ValueError
+        except ValueError:
+            return Response({
+                'error': 'players must be a positive integer'
+            }, status=status.HTTP_400_BAD_REQUEST)
+
+    language = request.GET.get('lang', 'en')
+    if language not in ['en', 'es', 'uk']:
+        language = 'en'
+
+    result = get_venue_availability(selected_date, players, language)
+
+    if 'error' in result:
+        return Response(result, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(result, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@authentication_classes([])
+@permission_classes([AllowAny])
+def get_next_available_slots_api(request):
+    """
+    Find the earliest bookable slots across all games for a party size
+
+    Query parameters:
+    - players: Party size (required)
+    - category: Optional game category
+    - difficulty: Optional game difficulty
+    - time_from, time_to: Optional window for the slot start in HH:MM format
+    - days: Optional search horizon in days (default 14)
+    - limit: Optional number of slots to return (default 5)
+    - lang: Language for game titles (en, es, uk)
+    """
+    try:
+        players = int(request.GET.get('players', ''))
+        horizon_days = int(request.GET.get('days', 14))
+        limit = int(request.GET.get('limit', 5))
+        if players < 1 or not 1 <= limit <= MAX_SEARCH_RESULTS:
+            raise ValueError
+    except ValueError:
+        return Response({
+            'error': f'players must be a positive integer and limit between 1 and {MAX_SEARCH_RESULTS}'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    category = request.GET.get('category')
+    if category and category not in dict(CATEGORY_CHOICES):
+        return Response({
+            'error': 'Invalid category'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    difficulty = request.GET.get('difficulty')
+    if difficulty and difficulty not in dict(DIFFICULTY_CHOICES):
+        return Response({
+            'error': 'Invalid difficulty'
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+    language = request.GET.get('lang', 'en')
+    if language not in ['en', 'es', 'uk']:
+        language = 'en'
+
+    result = find_next_available_slots(
+        players,
+        category=category,
+        difficulty=difficulty,
+        time_from=request.GET.get('time_from'),
+        time_to=request.GET.get('time_to'),
+        horizon_days=horizon_days,
+        limit=limit,
+        language=language
+    )
+
+    if 'error' in result:
+        return Response(result, status=status.HTTP_400_BAD_REQUEST)
+
+    return Response(result, status=status.HTTP_200_OK)
+
+
 from rest_framework.views import APIView
 @method_decorator(csrf_exempt, name='dispatch')
 class SendOTPView(APIView):
@@ -450,7 +772,12 @@ def create_booking(request):
          
     try:
         # Create reservation
-        reservation = serializer.save()
+        try:
+            reservation = serializer.save()
+        except CapacityError as e:
+            return Response({
+                'error': str(e)
+            }, status=status.HTTP_409_CONFLICT)
         reservation.status = 'pending'
         reservation.language = request.session.get('language')
         reservation.save()
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.18 on 2026-10-17 23:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Contacts',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('facebook_page', models.CharField(help_text='Ссылка на страницу Facebook', max_length=100, verbose_name='Страница Facebook')),
+                ('instagram_page', models.CharField(help_text='Ссылка на страницу Instagram', max_length=100, verbose_name='Страница Instagram')),
+                ('whatsapp_number', models.CharField(help_text='Номер телефона для WhatsApp', max_length=100, verbose_name='Номер WhatsApp')),
+                ('email', models.EmailField(blank=True, help_text='Адрес электронной почты', max_length=254, null=True, verbose_name='Электронная почта')),
+                ('address', models.CharField(blank=True, help_text='Физический адрес компании', max_length=200, null=True, verbose_name='Адрес')),
+            ],
+            options={
+                'verbose_name': 'Контакт',
+                'verbose_name_plural': 'Контакты',
+            },
+        ),
+        migrations.CreateModel(
+            name='User',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('password', models.CharField(max_length=128, verbose_name='password')),
+                ('is_superuser', models.BooleanField(default=False, help_text='Designates that this user has all permissions without explicitly assigning them.', verbose_name='superuser status')),
+                ('email', models.EmailField(max_length=255, null=True, unique=True, verbose_name='email address')),
+                ('first_name', models.CharField(blank=True, max_length=150, null=True, verbose_name='first name')),
+                ('last_name', models.CharField(blank=True, max_length=150, null=True, verbose_name='last name')),
+                ('is_active', models.BooleanField(default=True)),
+                ('is_staff', models.BooleanField(default=False)),
+                ('date_joined', models.DateTimeField(auto_now_add=True)),
+                ('last_login', models.DateTimeField(blank=True, null=True)),
+                ('groups', models.ManyToManyField(blank=True, help_text='The groups this user belongs to. A user will get all permissions granted to each of their groups.', related_name='user_set', related_query_name='user', to='auth.group', verbose_name='groups')),
+                ('user_permissions', models.ManyToManyField(blank=True, help_text='Specific permissions for this user.', related_name='user_set', related_query_name='user', to='auth.permission', verbose_name='user permissions')),
+            ],
+            options={
+                'verbose_name': 'User',
+                'verbose_name_plural': 'Users',
+            },
+        ),
+    ]
@@ -0,0 +1,88 @@
+"""
+The SPA shell, index.html rendered once per process
+
+Every frontend route answers with the same document, so it's rendered once
+and kept in memory with a gzip copy, their ETags and preload hints for the
+bundles it references. The template file is only re-read when its mtime
+changes, e.g. after a deploy.
+"""
+import gzip
+import hashlib
+import os
+import threading
+from html.parser import HTMLParser
+
+from django.conf import settings
+from django.template import engines
+from django.template.loader import get_template
+from django.utils.http import quote_etag
+
+from config.static import gzip_etag
+
+SHELL_TEMPLATE = 'index.html'
+
+
+class BundleParser(HTMLParser):
+    """Collects the script and stylesheet URLs of the document served from STATIC_URL"""
+
+    def __init__(self):
+        super().__init__()
+        self.links = []
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        crossorigin = '; crossorigin' if 'crossorigin' in attrs else ''
+        if tag == 'script' and attrs.get('src', '').startswith(settings.STATIC_URL):
+            rel = 'modulepreload' if attrs.get('type') == 'module' else 'preload; as=script'
+            self.links.append(f'<{attrs["src"]}>; rel={rel}{crossorigin}')
+        elif (tag == 'link' and attrs.get('rel') == 'stylesheet'
+              and attrs.get('href', '').startswith(settings.STATIC_URL)):
+            self.links.append(f'<{attrs["href"]}>; rel=preload; as=style{crossorigin}')
+
+
+class Shell:
+    def __init__(self, mtime, content):
+        self.mtime = mtime
+        self.content = content
+        self.gzip_content = gzip.compress(content, compresslevel=9, mtime=0)
+        self.etag = quote_etag(hashlib.md5(content).hexdigest())
+        self.gzip_etag = gzip_etag(self.etag)
+
+        parser = BundleParser()
+        parser.feed(content.decode())
+        self.link = ', '.join(parser.links)
+
+
+_shell = None
+_shell_lock = threading.Lock()
+_shell_path = None
+
+
+def get_shell_path():
+    global _shell_path
+    if _shell_path is None:
+        _shell_path = get_template(SHELL_TEMPLATE).origin.name
+    return _shell_path
+
+
+def render_shell(path):
+    with open(path, encoding='utf-8') as f:
+        source = f.read()
+    # Compiled from the file itself, the cached template loader would keep the old version
+    return engines['django'].from_string(source).render().encode()
+
+
+def get_shell():
+    """The rendered shell, re-rendered if the template file changed since"""
+    global _shell
+
+    path = get_shell_path()
+    mtime = os.stat(path).st_mtime_ns
+    shell = _shell
+    if shell is not None and shell.mtime == mtime:
+        return shell
+
+    with _shell_lock:
+        if _shell is None or _shell.mtime != mtime:
+            _shell = Shell(mtime, render_shell(path))
+        return _shell
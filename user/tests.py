@@ -1,3 +1,160 @@
-from django.test import TestCase
+import gzip
+import json
+from base64 import urlsafe_b64encode
+from datetime import timedelta
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from games.models import Reservation
+from games.tests import create_game
+from games.utils import get_spain_now
+from user.models import User
+
+
+class ReservationListTests(TestCase):
+    """A user's reservations are listed newest first in keyset pages"""
+
+    @classmethod
+    def setUpTestData(cls):
+        game = create_game(max_players=6)
+        cls.user = User.objects.create(email='list@example.com')
+        reservation_date = get_spain_now().date() + timedelta(days=2)
+        cls.reservations = [
+            Reservation.objects.create(
+                user=cls.user, game=game, date=reservation_date, time=f'{hour}:00',
+                players=1, email=cls.user.email
+            )
+            for hour in range(10, 15)
+        ]
+        # Distinct creation times, one minute apart in booking order
+        created_at = get_spain_now()
+        for minutes, reservation in enumerate(reversed(cls.reservations)):
+            Reservation.objects.filter(pk=reservation.pk).update(created_at=created_at - timedelta(minutes=minutes))
+
+    def setUp(self):
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_cursor_round_trip(self):
+        url = reverse('user:get-reservations')
+        first = self.client.get(url, {'page_size': 2}).json()
+        self.assertEqual(first['count'], 5)
+        self.assertIsNone(first['previous'])
+
+        ids = [reservation['id'] for reservation in first['results']]
+        page = first
+        while page['next']:
+            page = self.client.get(page['next']).json()
+            ids += [reservation['id'] for reservation in page['results']]
+        newest_first = [reservation.id for reservation in reversed(self.reservations)]
+        self.assertEqual(ids, newest_first)
+
+        # The last page leads back to the one before it
+        previous = self.client.get(page['previous']).json()
+        self.assertEqual([reservation['id'] for reservation in previous['results']], newest_first[2:4])
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get(reverse('user:get-reservations'), {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'error': 'Invalid cursor'})
+
+        # Well-formed, but not a position in this ordering
+        cursor = urlsafe_b64encode(json.dumps({'p': ['yesterday', 'abc']}).encode()).decode()
+        response = self.client.get(reverse('user:get-reservations'), {'cursor': cursor})
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.json(), {'error': 'Invalid cursor'})
+
+
+class ShellTests(TestCase):
+    def test_each_encoding_has_its_own_etag(self):
+        identity = self.client.get('/')
+        compressed = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertNotEqual(identity['ETag'], compressed['ETag'])
+
+        revalidated = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=compressed['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        # A cached identity body must not be revalidated by a gzip request
+        mismatched = self.client.get('/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=identity['ETag'])
+        self.assertEqual(mismatched.status_code, 200)
+
+
+class SitemapTests(TestCase):
+    def test_each_encoding_has_its_own_etag(self):
+        identity = self.client.get('/sitemap.xml')
+        compressed = self.client.get('/sitemap.xml', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertNotEqual(identity['ETag'], compressed['ETag'])
+
+        revalidated = self.client.get('/sitemap.xml', HTTP_IF_NONE_MATCH=identity['ETag'])
+        self.assertEqual(revalidated.status_code, 304)
+        mismatched = self.client.get('/sitemap.xml', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=identity['ETag'])
+        self.assertEqual(mismatched.status_code, 200)
+
+
+class StaticFilesTests(SimpleTestCase):
+    """collectstatic output served by config.static.serve_static"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        source = cls.enterClassContext(TemporaryDirectory())
+        root = cls.enterClassContext(TemporaryDirectory())
+        cls.css = b'body { color: black; }\n' * 50
+        Path(source, 'app.css').write_bytes(cls.css)
+        # Too small for gzip to save anything
+        Path(source, 'tiny.js').write_bytes(b'x')
+
+        cls.enterClassContext(override_settings(
+            STATIC_ROOT=root,
+            STATICFILES_DIRS=[source],
+            STORAGES={
+                'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+                'staticfiles': {'BACKEND': 'config.static.CompressedManifestStaticFilesStorage'},
+            },
+        ))
+        cls.enterClassContext(mock.patch('config.static._hashed_names', None))
+
+        call_command('collectstatic', interactive=False, verbosity=0)
+        cls.root = Path(root)
+        cls.hashed_css = staticfiles_storage.stored_name('app.css')
+
+    def get(self, name, **headers):
+        response = self.client.get(f'/static/{name}', **headers)
+        self.addCleanup(response.close)
+        return response
+
+    def test_collectstatic_writes_gzip_copies(self):
+        self.assertNotEqual(self.hashed_css, 'app.css')
+        self.assertEqual(gzip.decompress((self.root / f'{self.hashed_css}.gz').read_bytes()), self.css)
+        self.assertTrue((self.root / 'app.css.gz').exists())
+        self.assertFalse((self.root / f"{staticfiles_storage.stored_name('tiny.js')}.gz").exists())
+
+    def test_gzip_is_served_to_clients_that_accept_it(self):
+        compressed = self.get(self.hashed_css, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(compressed['Content-Encoding'], 'gzip')
+        self.assertEqual(compressed['Content-Type'], 'text/css')
+        self.assertIn('Accept-Encoding', compressed['Vary'])
+        self.assertEqual(gzip.decompress(b''.join(compressed.streaming_content)), self.css)
+
+        for accept_encoding in ('', 'gzip;q=0', 'br'):
+            with self.subTest(accept_encoding=accept_encoding):
+                identity = self.get(self.hashed_css, HTTP_ACCEPT_ENCODING=accept_encoding)
+                self.assertFalse(identity.has_header('Content-Encoding'))
+                self.assertIn('Accept-Encoding', identity['Vary'])
+                self.assertEqual(b''.join(identity.streaming_content), self.css)
+
+    def test_only_hashed_names_are_immutable(self):
+        self.assertEqual(self.get(self.hashed_css)['Cache-Control'], 'public, max-age=31536000, immutable')
+        self.assertEqual(self.get('app.css')['Cache-Control'], 'public, max-age=0, must-revalidate')
+
+    def test_missing_files_are_not_found(self):
+        self.assertEqual(self.get('missing.css').status_code, 404)
+        self.assertEqual(self.get('../manage.py').status_code, 404)
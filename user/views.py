@@ -5,9 +5,11 @@ from games.models import Reservation
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
+from rest_framework.exceptions import NotFound
 from .models import Contacts
 from .serializers import ContactsSerializer
 from games.serializers import ReservationSerializer
+from games.pagination import ReservationKeysetPagination
 from django.middleware.csrf import get_token
 from django.http import JsonResponse
 from django.views.decorators.csrf import ensure_csrf_cookie
@@ -15,12 +17,38 @@ from django.views.decorators.http import require_http_methods
 from django.http import HttpResponse
 from django.views import View
 from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from config.static import accepts_gzip
+from .shell import get_shell
 
 
 
+@require_http_methods(["GET", "HEAD"])
 def home_view(request):
-    print('view called')
-    return render(request,'index.html')
+    """
+    The SPA shell for every frontend route, from memory
+
+    Answers 304 to a matching If-None-Match and sends the gzip copy, with
+    its own ETag, to clients that accept it. The Link header preloads the JS
+    and CSS bundles.
+    """
+    shell = get_shell()
+    encoded = accepts_gzip(request)
+    etag = shell.gzip_etag if encoded else shell.etag
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        if encoded:
+            response = HttpResponse(shell.gzip_content, content_type='text/html; charset=utf-8')
+            response['Content-Encoding'] = 'gzip'
+        else:
+            response = HttpResponse(shell.content, content_type='text/html; charset=utf-8')
+        if shell.link:
+            response['Link'] = shell.link
+    response['ETag'] = etag
+    # Revalidated on every navigation so a deploy is picked up right away
+    response['Cache-Control'] = 'no-cache'
+    patch_vary_headers(response, ['Accept-Encoding'])
+    return response
 
 
 
@@ -56,14 +84,19 @@ class GetReservations(APIView):
     def get(self, request):
         print('userrrrr hereeeee', request.user)
         try:
-            reservations = Reservation.objects.filter(user=request.user).order_by('-created_at')
+            reservations = Reservation.objects.filter(user=request.user).select_related('game')
+            
+            # Newest first, one page per request - follow the "next" link for older ones
+            paginator = ReservationKeysetPagination()
+            page = paginator.paginate_queryset(reservations, request, view=self)
             
             # Pass QuerySet as instance, not data
-            serializer = ReservationSerializer(reservations, many=True)
+            serializer = ReservationSerializer(page, many=True)
             
-            print('daaaatttaaaaaaa', serializer.data)
-            return Response(serializer.data, status=status.HTTP_200_OK)
+            return paginator.get_paginated_response(serializer.data)
             
+        except NotFound as e:
+            return Response({'error': str(e.detail)}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             print(e)
             return Response({